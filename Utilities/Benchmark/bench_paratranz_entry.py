@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import regex
+import argparse
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'Importer'))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'Common'))
+from JP_TRImporter import iter_paratranz_files
+from paratranz_entry import parse_entry, split_comments
+import json_codec
+
+
+# ---------------------------------------------------
+
+DEFAULT_PARATRANZ_DIR = os.path.join(BENCHMARK_DIR, '..', '..', 'paratranz')
+DEFAULT_REPEAT = 5
+
+# ---------------------------------------------------
+
+
+"""
+ParaTranz Entry Parser Benchmark
+=====================================
+
+【概要】
+ParaTranz のエクスポート（全ファイル）を使って、エントリの分解処理の速度を比較するツールです。
+- regex    : 従来の JP_TRImporter の処理（"\\n" の置き換えと regex.sub / regex.split）
+- tokenizer: paratranz_entry.parse_entry（str.find による1回の走査）
+あわせて、すべてのエントリで両者の結果が一致すること、
+ParaTranz_Divider の JPコメントの判定が従来の処理と一致することを確認します（不一致がある場合は終了コード 1）。
+
+【計測方法】
+- 翻訳ファイルはすべて事前に読み込み、JSONのデコードは時間に含めない
+- 各処理を --repeat 回実行し、最短時間と中央値を表示
+
+【使い方】
+python bench_paratranz_entry.py [PARATRANZ_DIR_OR_ZIP] --repeat 5
+  * 指定しない場合はリポジトリの paratranz フォルダを使用
+"""
+
+
+TRANSLATION_PATTERN = regex.compile(r'\n?<CMT_.*$', regex.MULTILINE | regex.DOTALL)
+CONTEXT_PATTERN = regex.compile(r"KR:\n?|EN:\n?")
+COMMENT_PATTERN = regex.compile(r"<CMT_KR>|<CMT_JP>")
+
+
+def parse_entry_regex(item):
+    """従来の load_translations_and_comments_by_filename の1エントリ分の処理（parse_entry と同じ形式で返す）"""
+    original = item["original"].replace('\\n', '\n')
+    original = regex.sub(TRANSLATION_PATTERN, '', original)
+
+    translation = item["translation"].replace('\\n', '\n')
+    translation = regex.sub(TRANSLATION_PATTERN, '', translation)
+
+    source = None
+    context = item.get("context")
+    if not context == None:
+        context = context.replace('\\n', '\n')
+        parts = regex.split(CONTEXT_PATTERN, item["context"])
+        source = parts[1].removesuffix('\n') if len(parts) > 1 else ""
+
+    parts = regex.split(COMMENT_PATTERN, item["translation"].replace('\\n', '\n'))
+    if len(parts) >= 3:
+        cmt_kr, cmt_jp = parts[1].removesuffix('\n'), parts[2].removesuffix('\n')
+    else:
+        cmt_kr, cmt_jp = "", ""
+    return original, translation, source, cmt_kr, cmt_jp
+
+
+def has_nonempty_cmt_jp_legacy(entry):
+    """従来の ParaTranz_Divider.has_nonempty_cmt_jp"""
+    for text in [entry.get('original', ''), entry.get('translation', '')]:
+        if '<CMT_JP>' in text:
+            if text.split('<CMT_JP>')[-1].strip():
+                return True
+    return False
+
+
+def has_nonempty_cmt_jp(entry):
+    """現在の ParaTranz_Divider.has_nonempty_cmt_jp と同じ判定"""
+    return any(split_comments(entry.get(key, ''))[2].strip() for key in ['original', 'translation'])
+
+
+def load_items(translation_source):
+    """翻訳ファイルをすべて読み込み、エントリのリストを返す"""
+    items = []
+    file_count = 0
+    for _, read_file in iter_paratranz_files(translation_source):
+        items.extend(json_codec.loads(read_file()))
+        file_count += 1
+    return file_count, items
+
+
+def time_parser(parser, items, repeat):
+    """parser で全エントリを分解する時間（repeat 回）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            parser(item)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def count_mismatches(items):
+    """従来の処理と結果が異なるエントリ数（分解結果, Divider の判定）"""
+    parse_mismatches = 0
+    divider_mismatches = 0
+    for item in items:
+        if parse_entry(item) != parse_entry_regex(item):
+            parse_mismatches += 1
+            if parse_mismatches <= 5:
+                print(f"  不一致: {item.get('key')}")
+        if has_nonempty_cmt_jp(item) != has_nonempty_cmt_jp_legacy(item):
+            divider_mismatches += 1
+    return parse_mismatches, divider_mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="ParaTranz Entry Parser Benchmark")
+    parser.add_argument('source', nargs='?', default=DEFAULT_PARATRANZ_DIR,
+                        help="ParaTranz のエクスポート（展開済みのフォルダ、または zip ファイル）")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="各処理の実行回数")
+    args = parser.parse_args()
+
+    file_count, items = load_items(args.source)
+    print(f"{file_count} ファイル, {len(items)} エントリ")
+
+    results = {}
+    for name, entry_parser in (("regex", parse_entry_regex), ("tokenizer", parse_entry)):
+        timings = sorted(time_parser(entry_parser, items, max(1, args.repeat)))
+        results[name] = timings[0]
+        print(f"  {name:<9}: 最短 {timings[0] * 1000:.1f} ms, 中央値 {timings[len(timings) // 2] * 1000:.1f} ms, "
+              f"{len(items) / timings[0]:,.0f} 件/秒")
+    if results["tokenizer"] > 0:
+        print(f"  速度比: x{results['regex'] / results['tokenizer']:.2f}")
+
+    parse_mismatches, divider_mismatches = count_mismatches(items)
+    print(f"従来の処理との不一致: 分解結果 {parse_mismatches} 件, Divider の判定 {divider_mismatches} 件")
+    if parse_mismatches or divider_mismatches:
+        raise SystemExit(1)
@@ -0,0 +1,339 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import tracemalloc
+import importlib
+import argparse
+from datetime import datetime
+from statistics import median
+from collections import defaultdict
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'Importer'))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'Misc'))
+from synthetic_corpus import generate_corpus, write_corpus, LANGUAGES, DEFAULT_SEED
+
+
+# ---------------------------------------------------
+
+DEFAULT_ENTRY_COUNTS = (1000, 10000)
+DEFAULT_REPEAT = 5
+OUTPUT_FILE = 'benchmark_results.json'
+RESULT_FORMAT_VERSION = 1
+
+# ベースライン比較で、これより遅く（メモリが多く）なった場合は悪化とみなす
+REGRESSION_THRESHOLD = 0.10
+
+# ---------------------------------------------------
+
+
+"""
+Benchmark Runner
+=====================================
+
+【概要】
+合成コーパス（synthetic_corpus.py）を使って、各ツールの主要な処理の速度とメモリ使用量を計測するツールです。
+
+【計測対象】
+- importer.apply_translation_to_obj  : JP_TRImporter の翻訳適用（process_json_file の dataList の処理と同じ手順）
+- importer.write_csv_report          : JP_TRImporter のレポート出力（既存レポートがある状態での更新）
+- merger.extract_target_values       : JP_GameTextMerger のテキスト抽出（JP / KR / EN）
+- generator.extract_target_values    : JP_LangJsonGenerator のテキスト抽出（JP / KR / EN）
+
+【計測方法】
+- 各処理を --repeat 回実行し、最短時間と中央値を記録（入力の準備は時間に含めない）
+- スループットは「処理したテキスト数 / 最短時間」
+- ピークメモリは tracemalloc で別途1回実行して計測（計測のオーバーヘッドを時間に含めないため）
+
+【使い方】
+python run_benchmarks.py --entries 1000 10000 100000
+  * --output FILE   : 結果のJSONの出力先（既定は benchmark_results.json）
+  * --baseline FILE : 以前の結果と比較し、悪化した場合は終了コード 1
+  * --only NAME     : 名前に NAME を含むベンチマークのみ実行
+  * --corpus-dir DIR: 合成コーパスの生成先（指定しない場合は一時ディレクトリを使用し、終了時に削除）
+"""
+
+
+def load_tools():
+    """
+    計測対象のツールを読み込む。
+    JP_GameTextMerger は読み込み時にカレントディレクトリのモデル名のファイルを読むため、
+    合成コーパスのディレクトリに移動してから呼び出すこと。
+    """
+    importer = importlib.import_module('JP_TRImporter')
+    importer.LOCAL_MODE = True  # レポートを output_dir に書き出す
+    return {
+        "importer": importer,
+        "merger": importlib.import_module('JP_GameTextMerger'),
+        "generator": importlib.import_module('JP_LangJsonGenerator'),
+    }
+
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_importer_inputs(tools, corpus_root, corpus, archive_path):
+    """インポーターの入力（元ファイルのテキスト・翻訳データ）をファイルごとに読み込む"""
+    importer = tools["importer"]
+    paratranz_locations = importer.index_paratranz_files(archive_path)
+    input_root = os.path.join(corpus_root, 'Localize', 'jp')
+    inputs = []
+    for record in corpus:
+        directory, name = os.path.split(record["rel_path"])
+        basename = "JP_" + os.path.splitext(name)[0]
+        entries = importer.load_paratranz_entries(paratranz_locations.get(basename))
+        file_translations = {key: entry.translation for key, entry in entries.items()}
+        inputs.append({
+            "input_root": input_root,
+            "input_path": os.path.join(input_root, directory, "JP_" + name),
+            "rel_path": os.path.join(directory, "JP_" + name),
+            "basename": basename,
+            "source_text": read_text(os.path.join(input_root, directory, "JP_" + name)),
+            "translations": file_translations,
+            "organized_translations": importer.organize_duplicate_translations(file_translations),
+            "entries": entries,
+        })
+    importer.close_paratranz_archives()
+    return inputs
+
+
+def apply_file_translations(importer, data, file_input):
+    """process_json_file と同じ手順で、1ファイル分の dataList に翻訳を適用する"""
+    file_formats = importer.collect_file_formats(data)
+    translations = file_input["translations"]
+    organized_translations = file_input["organized_translations"]
+    dup_counters = defaultdict(int)
+    entry_ids = [item.get("id") for item in data["dataList"] if item.get("id") is not None]
+    path_index = importer.build_translation_path_index(translations, organized_translations, entry_ids)
+    for i, item in enumerate(data["dataList"]):
+        entry_id = item.get("id")
+        if entry_id is not None:
+            path_prefixes = path_index.get(f"{entry_id}")
+            if path_prefixes is None:
+                continue
+            data["dataList"][i] = importer.apply_translation_to_obj(
+                item, translations, file_formats, organized_translations, entry_id,
+                dup_counters=dup_counters, path_prefixes=path_prefixes
+            )
+
+
+def bench_importer_apply(tools, context):
+    """importer.apply_translation_to_obj（翻訳適用のたびに元のツリーを読み込み直す）"""
+    importer = tools["importer"]
+    inputs = context["importer_inputs"]
+
+    def setup():
+        return [json.loads(file_input["source_text"]) for file_input in inputs]
+
+    def run(trees):
+        for data, file_input in zip(trees, inputs):
+            apply_file_translations(importer, data, file_input)
+
+    items = sum(len(file_input["translations"]) for file_input in inputs)
+    return setup, run, items
+
+
+def bench_importer_report(tools, context):
+    """importer.write_csv_report（前回のレポートがある状態で、更新日時を引き継ぎながら書き出す）"""
+    importer = tools["importer"]
+    rows = []
+    for file_input in context["importer_inputs"]:
+        rows.extend(importer.collect_csv_report_rows(
+            input_root=file_input["input_root"],
+            rel_path=file_input["rel_path"],
+            basename=file_input["basename"],
+            entries=file_input["entries"],
+            full_json_path=file_input["input_path"],
+            source_text=file_input["source_text"]
+        ))
+    output_dir = os.path.join(context["work_dir"], 'report')
+    shutil.rmtree(output_dir, ignore_errors=True)
+    importer.write_csv_report(output_dir, rows)
+
+    def setup():
+        return rows
+
+    def run(report_rows):
+        importer.write_csv_report(output_dir, report_rows)
+
+    return setup, run, len(rows)
+
+
+def make_extract_benchmark(tool_name):
+    """各ツールの extract_target_values（JP / KR / EN のすべてのファイル）"""
+    def bench(tools, context):
+        extract = tools[tool_name].extract_target_values
+        trees = context["localize_trees"]
+
+        def setup():
+            return trees
+
+        def run(data_list):
+            for data in data_list:
+                extract(data)
+
+        items = sum(len(extract(data)) for data in trees)
+        return setup, run, items
+    return bench
+
+
+BENCHMARKS = {
+    "importer.apply_translation_to_obj": bench_importer_apply,
+    "importer.write_csv_report": bench_importer_report,
+    "merger.extract_target_values": make_extract_benchmark("merger"),
+    "generator.extract_target_values": make_extract_benchmark("generator"),
+}
+
+
+def measure(setup, run, repeat):
+    """実行時間（repeat 回）とピークメモリ（別途1回）を計測"""
+    timings = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+        del state
+
+    state = setup()
+    tracemalloc.start()
+    base_bytes, _ = tracemalloc.get_traced_memory()
+    run(state)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak_bytes - base_bytes
+
+
+def run_benchmarks(entry_counts, seed=DEFAULT_SEED, repeat=DEFAULT_REPEAT, only=None, corpus_dir=None):
+    """
+    エントリ数ごとに合成コーパスを生成し、すべてのベンチマークを実行する。
+
+    Returns:
+        list: ベンチマークごとの結果の dict。
+    """
+    results = []
+    work_root = corpus_dir or tempfile.mkdtemp(prefix='lcb_benchmark_')
+    cwd = os.getcwd()
+    tools = None
+    try:
+        for entries in entry_counts:
+            corpus_root = os.path.abspath(os.path.join(work_root, f"entries_{entries}"))
+            shutil.rmtree(corpus_root, ignore_errors=True)
+            print(f"合成コーパスを生成しています: {entries} エントリ")
+            corpus = generate_corpus(entries, seed)
+            archive_path = write_corpus(corpus_root, corpus, seed)
+
+            os.chdir(corpus_root)
+            if tools is None:
+                tools = load_tools()
+            context = {
+                "work_dir": corpus_root,
+                "localize_trees": [record["data"][lang] for record in corpus for lang, _ in LANGUAGES],
+                "importer_inputs": load_importer_inputs(tools, corpus_root, corpus, archive_path),
+            }
+
+            for name, bench in BENCHMARKS.items():
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                setup, run, items = bench(tools, context)
+                timings, peak_bytes = measure(setup, run, repeat)
+                best = min(timings)
+                result = {
+                    "name": name,
+                    "entries": entries,
+                    "files": len(corpus),
+                    "items": items,
+                    "repeat": repeat,
+                    "seconds_min": best,
+                    "seconds_median": median(timings),
+                    "items_per_second": items / best if best > 0 else None,
+                    "peak_bytes": peak_bytes,
+                }
+                results.append(result)
+                print(f"  {name}: {items} 件, {best * 1000:.1f} ms, "
+                      f"{result['items_per_second'] or 0:,.0f} 件/秒, ピーク {peak_bytes / 1024 / 1024:.1f} MB")
+    finally:
+        os.chdir(cwd)
+        if corpus_dir is None:
+            shutil.rmtree(work_root, ignore_errors=True)
+    return results
+
+
+def save_results(output_path, results, entry_counts, seed):
+    """結果をJSONで書き出す"""
+    report = {
+        "version": RESULT_FORMAT_VERSION,
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "entry_counts": list(entry_counts),
+        "results": results,
+    }
+    with open(output_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def compare_with_baseline(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """
+    ベースラインの結果と比較して表示する（名前とエントリ数が同じものを比較）。
+
+    Returns:
+        list: 悪化したベンチマークの (名前, エントリ数) のリスト。
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(item["name"], item["entries"]): item for item in json.load(f)["results"]}
+
+    regressions = []
+    print(f"ベースラインとの比較: {baseline_path}（{threshold:.0%} 以上の悪化を検出）")
+    for result in results:
+        key = (result["name"], result["entries"])
+        old = baseline.get(key)
+        if old is None:
+            print(f"  {result['name']} ({result['entries']}): ベースラインなし")
+            continue
+        time_ratio = result["seconds_min"] / old["seconds_min"] if old["seconds_min"] else float('inf')
+        memory_ratio = result["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else 1.0
+        regressed = time_ratio > 1 + threshold or memory_ratio > 1 + threshold
+        if regressed:
+            regressions.append(key)
+        print(f"  {result['name']} ({result['entries']}): 時間 x{time_ratio:.2f}, メモリ x{memory_ratio:.2f}"
+              f"{'  <- 悪化' if regressed else ''}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark Runner")
+    parser.add_argument('--entries', type=int, nargs='+', default=list(DEFAULT_ENTRY_COUNTS),
+                        help="合成コーパスのエントリ数（複数指定可、10〜100000程度）")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help="合成コーパスの乱数のシード")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="各ベンチマークの実行回数")
+    parser.add_argument('--only', nargs='+',
+                        help="名前にいずれかを含むベンチマークのみ実行")
+    parser.add_argument('--output', default=OUTPUT_FILE,
+                        help="結果のJSONの出力先")
+    parser.add_argument('--baseline',
+                        help="比較するベースラインの結果のJSON")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="悪化とみなす割合（0.1 = 10%%）")
+    parser.add_argument('--corpus-dir',
+                        help="合成コーパスの生成先（指定した場合は削除しない）")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.entries, args.seed, max(1, args.repeat), args.only, args.corpus_dir)
+    save_results(args.output, results, args.entries, args.seed)
+    print(f"結果を書き出しました: {args.output}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.threshold)
+        if regressions:
+            raise SystemExit(1)
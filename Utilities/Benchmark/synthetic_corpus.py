@@ -0,0 +1,290 @@
+import os
+import sys
+import json
+import random
+import zipfile
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Misc'))
+from JP_LangJsonGenerator import extract_target_values, build_output_entries
+
+
+# ---------------------------------------------------
+
+DEFAULT_SEED = 0
+DEFAULT_ENTRIES = 1000
+ENTRIES_PER_FILE = 500  # 1ファイルあたりの最大エントリ数
+
+# 生成するファイルの形
+# - story : StoryData のような会話（model / teller / title / place / content）
+# - nested: 入れ子のリストを含むエントリ（levelList[0].coinlist[0].coindescs[0].desc など）
+# - dup   : 同じIDやIDのないエントリが繰り返し現れ、-dupN のキーになるもの
+SHAPES = ('story', 'nested', 'dup')
+
+LANGUAGES = (('jp', 'JP_'), ('kr', 'KR_'), ('en', 'EN_'))
+MODEL_CODES_FILE = 'ScenarioModelCodes-AutoCreated.json'
+MODEL_COUNT = 24
+
+# ParaTranz のエクスポート（JP_TRImporter がダウンロードするアーカイブと同じ構成）
+EXPORT_ARCHIVE = os.path.join('paratranz', 'synthetic_export.zip')
+EXPORT_PREFIX = 'utf8/jp/'
+
+# ParaTranz のエクスポートで校正コメント・修正文を付けるエントリの割合
+COMMENT_RATIO = 0.05
+REVISED_RATIO = 0.3
+COMMENT_CATEGORIES = ('오기1: ', '오역 의심: ', '표현 개선2: ', '')
+
+# JP のテキストの先頭・末尾に付ける空白文字（書式情報の復元を通すため）
+FORMAT_PADDINGS = ('\n', '　', ' ', '\n\n')
+FORMAT_RATIO = 0.05
+
+# ---------------------------------------------------
+
+
+"""
+Synthetic Corpus Generator
+=====================================
+
+【概要】
+ベンチマーク用に、Localize の JSON ファイルと対応する ParaTranz のエクスポートを生成するツールです。
+同じシード・エントリ数からは常に同じ内容を生成します。
+
+【生成内容】
+- Localize/jp, kr, en : 構造が同じで言語ごとにテキストが異なる dataList 形式のJSON
+                        （story の形は StoryData フォルダに配置、モデル名のファイルも生成）
+- paratranz/synthetic_export.zip : JP_LangJsonGenerator と同じ形式のエクスポート（utf8/jp/ 以下）
+                        （一部のエントリに校正コメント <CMT_KR> / <CMT_JP> と修正文を付加）
+
+【使い方】
+python synthetic_corpus.py 出力ディレクトリ --entries 10000 --seed 0
+生成したディレクトリで JP_TRImporter.py（LOCAL_MODE = True）/ JP_GameTextMerger.py /
+JP_LangJsonGenerator.py をそのまま実行できます。
+"""
+
+
+JP_CHARS = 'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをん' \
+           'アイウエオカキクケコサシスセソタチツテトナニヌネノ区支部社長囚人鏡世界都市翼指令管理者'
+JP_PUNCTUATION = ('、', '。', '…', '！', '？')
+EN_WORDS = ('the', 'city', 'wing', 'fixer', 'manager', 'sinner', 'mirror', 'bus', 'ticket', 'coin',
+            'skill', 'guard', 'office', 'district', 'syndicate', 'we', 'must', 'not', 'stop', 'here')
+
+
+def make_text(rng, lang, min_len=4, max_len=40):
+    """言語ごとのランダムなテキスト（まれに改行を含む）"""
+    length = rng.randint(min_len, max_len)
+    if lang == 'en':
+        words = [rng.choice(EN_WORDS) for _ in range(max(1, length // 5))]
+        text = ' '.join(words).capitalize() + rng.choice(('.', '?', '!'))
+    elif lang == 'kr':
+        text = ''.join(chr(rng.randint(0xAC00, 0xD7A3)) if rng.random() > 0.15 else ' ' for _ in range(length)).strip()
+        text = (text or '가') + rng.choice(('.', '?', '…'))
+    else:
+        text = ''.join(rng.choice(JP_CHARS) for _ in range(length)) + rng.choice(JP_PUNCTUATION)
+    if length > 30 and rng.random() < 0.3:
+        pos = len(text) // 2
+        text = text[:pos] + '\n' + text[pos:]
+    return text
+
+
+class TextFactory:
+    """
+    1言語分のテキストを生成する。
+    構造（キーの有無・リストの長さ）は言語間で共通の乱数で決めるため、テキストの乱数は言語ごとに分ける。
+    """
+
+    def __init__(self, seed, lang):
+        self.rng = random.Random(f"{seed}-text-{lang}")
+        self.lang = lang
+
+    def text(self, min_len=4, max_len=40):
+        text = make_text(self.rng, self.lang, min_len, max_len)
+        # JP のみ先頭・末尾に空白文字を付加（JP_LangJsonGenerator の出力では除去される）
+        if self.lang == 'jp' and self.rng.random() < FORMAT_RATIO:
+            padding = self.rng.choice(FORMAT_PADDINGS)
+            text = padding + text if self.rng.random() < 0.5 else text + padding
+        return text
+
+
+def make_story_entries(rng, texts, count):
+    """StoryData のような会話のエントリ"""
+    entries = []
+    for i in range(count):
+        entry = {"id": i}
+        roll = rng.random()
+        if roll < 0.1:
+            entry["place"] = texts.text(4, 12)
+        elif roll < 0.8:
+            entry["model"] = f"model_{rng.randrange(MODEL_COUNT):03d}"
+            if rng.random() < 0.4:
+                entry["teller"] = texts.text(2, 6)
+                entry["title"] = texts.text(3, 10)
+        entry["content"] = texts.text(8, 80)
+        entries.append(entry)
+    return entries
+
+
+def make_nested_entries(rng, texts, count, first_id):
+    """入れ子のリストを含むエントリ"""
+    entries = []
+    for i in range(count):
+        entry = {"id": first_id + i, "name": texts.text(3, 12), "desc": texts.text(10, 60)}
+        if rng.random() < 0.5:
+            entry["levelList"] = [
+                {
+                    "level": level,
+                    "name": texts.text(3, 12),
+                    "desc": texts.text(10, 60),
+                    "coinlist": [
+                        {"coindescs": [{"desc": texts.text(6, 30)} for _ in range(rng.randint(0, 2))]}
+                        for _ in range(rng.randint(1, 3))
+                    ],
+                }
+                for level in range(rng.randint(1, 3))
+            ]
+        if rng.random() < 0.3:
+            entry["options"] = [
+                {"id": option_id, "message": texts.text(4, 20), "messageDesc": texts.text(8, 40)}
+                for option_id in range(rng.randint(1, 3))
+            ]
+        if rng.random() < 0.2:
+            entry["nameList"] = [texts.text(2, 8) for _ in range(rng.randint(1, 4))]
+        entries.append(entry)
+    return entries
+
+
+def make_dup_entries(rng, texts, count):
+    """同じIDが繰り返し現れるエントリとIDのないエントリ"""
+    entries = []
+    id_pool = max(1, count // 4)
+    for _ in range(count):
+        entry = {}
+        if rng.random() < 0.8:
+            entry["id"] = rng.randrange(id_pool)
+        if rng.random() < 0.5:
+            entry["teller"] = texts.text(2, 6)
+        entry["content"] = texts.text(8, 80)
+        entries.append(entry)
+    return entries
+
+
+def make_localize_data(shape, count, seed, file_index, lang):
+    """1ファイル分の Localize のデータ"""
+    rng = random.Random(f"{seed}-{shape}-{file_index}")
+    texts = TextFactory(f"{seed}-{shape}-{file_index}", lang)
+    if shape == 'story':
+        entries = make_story_entries(rng, texts, count)
+    elif shape == 'nested':
+        entries = make_nested_entries(rng, texts, count, 100000 + file_index * ENTRIES_PER_FILE)
+    elif shape == 'dup':
+        entries = make_dup_entries(rng, texts, count)
+    else:
+        raise ValueError(f"不明な形: {shape}")
+    return {"dataList": entries}
+
+
+def make_model_codes(seed, lang):
+    """JP_GameTextMerger が参照するモデル名のデータ"""
+    texts = TextFactory(f"{seed}-model", lang)
+    return {"dataList": [
+        {"id": f"model_{i:03d}", "name": texts.text(2, 6) if i % 8 else "", "nickName": texts.text(3, 8)}
+        for i in range(MODEL_COUNT)
+    ]}
+
+
+def add_review_comments(export, seed, file_index):
+    """一部のエントリに校正コメントと修正文を付加する（ParaTranz で校正された状態を再現）"""
+    rng = random.Random(f"{seed}-review-{file_index}")
+    for item in export:
+        if rng.random() >= COMMENT_RATIO:
+            continue
+        revised = item["original"].split("\n<CMT_KR>")[0]
+        if rng.random() < REVISED_RATIO:
+            revised = make_text(rng, 'jp', 8, 60)
+        kr_comment = rng.choice(COMMENT_CATEGORIES) + make_text(rng, 'kr', 6, 30)
+        jp_comment = make_text(rng, 'jp', 6, 30) if rng.random() < 0.7 else ""
+        item["translation"] = f"{revised}\n<CMT_KR>{kr_comment}\n<CMT_JP>{jp_comment}"
+    return export
+
+
+def plan_files(entries, shapes=SHAPES):
+    """エントリ数を各形のファイルに振り分け、(形, ファイル番号, エントリ数) のリストを返す"""
+    plan = []
+    for shape_index, shape in enumerate(shapes):
+        shape_entries = entries // len(shapes) + (1 if shape_index < entries % len(shapes) else 0)
+        file_index = 0
+        while shape_entries > 0:
+            count = min(ENTRIES_PER_FILE, shape_entries)
+            plan.append((shape, file_index, count))
+            shape_entries -= count
+            file_index += 1
+    return plan
+
+
+def get_relative_path(shape, file_index):
+    """ファイルの相対パス（接頭辞なし、story の形は StoryData 以下）"""
+    name = f"Synthetic{shape.capitalize()}{file_index:03d}.json"
+    return f"StoryData/{name}" if shape == 'story' else name
+
+
+def generate_corpus(entries=DEFAULT_ENTRIES, seed=DEFAULT_SEED, shapes=SHAPES):
+    """
+    合成コーパスをメモリ上に生成する。
+
+    Returns:
+        list: ファイルごとの dict。
+              rel_path（接頭辞なしの相対パス）, shape, entries, data（{言語: Localize のデータ}）,
+              export（ParaTranz のエクスポート）を持つ。
+    """
+    corpus = []
+    for shape, file_index, count in plan_files(entries, shapes):
+        data = {lang: make_localize_data(shape, count, seed, file_index, lang) for lang, _ in LANGUAGES}
+        values = [extract_target_values(data[lang]) for lang, _ in LANGUAGES]
+        export, _ = build_output_entries(*values)
+        corpus.append({
+            "rel_path": get_relative_path(shape, file_index),
+            "shape": shape,
+            "entries": count,
+            "data": data,
+            "export": add_review_comments(export, seed, f"{shape}-{file_index}"),
+        })
+    return corpus
+
+
+def write_json(path, data):
+    """ゲームのファイルと同じ形式（インデント2、ASCII以外はそのまま）で書き出す"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def write_corpus(output_root, corpus, seed=DEFAULT_SEED):
+    """生成したコーパスを Localize / paratranz のディレクトリ構成で書き出し、エクスポートのパスを返す"""
+    for lang, prefix in LANGUAGES:
+        write_json(os.path.join(output_root, 'Localize', lang, prefix + MODEL_CODES_FILE), make_model_codes(seed, lang))
+    for record in corpus:
+        directory, name = os.path.split(record["rel_path"])
+        for lang, prefix in LANGUAGES:
+            write_json(os.path.join(output_root, 'Localize', lang, directory, prefix + name), record["data"][lang])
+
+    archive_path = os.path.join(output_root, EXPORT_ARCHIVE)
+    os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for record in corpus:
+            zip_ref.writestr(EXPORT_PREFIX + record["rel_path"], json.dumps(record["export"], ensure_ascii=False, indent=2))
+    return archive_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Synthetic Corpus Generator")
+    parser.add_argument('output_dir', help="出力先のディレクトリ")
+    parser.add_argument('--entries', type=int, default=DEFAULT_ENTRIES,
+                        help="生成する dataList のエントリ数の合計")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help="乱数のシード")
+    parser.add_argument('--shapes', nargs='+', choices=SHAPES, default=list(SHAPES),
+                        help="生成するファイルの形")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.entries, args.seed, args.shapes)
+    write_corpus(args.output_dir, corpus, args.seed)
+    print(f"{len(corpus)} ファイル（{args.entries} エントリ）を生成しました: {args.output_dir}")
@@ -0,0 +1,98 @@
+"""
+複数の文字列の同時検索（Aho-Corasick）
+=====================================
+
+【概要】
+JP_GlossaryCheck などで使う、多数の用語をまとめて検索するためのオートマトンです。
+すべての用語を1つのオートマトンにまとめ、テキストを1回走査するだけで含まれる用語をすべて見つけます。
+（用語ごとに str.find を繰り返す場合と異なり、走査の時間は用語の数に依存しない）
+
+【使い方】
+automaton = AhoCorasick()
+automaton.add("ファウスト", value)   # 同じ文字列に複数の値を登録できる
+automaton.build()                    # 登録後に1回だけ呼び出す
+for start, end, value in automaton.iter_matches(text):
+    ...                              # text[start:end] が登録した文字列（重なり・包含も含めてすべて返す）
+
+オートマトンはリスト・辞書とコンパイル済みの正規表現で構成されるため、pickle でワーカープロセスに渡せます。
+"""
+
+import re
+from collections import deque
+
+
+class AhoCorasick:
+    """複数の文字列を同時に検索するオートマトン"""
+
+    def __init__(self):
+        self.transitions = [{}]  # 状態ごとの {文字: 次の状態}
+        self.failures = [0]  # 一致しなかった場合に戻る状態
+        self.outputs = [[]]  # 状態で一致する文字列の [(長さ, 値)]（戻り先の状態の分も含む）
+        self.built = False
+
+    def add(self, pattern, value):
+        """検索する文字列と、一致した場合に返す値を登録する"""
+        if not pattern:
+            raise ValueError("空の文字列は登録できません")
+        if self.built:
+            raise RuntimeError("build() の後に文字列は登録できません")
+        state = 0
+        for ch in pattern:
+            next_state = self.transitions[state].get(ch)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][ch] = next_state
+                self.transitions.append({})
+                self.failures.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((len(pattern), value))
+
+    def build(self):
+        """戻り先の状態を幅優先で計算する"""
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                failure = self.failures[state]
+                while failure and ch not in self.transitions[failure]:
+                    failure = self.failures[failure]
+                failure = self.transitions[failure].get(ch, 0)
+                self.failures[next_state] = failure
+                # 戻り先の状態で一致する文字列（より短い接尾辞）もこの状態で返す
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[failure]
+        # 登録した文字列の先頭の文字のいずれか（文字列が1つも登録されていない場合は None）
+        self.start_pattern = None
+        if self.transitions[0]:
+            self.start_pattern = re.compile('[' + ''.join(re.escape(ch) for ch in sorted(self.transitions[0])) + ']')
+        self.built = True
+        return self
+
+    def iter_matches(self, text):
+        """text に含まれる登録した文字列を (開始位置, 終了位置, 値) として終了位置の順に返す"""
+        if not self.built:
+            raise RuntimeError("検索の前に build() を呼び出してください")
+        if self.start_pattern is None:
+            return
+        transitions, failures, outputs = self.transitions, self.failures, self.outputs
+        find_start = self.start_pattern.search
+        state = 0
+        pos = 0
+        length = len(text)
+        while pos < length:
+            if state == 0:
+                # 初期状態では、登録した文字列の先頭の文字まで正規表現（C の実装）で読み飛ばす
+                match = find_start(text, pos)
+                if match is None:
+                    return
+                pos = match.start()
+                state = transitions[0][text[pos]]
+            else:
+                ch = text[pos]
+                while state and ch not in transitions[state]:
+                    state = failures[state]
+                state = transitions[state].get(ch, 0)
+            pos += 1
+            for pattern_length, value in outputs[state]:
+                yield pos - pattern_length, pos, value
@@ -0,0 +1,164 @@
+"""
+抽出結果のディスクキャッシュ
+=====================================
+
+【概要】
+JP_GameTextMerger / JP_LangJsonGenerator で共通して使う、Localize の JSON ファイルから
+抽出したテキスト（{キー: テキスト} などの平坦化したデータ）をディスクに保存するキャッシュです。
+同じファイルを次回以降に処理する際は、JSONのデコードと抽出を行わずにキャッシュから読み込みます。
+
+【キャッシュの判定】
+- ファイルのパス・サイズ・更新日時が一致すればキャッシュを使用
+- サイズか更新日時が異なる場合は内容のハッシュを比較し、一致すればキャッシュを使用
+  （git checkout などで更新日時のみ変わった場合）
+- namespace にツールのハッシュなどを含めることで、抽出処理が変わった場合は別のキャッシュになる
+
+【対象範囲】
+- キャッシュはツールごと（namespace ごと）で、ツール間では共有しません
+  （JP_GameTextMerger と JP_LangJsonGenerator は抽出するキー・キーの付け方が異なるため）
+- そのため、各ツールの初回の実行（またはファイルの変更後）は、ツールごとに同じファイルをデコードします
+- JP_TRImporter は使用しません（翻訳の適用に変更可能なツリーと元のテキストが必要で、
+  デコード済みのツリーをキャッシュから読み込んでもデコードと同程度の時間がかかるため）
+
+【設定（環境変数）】
+- LCB_JSON_CACHE_DIR   : キャッシュの保存先（既定は ".json_cache"、空文字列の場合はキャッシュを使用しない）
+- LCB_JSON_CACHE_MAX_MB: キャッシュの最大サイズ（既定は 512MB、超えた場合は古いものから削除）
+
+キャッシュの値は marshal で保存するため、dict / list / str / int などの組み込み型のみ格納できます。
+"""
+
+import os
+import hashlib
+import marshal
+
+
+CACHE_DIR_ENV = 'LCB_JSON_CACHE_DIR'
+CACHE_MAX_MB_ENV = 'LCB_JSON_CACHE_MAX_MB'
+DEFAULT_CACHE_DIR = '.json_cache'
+DEFAULT_CACHE_MAX_MB = 512
+CACHE_FORMAT_VERSION = 1
+
+
+def get_cache_dir():
+    """キャッシュの保存先を返す（キャッシュを使用しない場合は None）"""
+    cache_dir = os.getenv(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+    return cache_dir or None
+
+
+def hash_files(*file_paths):
+    """複数ファイルの内容をまとめたハッシュを返す（namespace の作成用）"""
+    sha = hashlib.sha256()
+    for file_path in file_paths:
+        with open(file_path, 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()[:16]
+
+
+def get_cache_path(cache_dir, namespace, file_path):
+    """キャッシュファイルのパス（namespace と実体の絶対パスのハッシュ）"""
+    key = hashlib.sha1(f"{namespace}\0{os.path.realpath(file_path)}".encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, key[:2], key + '.cache')
+
+
+def read_cache_entry(cache_path):
+    """キャッシュファイルを読み込む（存在しない・壊れている場合は None）"""
+    try:
+        # marshal.load はファイルから少しずつ読み込むため、まとめて読み込んでから復元する
+        with open(cache_path, 'rb') as f:
+            entry = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(entry, tuple) or len(entry) != 6 or entry[0] != CACHE_FORMAT_VERSION:
+        return None
+    return entry
+
+
+def write_cache_entry(cache_path, entry):
+    """キャッシュファイルを書き出す（並列実行時に壊れないよう一時ファイルから置き換える）"""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        data = marshal.dumps(entry)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError):
+        # 書き込めない場合・格納できない値の場合はキャッシュしない
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_cached(file_path, namespace, build):
+    """
+    file_path から抽出したデータをキャッシュ経由で取得する。
+
+    Parameters:
+        file_path (str): 元のJSONファイルのパス。
+        namespace (str): 抽出処理の識別子（抽出処理・依存ファイルが変わる場合は異なる値にする）。
+        build (callable): キャッシュがない場合に呼び出す関数。file_path を受け取り抽出結果を返す。
+
+    Returns:
+        build(file_path) の戻り値（またはキャッシュされた同じ値）。
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return build(file_path)
+
+    cache_path = get_cache_path(cache_dir, namespace, file_path)
+    stat = os.stat(file_path)
+    entry = read_cache_entry(cache_path)
+    if entry is not None:
+        _, cached_namespace, size, mtime_ns, content_hash, value = entry
+        if cached_namespace == namespace:
+            if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                return value
+            # 更新日時のみ変わった場合は内容のハッシュで判定し、記録を更新する
+            with open(file_path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() == content_hash:
+                    write_cache_entry(cache_path, (CACHE_FORMAT_VERSION, namespace, stat.st_size, stat.st_mtime_ns, content_hash, value))
+                    return value
+
+    with open(file_path, 'rb') as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    value = build(file_path)
+    write_cache_entry(cache_path, (CACHE_FORMAT_VERSION, namespace, stat.st_size, stat.st_mtime_ns, content_hash, value))
+    return value
+
+
+def prune_cache(max_bytes=None):
+    """
+    キャッシュの合計サイズが上限を超えた場合、最後に書き込まれたのが古いものから削除する。
+
+    Returns:
+        int: 削除したキャッシュファイルの数。
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is None or not os.path.isdir(cache_dir):
+        return 0
+    if max_bytes is None:
+        max_bytes = int(os.getenv(CACHE_MAX_MB_ENV, DEFAULT_CACHE_MAX_MB)) * 1024 * 1024
+
+    entries = []
+    total = 0
+    for root, _, files in os.walk(cache_dir):
+        for file in files:
+            path = os.path.join(root, file)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    removed = 0
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,175 @@
+"""
+JSONの読み込み・書き出し（高速なバックエンドの切り替え）
+=====================================
+
+【概要】
+JP_TRImporter / JP_GameTextMerger / JP_LangJsonGenerator で共通して使う、JSONのデコードと
+json.dumps(obj, ensure_ascii=False, indent=2) 形式のエンコードをまとめたモジュールです。
+orjson がインストールされていればそれを使用し、なければ標準ライブラリの json を使用します。
+（orjson で速くなるのは bytes のデコードとエンコードのみのため、str のデコードは常に標準ライブラリを使用）
+
+【出力の一致】
+どちらのバックエンドでも、標準ライブラリの json と同じ結果（デコード結果・出力のバイト列）になります。
+orjson と標準ライブラリで結果が異なるデータは、標準ライブラリで処理します。
+- 指数表記になる浮動小数点数（1e-05 など）・NaN / Infinity : 表記が異なる
+- 64ビットを超える整数 : orjson では浮動小数点数になる、またはエンコードできない
+- 対になっていないサロゲート文字・BOM・文字列以外のキー : orjson ではエラーになる
+
+【設定（環境変数）】
+- LCB_JSON_BACKEND: 使用するバックエンド（auto / orjson / json、既定は auto）
+- LCB_JSON_VERIFY : 1 の場合、orjson の結果を毎回標準ライブラリの結果と比較する（検証モード）
+                    一致しない場合は標準ライブラリの結果を使用し、不一致の件数を記録する
+"""
+
+import os
+import re
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKEND_ENV = 'LCB_JSON_BACKEND'
+VERIFY_ENV = 'LCB_JSON_VERIFY'
+BACKENDS = ('auto', 'orjson', 'json')
+
+# orjson で64ビットを超える整数が浮動小数点数になるのを避けるため、19桁以上の数字を含む入力は標準ライブラリで読む
+# （数字を "0"、それ以外を空白に置き換えてから検索する。文字列内の数字にも一致するが、その場合も結果は変わらない）
+DIGIT_TABLE = bytes(0x30 if 0x30 <= b <= 0x39 else 0x20 for b in range(256))
+LONG_NUMBER = b'0' * 19
+# orjson の出力で標準ライブラリと表記が異なり得る値
+# - 指数表記の数値（"1e20" など、直前が数字の "e" + 数字/符号で判定）
+# - NaN / Infinity（orjson では null になるため、null を含む出力はすべて標準ライブラリで書き出す）
+EXPONENT_CANDIDATE_PATTERN = re.compile(rb'e[-+0-9]')
+
+# このプロセスで処理した件数（検証モードの結果の集計用）
+codec_stats = {"fast": 0, "fallback": 0, "verified": 0, "mismatches": 0}
+
+
+def get_backend():
+    """使用するバックエンド名（"orjson" または "json"）を返す"""
+    backend = os.getenv(BACKEND_ENV, 'auto').lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"{BACKEND_ENV} は {', '.join(BACKENDS)} のいずれかを指定してください: {backend}")
+    if backend == 'orjson' and orjson is None:
+        raise ImportError(f"{BACKEND_ENV}=orjson が指定されましたが、orjson がインストールされていません")
+    if backend == 'auto':
+        return 'orjson' if orjson is not None else 'json'
+    return backend
+
+
+def is_verify_enabled():
+    return os.getenv(VERIFY_ENV, '') not in ('', '0')
+
+
+def configure(backend=None, verify=None):
+    """
+    バックエンド・検証モードを設定する。
+    環境変数として設定するため、この後に起動したワーカープロセスにも引き継がれる。
+    """
+    if backend is not None:
+        os.environ[BACKEND_ENV] = backend
+        get_backend()  # 指定できない値の場合はここでエラーにする
+    if verify is not None:
+        os.environ[VERIFY_ENV] = '1' if verify else '0'
+
+
+def json_loads(data):
+    """標準ライブラリでデコード（bytes の場合は従来どおり UTF-8 として読み込む）"""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def json_dumps(obj):
+    """標準ライブラリでエンコード（ensure_ascii=False, indent=2）"""
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def record_mismatch(kind):
+    codec_stats["mismatches"] += 1
+    print(f"JSON codec mismatch ({kind}): orjson の結果が標準ライブラリと一致しないため、標準ライブラリの結果を使用します")
+
+
+def loads(data):
+    """JSONのテキスト（str または UTF-8 の bytes）をデコードする"""
+    if get_backend() != 'orjson' or not isinstance(data, bytes):
+        return json_loads(data)
+
+    if LONG_NUMBER in data.translate(DIGIT_TABLE):
+        codec_stats["fallback"] += 1
+        return json_loads(data)
+    try:
+        result = orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # NaN・BOM・対になっていないサロゲート文字など（不正なJSONの場合は標準ライブラリのエラーになる）
+        codec_stats["fallback"] += 1
+        return json_loads(data)
+    codec_stats["fast"] += 1
+
+    if is_verify_enabled():
+        expected = json_loads(data)
+        codec_stats["verified"] += 1
+        if result != expected:
+            record_mismatch("loads")
+            return expected
+    return result
+
+
+def has_unsafe_scalar(encoded):
+    """orjson の出力に標準ライブラリと表記が異なり得る値が含まれるか（文字列内の一致も含むため、偽陽性あり）"""
+    if b'null' in encoded:
+        return True
+    for match in EXPONENT_CANDIDATE_PATTERN.finditer(encoded):
+        if encoded[match.start() - 1:match.start()].isdigit():
+            return True
+    return False
+
+
+def dumps(obj):
+    """json.dumps(obj, ensure_ascii=False, indent=2) と同じテキストを返す"""
+    if get_backend() != 'orjson':
+        return json_dumps(obj)
+
+    try:
+        encoded = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    except TypeError:
+        # 64ビットを超える整数・サロゲート文字・文字列以外のキーなど
+        codec_stats["fallback"] += 1
+        return json_dumps(obj)
+    if has_unsafe_scalar(encoded):
+        codec_stats["fallback"] += 1
+        return json_dumps(obj)
+    result = encoded.decode('utf-8')
+    codec_stats["fast"] += 1
+
+    if is_verify_enabled():
+        expected = json_dumps(obj)
+        codec_stats["verified"] += 1
+        if result != expected:
+            record_mismatch("dumps")
+            return expected
+    return result
+
+
+def load_file(file_path):
+    """JSONファイルを読み込む（json.load(open(file_path, encoding='utf-8')) と同じ結果）"""
+    with open(file_path, 'rb') as f:
+        return loads(f.read())
+
+
+def get_codec_stats():
+    """このプロセスで処理した件数のコピー"""
+    return dict(codec_stats)
+
+
+def diff_codec_stats(before, after):
+    """get_codec_stats() の2時点の差（その区間で処理した件数）"""
+    return {key: after[key] - before[key] for key in codec_stats}
+
+
+def add_codec_stats(total, stats):
+    """処理した件数を合算する（ワーカープロセスの結果の集計用）"""
+    return {key: total[key] + stats[key] for key in codec_stats}
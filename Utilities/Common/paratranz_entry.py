@@ -0,0 +1,147 @@
+"""
+ParaTranz のエントリの分解
+=====================================
+
+【概要】
+JP_TRImporter / ParaTranz_Divider で共通して使う、ParaTranz のエントリ（original / translation / context）を
+本文・KRコメント・JPコメント・原文（context）に分けるモジュールです。
+正規表現は使わず、区切り文字の位置を str.find で順に探して1回の走査で分けます。
+
+【エントリの形式】
+- original / translation : "本文\\n<CMT_KR>KRコメント\\n<CMT_JP>JPコメント"（"\\n" は改行に置き換えてから分ける）
+  * 本文      : 最初の "<CMT_" より前（直前の改行1つを除く）
+  * コメント  : "<CMT_KR>" / "<CMT_JP>" で区切った2番目・3番目の部分（区切りの種類ではなく順番で判定）
+- context             : "KR:\\n原文\\nEN:\\n英語の原文"
+  * 原文      : 最初の "KR:" / "EN:" の後から次の "KR:" / "EN:" まで（従来どおり "\\n" は置き換えずに区切る）
+  * KR / EN   : split_context のみ、JP_LangJsonGenerator の形式（"KR:\\n" で始まり、EN は "\\nEN:\\n" の後）で両方を取り出す
+
+split_context 以外は、従来の正規表現による処理（JP_TRImporter の regex.sub / regex.split）と同じ結果になります。
+
+【メモリ上の形式】
+ParaTranzEntry は1エントリ分の分解結果を __slots__ の属性で持ちます（エントリごとの属性の辞書を作らない）。
+コメント・原文が空のエントリは空文字列（すべてのエントリで共有される同じオブジェクト）を格納します。
+"""
+
+
+COMMENT_PREFIX = '<CMT_'
+COMMENT_MARKERS = ('<CMT_KR>', '<CMT_JP>')
+COMMENT_MARKER_LENGTH = 8
+CONTEXT_MARKERS = ('KR:', 'EN:')
+CONTEXT_MARKER_LENGTH = 3
+CONTEXT_HEADERS = ('KR:\n', 'EN:\n')
+CONTEXT_EN_SEPARATOR = '\nEN:\n'
+
+
+def split_comments(text):
+    """
+    original / translation を本文・KRコメント・JPコメントに分ける。
+
+    Returns:
+        tuple: (本文, KRコメント, JPコメント)。コメントの区切りが2つ未満の場合、コメントは空文字列。
+    """
+    text = text.replace('\\n', '\n')
+    body_end = -1
+    markers = []
+    pos = text.find(COMMENT_PREFIX)
+    while pos != -1:
+        if body_end == -1:
+            body_end = pos - 1 if pos > 0 and text[pos - 1] == '\n' else pos
+        if text.startswith(COMMENT_MARKERS, pos):
+            markers.append(pos)
+            if len(markers) == 3:
+                break
+        pos = text.find(COMMENT_PREFIX, pos + 1)
+
+    body = text if body_end == -1 else text[:body_end]
+    if len(markers) < 2:
+        return body, "", ""
+    comment_end = markers[2] if len(markers) == 3 else len(text)
+    cmt_kr = text[markers[0] + COMMENT_MARKER_LENGTH:markers[1]].removesuffix('\n')
+    cmt_jp = text[markers[1] + COMMENT_MARKER_LENGTH:comment_end].removesuffix('\n')
+    return body, cmt_kr, cmt_jp
+
+
+def strip_comments(text):
+    """original / translation の本文のみを返す（split_comments の本文と同じ）"""
+    text = text.replace('\\n', '\n')
+    pos = text.find(COMMENT_PREFIX)
+    if pos == -1:
+        return text
+    return text[:pos - 1] if pos > 0 and text[pos - 1] == '\n' else text[:pos]
+
+
+def find_context_marker(context, start):
+    """start 以降で最初の "KR:" / "EN:" の位置（ない場合は -1）"""
+    kr_pos = context.find(CONTEXT_MARKERS[0], start)
+    en_pos = context.find(CONTEXT_MARKERS[1], start)
+    if kr_pos == -1 or (en_pos != -1 and en_pos < kr_pos):
+        return en_pos
+    return kr_pos
+
+
+def extract_source(context):
+    """context から原文を取り出す（"KR:" / "EN:" がない場合は空文字列）"""
+    pos = find_context_marker(context, 0)
+    if pos == -1:
+        return ""
+    start = pos + CONTEXT_MARKER_LENGTH
+    if context.startswith('\n', start):
+        start += 1
+    end = find_context_marker(context, start)
+    source = context[start:] if end == -1 else context[start:end]
+    return source.removesuffix('\n')
+
+
+def split_context(context):
+    """
+    context を KR・EN の原文に分ける（JP_LangJsonGenerator が書き出した形式）
+
+    Returns:
+        tuple: (KRの原文, ENの原文)。ない方は空文字列。
+    """
+    if context.startswith(CONTEXT_HEADERS[1]):
+        return "", context[len(CONTEXT_HEADERS[1]):]
+    if not context.startswith(CONTEXT_HEADERS[0]):
+        return "", ""
+    body = context[len(CONTEXT_HEADERS[0]):]
+    pos = body.find(CONTEXT_EN_SEPARATOR)
+    if pos == -1:
+        return body, ""
+    return body[:pos], body[pos + len(CONTEXT_EN_SEPARATOR):]
+
+
+def parse_entry(item):
+    """
+    ParaTranz のエントリを分解する。
+
+    Returns:
+        tuple: (原文の本文, 翻訳文の本文, 原文（context がない場合は None）, KRコメント, JPコメント)。
+    """
+    translation, cmt_kr, cmt_jp = split_comments(item["translation"])
+    context = item.get("context")
+    source = None if context is None else extract_source(context)
+    return strip_comments(item["original"]), translation, source, cmt_kr, cmt_jp
+
+
+class ParaTranzEntry:
+    """1エントリ分の分解結果（原文がない場合の source は空文字列）"""
+    __slots__ = ('original', 'translation', 'source', 'cmt_kr', 'cmt_jp')
+
+    def __init__(self, original, translation, source, cmt_kr, cmt_jp):
+        self.original = original
+        self.translation = translation
+        self.source = source
+        self.cmt_kr = cmt_kr
+        self.cmt_jp = cmt_jp
+
+    def has_comment(self):
+        return bool(self.cmt_kr or self.cmt_jp)
+
+
+def load_entries(data):
+    """ParaTranz のファイル（エントリのリスト）を {key: ParaTranzEntry} にする"""
+    entries = {}
+    for item in data:
+        original, translation, source, cmt_kr, cmt_jp = parse_entry(item)
+        entries[item["key"]] = ParaTranzEntry(original, translation, source or "", cmt_kr, cmt_jp)
+    return entries
@@ -0,0 +1,98 @@
+"""
+ParaTranz のエクスポートの読み込み
+=====================================
+
+【概要】
+JP_TRImporter / JP_TextSearch / JP_ConsistencyCheck / JP_GlossaryCheck で共通して使う、
+ParaTranz のエクスポート（展開済みのフォルダ、または zip ファイル）から翻訳ファイルを読み込む処理です。
+zip の場合はディスクに展開せず、utf8/jp/ 以下の JSON を直接読み込みます。
+
+【読み込み元の指定】
+- zip ファイル: zip 内の utf8/jp/ 以下の JSON
+- フォルダ: フォルダ内に utf8/jp がある場合はその中、ない場合は（utf8/jp を直接指定したものとして）フォルダ内の JSON
+
+【使い方】
+for rel_path, location in iter_paratranz_locations(source):   # 内容は読み込まない
+    content = read_paratranz_file(location)                  # bytes
+close_paratranz_archives()                                   # 読み込みの終了後に zip を閉じる
+
+with open_paratranz_files(source) as files:                  # {相対パス: 内容を読み込む関数}
+    content = files["StoryData/xxx.json"]()
+"""
+
+import os
+import zipfile
+from contextlib import contextmanager
+
+
+# エクスポート内の翻訳ファイルの格納先
+ARCHIVE_TRANSLATION_PREFIX = 'utf8/jp/'
+
+
+def find_translation_dir(translation_source):
+    """展開済みのフォルダ内の翻訳ファイルの格納先（utf8/jp がない場合は指定したフォルダ）"""
+    translation_dir = os.path.join(translation_source, *ARCHIVE_TRANSLATION_PREFIX.strip('/').split('/'))
+    return translation_dir if os.path.isdir(translation_dir) else translation_source
+
+
+def iter_paratranz_locations(translation_source):
+    """翻訳ファイルを (相対パス, 読み込み位置) として列挙する（内容は読み込まない）
+
+    相対パスは utf8/jp/ からの / 区切りのパス。
+    読み込み位置は (zip ファイルのパス, zip 内のパス) または (None, ファイルのパス)。
+    """
+    if zipfile.is_zipfile(translation_source):
+        with zipfile.ZipFile(translation_source, 'r') as zip_ref:
+            for info in zip_ref.infolist():
+                name = info.filename
+                if info.is_dir() or not name.startswith(ARCHIVE_TRANSLATION_PREFIX) or not name.endswith(".json"):
+                    continue
+                yield name[len(ARCHIVE_TRANSLATION_PREFIX):], (translation_source, name)
+    else:
+        translation_dir = find_translation_dir(translation_source)
+        for root, _, files in os.walk(translation_dir):
+            for filename in [f for f in files if f.endswith(".json")]:
+                file_path = os.path.join(root, filename)
+                yield os.path.relpath(file_path, translation_dir).replace('\\', '/'), (None, file_path)
+
+
+# read_paratranz_file で開いた zip（(PID, zip ファイルのパス) をキーにしてプロセス内で再利用）
+open_archives = {}
+
+def read_paratranz_file(location):
+    """読み込み位置の翻訳ファイルの内容を返す（zip の場合はディスクに展開せず直接読み込む）"""
+    archive_path, name = location
+    if archive_path is None:
+        with open(name, 'rb') as f:
+            return f.read()
+    # zip はプロセスごとに1回だけ開く（fork したワーカーと親でファイルの読み込み位置を共有しないよう PID で区別）
+    archive_key = (os.getpid(), archive_path)
+    archive = open_archives.get(archive_key)
+    if archive is None:
+        archive = open_archives[archive_key] = zipfile.ZipFile(archive_path, 'r')
+    return archive.read(name)
+
+
+def close_paratranz_archives():
+    """read_paratranz_file で開いた zip を閉じる"""
+    for archive in open_archives.values():
+        archive.close()
+    open_archives.clear()
+
+
+def iter_paratranz_files(translation_source):
+    """翻訳ファイルを (相対パス, 内容を読み込む関数) として列挙する"""
+    for rel_path, location in iter_paratranz_locations(translation_source):
+        yield rel_path, (lambda location=location: read_paratranz_file(location))
+
+
+@contextmanager
+def open_paratranz_files(translation_source):
+    """翻訳ファイルを {相対パス: 内容を読み込む関数} として返し、終了時に zip を閉じる（指定がない場合は空）"""
+    if not translation_source:
+        yield {}
+        return
+    try:
+        yield dict(iter_paratranz_files(translation_source))
+    finally:
+        close_paratranz_archives()
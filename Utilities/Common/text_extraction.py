@@ -0,0 +1,255 @@
+"""
+共通テキスト抽出エンジン
+=====================================
+
+【概要】
+JP_TRImporter / JP_GameTextMerger / JP_LangJsonGenerator で共通して使う、
+ゲームのJSONファイルからテキストとキー（"{ID}-{パス}"）を抽出する処理をまとめたモジュールです。
+再帰呼び出しや部分結果のマージを行わず、明示的なスタックで文書順に走査します。
+
+【提供する機能】
+- iter_leaves            : JSONツリーの末端の値を (親, キー, パス, ID, 値) として文書順に列挙
+- extract_target_values  : TARGET_KEYS に該当するテキストを {キー: テキスト} として抽出
+- KeyPolicy              : キーの生成規則（ルートIDの決め方・重複時の扱いなど）の基底クラス
+  * DupSuffixKeyPolicy   : 重複キーに -dupN を付加（JP_LangJsonGenerator）
+  * UniqueRootIdKeyPolicy: ルートIDに #N の連番を付加（JP_GameTextMerger）
+
+【パスの表記】
+- 辞書のキー : "親パス.キー"（最上位ではキーのみ）
+- リスト要素 : "親パス[インデックス]"
+- dataList 直下の要素はインデックスを含めない
+"""
+
+from collections import OrderedDict
+
+
+def join_key_path(path, key):
+    """辞書のキーをパスに連結"""
+    return f"{path}.{key}" if path else key
+
+
+def join_index_path(path, index):
+    """リストのインデックスをパスに連結"""
+    return f"{path}[{index}]"
+
+
+def iter_leaves(obj, entry_id=None, path="", track_id=False, path_prefixes=None):
+    """
+    JSONツリーの末端（辞書・リスト以外）の値を文書順に列挙する。
+
+    Parameters:
+        obj: 走査するJSONオブジェクト。
+        entry_id: 走査開始時点のID。
+        path (str): 走査開始時点のパス。
+        track_id (bool): True の場合、辞書内で "id" キーに出会った時点で以降の兄弟要素と
+                         その子孫のIDを更新する。
+        path_prefixes (set): 指定した場合、この集合に含まれるパスの子要素のみ走査する。
+
+    Yields:
+        tuple: (親の辞書/リスト, キー/インデックス, パス, ID, 値)。
+               obj 自体が末端の場合、親とキーは None。
+    """
+    if not isinstance(obj, (dict, list)):
+        yield None, None, path, entry_id, obj
+        return
+
+    # (子要素のイテレータ, 親, パス, ID) のスタック
+    stack = [(iter(obj.items()) if isinstance(obj, dict) else enumerate(obj), obj, path, entry_id)]
+    while stack:
+        items, parent, parent_path, current_id = stack[-1]
+        for k, v in items:
+            if isinstance(parent, dict):
+                new_path = join_key_path(parent_path, k)
+                if track_id and k == "id":
+                    current_id = v
+                    stack[-1] = (items, parent, parent_path, current_id)
+            else:
+                new_path = join_index_path(parent_path, k)
+
+            if path_prefixes is not None and new_path not in path_prefixes:
+                continue
+
+            if isinstance(v, dict):
+                stack.append((iter(v.items()), v, new_path, current_id))
+                break
+            if isinstance(v, list):
+                stack.append((enumerate(v), v, new_path, current_id))
+                break
+            yield parent, k, new_path, current_id, v
+        else:
+            stack.pop()
+
+
+class KeyPolicy:
+    """
+    extract_target_values で使うキーの生成規則の基底クラス。
+    サブクラスでルートIDの決め方、値の変換、重複時の扱いなどを上書きする。
+    """
+
+    def __init__(self, target_keys):
+        self.target_keys = target_keys
+
+    def root_id_for(self, data, root_id):
+        """辞書を走査する際のルートIDを返す（親から引き継いだIDがなければ "id" から決定）"""
+        if root_id is None and "id" in data:
+            return str(data["id"])
+        return root_id
+
+    def skip_entry(self, root_id):
+        """True を返した場合、そのエントリ（辞書）を抽出対象から除外する"""
+        return False
+
+    def transform(self, key, value, root_id, entry):
+        """対象キーのテキストを出力用に変換する（entry はテキストを持つ辞書）"""
+        return value
+
+    def store(self, values, final_key, value, root_id):
+        """抽出したテキストを格納する（既定では上書き）"""
+        values[final_key] = value
+
+    def on_array(self, root_id):
+        """エントリ内でリストに出会った際に呼ばれる"""
+        pass
+
+
+class DupSuffixKeyPolicy(KeyPolicy):
+    """
+    JP_LangJsonGenerator 用のキー規則。
+    - ID が "-1" のエントリは抽出しない
+    - 同じキーが再び現れた場合、値が異なれば "-dupN" を付加したキーで格納する
+      （N はそのキーの重複回数。値が同じ場合も回数は数える）
+    """
+
+    def __init__(self, target_keys):
+        super().__init__(target_keys)
+        self.key_counts = {}
+
+    def skip_entry(self, root_id):
+        return root_id == "-1"
+
+    def store(self, values, final_key, value, root_id):
+        if final_key in values:
+            count = self.key_counts.get(final_key, 0) + 1
+            self.key_counts[final_key] = count
+            # 値が異なる場合のみ接尾辞を付加（同じ場合は既存のエントリを保持）
+            if values[final_key] != value:
+                values[f"{final_key}-dup{count}"] = value
+        else:
+            values[final_key] = value
+
+
+class UniqueRootIdKeyPolicy(KeyPolicy):
+    """
+    JP_GameTextMerger 用のキー規則。
+    - ルートIDに "#N" の連番を付加し、同じIDのエントリも別々に扱う
+    - ルートIDが "-1" で始まるエントリのテキストは "// " でコメントアウトする
+    - ルートIDごとのキー順序と、リストを含むかどうかを記録する
+    """
+
+    def __init__(self, target_keys, value_transform=None):
+        super().__init__(target_keys)
+        self.value_transform = value_transform
+        self.root_id_map = {}  # {original_id: count}
+        self.id_key_order = {}  # {root_id: [final_key, ...]}
+        self.id_has_array = {}  # {root_id: True}
+
+    def root_id_for(self, data, root_id):
+        current_id = data.get("id")
+        if root_id is None and current_id is not None:
+            original_id = str(current_id)
+            count = self.root_id_map.get(original_id, 0) + 1
+            self.root_id_map[original_id] = count
+            return f"{original_id}#{count}"
+        return root_id
+
+    def transform(self, key, value, root_id, entry):
+        if self.value_transform:
+            value = self.value_transform(key, value)
+        # コメントアウト処理（root_id が -1 の場合）
+        if root_id and root_id.startswith('-1'):
+            value = f"// {value}"
+        return value
+
+    def store(self, values, final_key, value, root_id):
+        values[final_key] = value
+        if root_id:
+            self.id_key_order.setdefault(root_id, []).append(final_key)
+
+    def on_array(self, root_id):
+        if root_id:
+            self.id_has_array[root_id] = True
+
+
+def extract_target_values(data, policy, root_id=None, path="", skip_top_dataList=True, in_dataList=False):
+    """
+    JSONデータから対象キーのテキストを {キー: テキスト} として文書順に抽出する。
+
+    - 最上位の dataList は各要素をエントリとして扱い、パスにインデックスを含めない
+    - ネストされた "id" キーは無視する
+    - 辞書内の文字列は policy.target_keys に含まれるキーのみ、リスト内の文字列はすべて抽出する
+    - キーは "{ルートID}-{パス}"（ルートIDがない場合はパスのみ）
+    """
+    values = OrderedDict()
+
+    def new_frame(obj, frame_root_id, frame_path, frame_skip_top, frame_in_dataList):
+        """走査フレームを作成（除外対象・末端の場合は None）"""
+        if isinstance(obj, dict):
+            frame_root_id = policy.root_id_for(obj, frame_root_id)
+            if policy.skip_entry(frame_root_id):
+                return None
+            return (iter(obj.items()), obj, True, frame_root_id, frame_path, frame_skip_top, frame_in_dataList)
+        if isinstance(obj, list):
+            policy.on_array(frame_root_id)
+            return (enumerate(obj), obj, False, frame_root_id, frame_path, frame_skip_top, frame_in_dataList)
+        return None
+
+    frame = new_frame(data, root_id, path, skip_top_dataList, in_dataList)
+    stack = [frame] if frame else []
+
+    while stack:
+        items, container, is_dict, current_root_id, current_path, skip_top, in_list = stack[-1]
+        child = None
+        for key, val in items:
+            if is_dict:
+                if key == "id" and current_path != "":
+                    continue  # ネストされた "id" は無視
+                # "dataList" のキーは最上位でのみ特別扱い
+                if skip_top and current_path == "" and key == "dataList":
+                    child = new_frame(val, current_root_id, "", False, True)
+                    if child:
+                        break
+                    continue
+
+                new_path = join_key_path(current_path, key)
+                if isinstance(val, str) and key in policy.target_keys:
+                    val = policy.transform(key, val, current_root_id, container)
+                    final_key = f"{current_root_id}-{new_path}" if current_root_id else new_path
+                    policy.store(values, final_key, val, current_root_id)
+                    continue
+
+                child = new_frame(val, current_root_id, new_path, False, False)
+                if child:
+                    break
+            else:
+                if isinstance(val, str):
+                    if current_path:
+                        item_path = join_index_path(current_path, key)
+                        final_key = f"{current_root_id}-{item_path}" if current_root_id else item_path
+                        policy.store(values, final_key, val, current_root_id)
+                    continue
+
+                # dataList直下の項目ではインデックスを含めない
+                if in_list:
+                    child = new_frame(val, current_root_id, current_path, False, False)
+                else:
+                    item_path = join_index_path(current_path, key) if current_path else f"[{key}]"
+                    child = new_frame(val, current_root_id, item_path, False, False)
+                if child:
+                    break
+
+        if child:
+            stack.append(child)
+        else:
+            stack.pop()
+
+    return values
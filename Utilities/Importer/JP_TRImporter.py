@@ -9,6 +9,27 @@ import csv
 import zipfile
 import glob
 import requests
+import sys
+import posixpath
+import hashlib
+from bisect import bisect_right
+import time
+import argparse
+import cProfile
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows では使用できないため、ピークRSSは記録しない
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from text_extraction import iter_leaves
+import json_codec
+from paratranz_entry import load_entries
+from paratranz_source import (ARCHIVE_TRANSLATION_PREFIX, iter_paratranz_locations, read_paratranz_file,
+                              close_paratranz_archives, iter_paratranz_files)
+from report_store import ReportStore, REPORT_HEADER
 
 
 # ローカルで実行する場合は True にすること
@@ -27,6 +48,17 @@ if not LOCAL_MODE:
 IN_DIR_INPUT = os.path.join('Localize', 'jp')
 IN_DIR_ARCHIVE = os.path.join('paratranz')
 
+# ParaTranz API 設定
+PARATRANZ_API_URL = os.getenv('PARATRANZ_API_URL', 'https://paratranz.cn/api')
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = (10, 120)  # (接続, 読み込み) のタイムアウト秒数
+DOWNLOAD_MAX_RETRIES = 5
+DOWNLOAD_BACKOFF_SECONDS = 2  # リトライ間隔（試行ごとに倍増）
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 前回取得したアーティファクトの ETag / Last-Modified / ハッシュの記録
+ARTIFACT_CACHE_FILE = 'paratranz_artifact_cache.json'
+
 # 出力ディレクトリ設定
 OUT_DIR_ROOT = 'Localize_Fixed'
 OUT_DIR_JP_FIXED = os.path.join('Localize_Fixed', 'jp_fixed')
@@ -35,6 +67,27 @@ OUT_DIR_JP_MOD = os.path.join('Localize_Fixed', 'jp_mod')
 
 REPORT_FILES = {'general': 'report_general.csv', 'story': "report_storydata.csv"}
 
+# レポート行の現在の内容と履歴を保持するストア（レポートはここから書き出す）
+REPORT_STORE_FILE = 'report_store.sqlite3'
+
+# 差分更新（--incremental）用のマニフェスト（入力ファイルのハッシュを記録）
+MANIFEST_FILE = 'importer_manifest.json'
+
+# 出力に影響するファイル（このスクリプトと、読み込んでいる共通モジュール・レポートのストア）
+# いずれかが変更された場合、差分更新でも全ファイルを処理する
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common')
+TOOL_FILES = (
+    os.path.abspath(__file__),
+    os.path.join(COMMON_DIR, 'text_extraction.py'),
+    os.path.join(COMMON_DIR, 'json_codec.py'),
+    os.path.join(COMMON_DIR, 'paratranz_entry.py'),
+    os.path.join(COMMON_DIR, 'paratranz_source.py'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report_store.py'),
+)
+
+# 処理段階ごとの計測結果に含める、処理時間の長いファイルの数
+SLOWEST_FILES_COUNT = 10
+
 # ---------------------------------------------------
 
 
@@ -61,16 +114,66 @@ JP - ParaTranz Translation Importer
   2. 以下のディレクトリ構成を準備:
      - Localize/jp/           : 元のJSONファイル
      - paratranz/             : ParaTranzから手動ダウンロードした翻訳アーカイブ（zip）をこの中に配置
-  3. python JP_TRImporter.py で実行
+  3. python JP_TRImporter.py で実行（--jobs N を指定するとN並列でファイルを処理）
+     --no-extract を指定するとアーカイブを展開せず、zip内の utf8/jp/*.json を直接読み込みます
+     （ワークフローでは展開した paratranz/utf8/jp をコミットし、Misc のツールが読み込むため --no-extract は使わない）
+
+■ 差分更新（--incremental）:
+  前回実行時の入力ハッシュを importer_manifest.json に記録しておき、
+  元のJSONまたは対応するParaTranzファイルが変更されたファイルのみを再出力します。
+  元のJSONが削除されたファイルは出力からも削除されます。
+  マニフェストが無い場合やこのスクリプト・読み込んでいるモジュール（Utilities/Common, report_store.py）が変更された場合は全ファイルを処理します。
+
+■ JSONのバックエンド（--json-backend / --verify-codec）:
+  orjson がインストールされていれば、翻訳ファイルの読み込みと翻訳済みJSONのシリアライズに使用します
+  （出力は標準ライブラリの json と同一のバイト列。表記が異なり得るデータは標準ライブラリで処理）。
+  --verify-codec を指定すると orjson の結果をすべて標準ライブラリの結果と比較し、
+  不一致があった場合は標準ライブラリの結果を出力した上で終了コード 1 で終了します。
+
+■ 計測（--metrics / --profile）:
+  処理段階（ダウンロード・展開・翻訳読み込み・ファイル処理・レポート出力など）ごとの実時間・CPU時間・ピークRSSと、
+  ファイル単位の段階（読み込み・デコード・書式収集・翻訳適用・シリアライズ・インデント・書き出し・レポート行）の
+  合計時間、処理時間の長いファイルを実行終了時に表示します。
+  --metrics FILE を指定すると同じ内容を JSON lines で追記し、--profile FILE で cProfile の結果を出力します。
 
 【出力】
 - Localize_Fixed/jp_fixed/  : 翻訳が適用されたJSONファイル
 - Localize_Fixed/jp_mod/    : MOD用JSONファイル（JP_プレフィックス除去）
 - report_general.csv        : レポート
 - report_storydata.csv      : ストーリー関連用レポート
+- report_store.sqlite3      : レポート行の現在の内容と履歴（report_store.py で検索可能）
+  リポジトリにはコミットせず、ワークフローではキャッシュとアーティファクトで次回の実行に引き継ぎます
+  （失われた場合は既存のレポートの行と 갱신 시각 を取り込んで作り直し、履歴のみ失われます）
+- importer_manifest.json    : 差分更新用のマニフェスト
+- paratranz_artifact_cache.json : 前回取得したアーティファクトの記録（ETag等）
+  ワークフロー実行時、元ファイルとアーティファクトが前回から変更されていなければ処理せずに終了します（--force で無効化）
 
 """
 
+def find_latest_archive():
+    """IN_DIR_ARCHIVE内の最新のzipファイルのパスを返す"""
+    # zipファイルを検索
+    zip_pattern = os.path.join(IN_DIR_ARCHIVE, '*.zip')
+    zip_files = glob.glob(zip_pattern)
+
+    if not zip_files:
+        raise FileNotFoundError(f"No zip files found in {IN_DIR_ARCHIVE}")
+
+    # 最新のzipファイルを取得
+    return max(zip_files, key=os.path.getmtime)
+
+
+def open_latest_archive():
+    """最新のzipファイルを展開せずに翻訳ファイルの読み込み元として返す"""
+    latest_zip = find_latest_archive()
+    print(f"Reading latest archive without extraction: {latest_zip}")
+
+    with zipfile.ZipFile(latest_zip, 'r') as zip_ref:
+        if not any(name.startswith(ARCHIVE_TRANSLATION_PREFIX) for name in zip_ref.namelist()):
+            raise FileNotFoundError(f"Expected translation directory not found in archive: {ARCHIVE_TRANSLATION_PREFIX}")
+    return latest_zip
+
+
 def extract_latest_archive():
     """IN_DIR_ARCHIVE内の最新のzipファイルを展開"""
     # アーカイブディレクトリの中身をクリア（ディレクトリが存在する場合）
@@ -83,15 +186,7 @@ def extract_latest_archive():
     else:
         os.makedirs(IN_DIR_ARCHIVE, exist_ok=True)
 
-    # zipファイルを検索
-    zip_pattern = os.path.join(IN_DIR_ARCHIVE, '*.zip')
-    zip_files = glob.glob(zip_pattern)
-    
-    if not zip_files:
-        raise FileNotFoundError(f"No zip files found in {IN_DIR_ARCHIVE}")
-    
-    # 最新のzipファイルを取得
-    latest_zip = max(zip_files, key=os.path.getmtime)
+    latest_zip = find_latest_archive()
     print(f"Extracting latest archive: {latest_zip}")
     
     # zipファイルを展開
@@ -108,111 +203,51 @@ def extract_latest_archive():
     return extracted_translation_dir
 
 
-def load_translations_and_comments_by_filename(paratranz_dir):
-    """翻訳ファイルから原文、翻訳文、コメントを読み込む"""
-    originals_by_file = {}
-    translations_by_file = {}
-    sources_by_file = {}
-    comments_by_file = {}
-    
-    # 正規表現パターンを事前コンパイル
-    translation_pattern = regex.compile(r'\n?<CMT_.*$', regex.MULTILINE | regex.DOTALL)
-    context_pattern = regex.compile(r"KR:\n?|EN:\n?")
-    comment_pattern = regex.compile(r"<CMT_KR>|<CMT_JP>")
-    
-    for root, dirs, files in os.walk(paratranz_dir):
-        for filename in [f for f in files if f.endswith(".json")]:
-            full_path = os.path.join(root, filename)
-            
-            with open(full_path, encoding='utf-8') as f:
-                data = json.load(f)
-                originals = {}
-                translations = {}
-                sources = {}
-                comments = {}
-
-                for item in data:
-                    key = item["key"]
-                    # 原文処理
-                    original = item["original"].replace('\\n', '\n')
-                    original = regex.sub(translation_pattern, '', original)
-                    originals[key] = original
-                    
-                    # 翻訳文処理
-                    translation = item["translation"].replace('\\n', '\n')
-                    translation = regex.sub(translation_pattern, '', translation)
-                    translations[key] = translation
-                    
-                    # コンテキスト処理
-                    context = item.get("context")
-                    if not context == None:
-                        context = context.replace('\\n', '\n')
-                        parts = regex.split(context_pattern, item["context"])
-                        sources[key] = parts[1].removesuffix('\n') if len(parts) > 1 else ""
-                    
-                    # コメント処理
-                    parts = regex.split(comment_pattern, item["translation"].replace('\\n', '\n'))
-                    if len(parts) >= 3:
-                        comments[key] = {
-                            "CMT_KR": parts[1].removesuffix('\n'),
-                            "CMT_JP": parts[2].removesuffix('\n')
-                        }
-                    else:
-                        comments[key] = {"CMT_KR": "", "CMT_JP": ""}
-
-                basename = "JP_" + os.path.splitext(filename)[0]
-                originals_by_file[basename] = originals
-                translations_by_file[basename] = translations
-                sources_by_file[basename] = sources
-                comments_by_file[basename] = comments
-
-    return originals_by_file, translations_by_file, sources_by_file, comments_by_file
-
-def load_original_entries(input_root):
-    """元のJSONファイルからテキストエントリを読み込む"""
-    original_formats = {}
+def index_paratranz_files(translation_source):
+    """翻訳ファイルの読み込み位置を、元ファイルと同じ basename（JP_ 付き）をキーにして返す"""
+    locations = {}
+    for rel_path, location in iter_paratranz_locations(translation_source):
+        locations["JP_" + os.path.splitext(posixpath.basename(rel_path))[0]] = location
+    return locations
+
+def load_paratranz_entries(location):
+    """1ファイル分の翻訳ファイルを読み込み、{キー: ParaTranzEntry} を返す（翻訳ファイルがない場合は空）"""
+    if location is None:
+        return {}
+    # 原文・翻訳文・コンテキスト・コメントを1回の走査で分解
+    return load_entries(json_codec.loads(read_paratranz_file(location)))
+
+def collect_file_formats(data):
+    """パース済みのJSONからテキストの書式情報（先頭・末尾の空白文字）を収集"""
+    file_formats = {}
     # 先頭・末尾の空白文字検出用正規表現
     leading_pattern = regex.compile(r'^([\n　 ]+)')
     trailing_pattern = regex.compile(r'([\n　 ]+)$')
-    
-    for root, _, files in os.walk(input_root):
-        for filename in [f for f in files if f.endswith(".json")]:
-            input_path = os.path.join(root, filename)
-            basename = os.path.splitext(filename)[0]
-            
-            with open(input_path, 'r', encoding='utf-8') as f:
-                try:
-                    data = json.load(f)
-                    if "dataList" in data:
-                        file_formats = {}
-                        for item in data["dataList"]:
-                            entry_id = item.get("id")
-                            if entry_id:
-                                collect_text_formats(item, file_formats, entry_id, 
-                                                   leading_pattern, trailing_pattern)
-                        original_formats[basename] = file_formats
-                except json.JSONDecodeError:
-                    print(f"Error loading JSON from {input_path}")
-                    continue
-    
-    return original_formats
+
+    if "dataList" in data:
+        for item in data["dataList"]:
+            entry_id = item.get("id")
+            if entry_id:
+                collect_text_formats(item, file_formats, entry_id,
+                                   leading_pattern, trailing_pattern)
+    return file_formats
+
+def estimate_formats_size(file_formats):
+    """書式情報の辞書が占めるおおよそのメモリ量（バイト）を返す"""
+    size = sys.getsizeof(file_formats)
+    for key, format_info in file_formats.items():
+        size += sys.getsizeof(key) + sys.getsizeof(format_info)
+        size += sum(sys.getsizeof(v) for v in format_info.values())
+    return size
 
 def collect_text_formats(obj, formats_dict, entry_id, leading_pattern, trailing_pattern, path=""):
-    """再帰的にオブジェクトを走査してテキストの書式情報を収集"""
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            new_path = f"{path}.{k}" if path else k
-            if k == "id":
-                entry_id = v
-            collect_text_formats(v, formats_dict, entry_id, leading_pattern, trailing_pattern, new_path)
-    elif isinstance(obj, list):
-        for i, item in enumerate(obj):
-            new_path = f"{path}[{i}]"
-            collect_text_formats(item, formats_dict, entry_id, leading_pattern, trailing_pattern, new_path)
-    elif isinstance(obj, str):
-        full_key = f"{entry_id}-{path}"
-        leading_match = regex.match(leading_pattern, obj)
-        trailing_match = regex.search(trailing_pattern, obj)
+    """オブジェクトを走査してテキストの書式情報を収集（ネストされた "id" でIDを更新）"""
+    for _, _, leaf_path, leaf_id, value in iter_leaves(obj, entry_id, path, track_id=True):
+        if not isinstance(value, str):
+            continue
+        full_key = f"{leaf_id}-{leaf_path}"
+        leading_match = regex.match(leading_pattern, value)
+        trailing_match = regex.search(trailing_pattern, value)
         leading = leading_match.group(1) if leading_match else ""
         trailing = trailing_match.group(1) if trailing_match else ""
         
@@ -236,124 +271,199 @@ def organize_duplicate_translations(translations):
     
     return organized_translations
 
-def apply_translation_to_obj(obj, translations, original_formats, organized_translations, entry_id, path="", dup_counters=None, filename=""):
-    """JSONオブジェクトに翻訳を適用"""
+def build_translation_path_index(translations, organized_translations, entry_ids):
+    """翻訳キーをエントリIDごとにまとめ、翻訳対象のパスとその親パスの集合を作成
+
+    キーは "{エントリID}-{パス}" の形式だが、IDにも "-" が含まれ得るため、
+    ファイル内に実在するIDと前方一致するものだけを採用する。
+    返り値は {エントリID文字列: パス集合}。集合に含まれないパスの部分木には翻訳対象が存在しない。
+    """
+    id_strs = {f"{entry_id}" for entry_id in entry_ids}
+    path_index = defaultdict(set)
+
+    for key in set(translations) | set(organized_translations):
+        pos = key.find('-')
+        while pos != -1:
+            id_str = key[:pos]
+            if id_str in id_strs:
+                path = key[pos + 1:]
+                path_prefixes = path_index[id_str]
+                path_prefixes.add(path)
+                # 親パス（"." または "[" の直前まで）も登録
+                for i, ch in enumerate(path):
+                    if ch == '.' or ch == '[':
+                        path_prefixes.add(path[:i])
+            pos = key.find('-', pos + 1)
+
+    return path_index
+
+def translate_text(full_key, translations, original_formats, organized_translations, dup_counters):
+    """キーに対応する翻訳文を返す（翻訳がない場合は None）"""
+    base_key = full_key
+
+    # 重複キーの処理
+    if base_key in organized_translations:
+        available_translations = organized_translations[base_key]
+        if available_translations:
+            dup_counters[base_key] += 1
+            counter = dup_counters[base_key]
+            if counter <= len(available_translations):
+                key, translated_text = available_translations[counter - 1]
+            else:
+                key, translated_text = available_translations[-1]
+
+            # 書式情報を適用
+            if full_key in original_formats:
+                format_info = original_formats[full_key]
+                return format_info.get("leading", "") + translated_text + format_info.get("trailing", "")
+
+            return translated_text
+    # 通常の翻訳処理
+    elif full_key in translations:
+        translated_text = translations[full_key]
+        if full_key in original_formats:
+            format_info = original_formats[full_key]
+            return format_info.get("leading", "") + translated_text + format_info.get("trailing", "")
+        return translated_text
+
+    return None
+
+def apply_translation_to_obj(obj, translations, original_formats, organized_translations, entry_id, path="", dup_counters=None, filename="", path_prefixes=None):
+    """JSONオブジェクトに翻訳を適用（path_prefixes 指定時は翻訳対象を含む部分木のみ走査）"""
     if dup_counters is None:
         dup_counters = defaultdict(int)
     
     # トップレベルのIDを取得
     if entry_id is None and isinstance(obj, dict) and path == "" and "id" in obj:
         entry_id = obj["id"]
-    
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            new_path = f"{path}.{k}" if path else k
-            obj[k] = apply_translation_to_obj(v, translations, original_formats, organized_translations, entry_id, new_path, dup_counters, filename)
-    elif isinstance(obj, list):
-        for i in range(len(obj)):
-            new_path = f"{path}[{i}]"
-            obj[i] = apply_translation_to_obj(obj[i], translations, original_formats, organized_translations, entry_id, new_path, dup_counters, filename)
-    elif isinstance(obj, str):
-        full_key = f"{entry_id}-{path}"
-        base_key = full_key
-        
-        # 重複キーの処理
-        if base_key in organized_translations:
-            available_translations = organized_translations[base_key]
-            if available_translations:
-                dup_counters[base_key] += 1
-                counter = dup_counters[base_key]
-                if counter <= len(available_translations):
-                    key, translated_text = available_translations[counter - 1]
-                else:
-                    key, translated_text = available_translations[-1]
-                
-                # 書式情報を適用
-                if full_key in original_formats:
-                    format_info = original_formats[full_key]
-                    return format_info.get("leading", "") + translated_text + format_info.get("trailing", "")
-
-                return translated_text
-        # 通常の翻訳処理
-        elif full_key in translations:
-            translated_text = translations[full_key]
-            if full_key in original_formats:
-                format_info = original_formats[full_key]
-                return format_info.get("leading", "") + translated_text + format_info.get("trailing", "")
+
+    for parent, k, leaf_path, _, value in iter_leaves(obj, entry_id, path, path_prefixes=path_prefixes):
+        if not isinstance(value, str):
+            continue
+        translated_text = translate_text(f"{entry_id}-{leaf_path}", translations, original_formats, organized_translations, dup_counters)
+        if translated_text is None:
+            continue
+        if parent is None:
             return translated_text
-    
+        parent[k] = translated_text
+
     return obj
 
-def collect_linewise_indents(file_path):
-    """元のJSONファイルの各行インデント（スペース数）を収集"""
+def read_source_text(file_path):
+    """元ファイルを1回だけ読み込み、改行を統一したテキストと末尾改行の有無を返す"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    has_trailing_newline = raw.endswith(b'\n')
+    # テキストモードでの読み込みと同じく、改行コードを \n に統一
+    text = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    return text, has_trailing_newline
+
+def split_lines_keepends(text):
+    """テキストを \n 区切りで行に分割（readlines と同じく改行を保持）"""
+    lines = [line + '\n' for line in text.split('\n')]
+    # 最終要素は改行を持たない（空の場合は行として扱わない）
+    last = lines.pop()[:-1]
+    if last:
+        lines.append(last)
+    return lines
+
+def collect_linewise_indents(source_text):
+    """元のJSONテキストの各行インデント（スペース数）を収集"""
     indents = []
-    with open(file_path, encoding='utf-8') as f:
-        for line in f:
-            leading_spaces = len(line) - len(line.lstrip(' '))
-            indents.append(leading_spaces)
+    for line in split_lines_keepends(source_text):
+        leading_spaces = len(line) - len(line.lstrip(' '))
+        indents.append(leading_spaces)
     return indents
 
-def apply_linewise_indent(original_path, temp_path, final_output_path, insert_trailing_lf=False):
-    """元ファイルの行ごとのインデントを適用して最終ファイルを出力"""
-    original_indents = collect_linewise_indents(original_path)
-
-    with open(temp_path, encoding='utf-8') as temp_f:
-        new_lines = temp_f.readlines()
+def apply_linewise_indent(original_indents, serialized_text, insert_trailing_lf=False):
+    """元ファイルの行ごとのインデントをシリアライズ済みテキストに適用して返す"""
+    new_lines = split_lines_keepends(serialized_text)
 
     if insert_trailing_lf:
         new_lines.append('\n')
 
-    with open(final_output_path, 'w', encoding='utf-8') as final_f:
-        for i, line in enumerate(new_lines):
-            if i < len(original_indents):
-                adjusted_line = ' ' * original_indents[i] + line.lstrip(' ')
-            else:
-                adjusted_line = line
-            final_f.write(adjusted_line)
-
-def check_trailing_newline(file_path):
-    """ファイル末尾の改行有無をチェック"""
-    with open(file_path, 'rb') as f:
-        f.seek(-1, os.SEEK_END)
-        return f.read(1) == b'\n'
-
-
-def find_line_number(file_path, search_text):
-    """ファイル内でテキストが出現する行番号を検索"""
-    try:
-        matching_lines = []
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for i, line in enumerate(f, start=1):
-                if search_text in line:
-                    matching_lines.append(str(i))
-        
-        if matching_lines:
-            return ','.join(matching_lines)
-    except Exception as e:
-        print(f"行番号の取得に失敗しました: {file_path}, エラー: {e}")
-    return "-"
-
-def collect_csv_report_rows(input_root, rel_path, basename, sources, originals, translations, comments, full_json_path):
+    adjusted_lines = []
+    for i, line in enumerate(new_lines):
+        if i < len(original_indents):
+            adjusted_lines.append(' ' * original_indents[i] + line.lstrip(' '))
+        else:
+            adjusted_lines.append(line)
+    return ''.join(adjusted_lines)
+
+class LineIndex:
+    """ファイル内容と各行の開始位置を保持し、テキストの出現行番号を高速に検索する"""
+
+    def __init__(self, file_path, content=None):
+        self.file_path = file_path
+        self.content = content
+        self.line_starts = []
+        self.cache = {}
+        if self.content is None:
+            try:
+                # 行単位の読み込みと同じく、改行コードは \n に統一される
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    self.content = f.read()
+            except Exception as e:
+                print(f"行番号の取得に失敗しました: {file_path}, エラー: {e}")
+                return
+
+        self.line_starts = [0]
+        pos = self.content.find('\n')
+        while pos != -1:
+            self.line_starts.append(pos + 1)
+            pos = self.content.find('\n', pos + 1)
+        # 末尾が改行で終わる場合、最後の開始位置は行ではない
+        if self.line_starts[-1] == len(self.content):
+            self.line_starts.pop()
+
+    def find(self, search_text):
+        """テキストが出現する行番号をカンマ区切りで返す（見つからない場合は "-"）"""
+        if self.content is None:
+            return "-"
+        if search_text in self.cache:
+            return self.cache[search_text]
+
+        if not search_text:
+            # 空文字列はすべての行に一致する
+            matching_lines = [str(i) for i in range(1, len(self.line_starts) + 1)]
+        else:
+            matching_lines = []
+            pos = self.content.find(search_text)
+            while pos != -1:
+                line = bisect_right(self.line_starts, pos)
+                matching_lines.append(str(line))
+                # 同じ行での重複を避け、次の行の先頭から検索を再開
+                if line >= len(self.line_starts):
+                    break
+                pos = self.content.find(search_text, self.line_starts[line])
+
+        result = ','.join(matching_lines) if matching_lines else "-"
+        self.cache[search_text] = result
+        return result
+
+
+def collect_csv_report_rows(input_root, rel_path, basename, entries, full_json_path, source_text=None):
     """CSV出力用の行データを収集"""
     rows = []
+    line_index = None  # コメント付きのキーがある場合のみ作成
 
     is_storydata = "StoryData" in rel_path.replace("\\", "/")
     csv_key = "story" if is_storydata else "general"
 
-    for key in originals:
-        source = sources.get(key, "")
-        original = source.replace('\n', '\\n')
-        translation = originals.get(key, "").replace('\n', '\\n')
-        revised = translations.get(key, "").replace('\n', '\\n')
-        cmt = comments.get(key, {"CMT_JP": "", "CMT_KR": ""})
-
-        if not (cmt["CMT_JP"] or cmt["CMT_KR"]):
+    for key, entry in entries.items():
+        if not entry.has_comment():
             continue
 
+        original = entry.source.replace('\n', '\\n')
+        translation = entry.original.replace('\n', '\\n')
+        revised = entry.translation.replace('\n', '\\n')
+
         relative_path_to_report = os.path.relpath(full_json_path, input_root).replace('\\', '/')
-        line_number = find_line_number(full_json_path, translation)
+        if line_index is None:
+            line_index = LineIndex(full_json_path, source_text)
+        line_number = line_index.find(translation)
 
-        kr_comment = cmt["CMT_KR"]
+        kr_comment = entry.cmt_kr
         categories = []
 #        if regex.search(r"오식\d*:", kr_comment): # 誤植
         if regex.search(r"오기\d*:", kr_comment): # 誤記
@@ -374,8 +484,8 @@ def collect_csv_report_rows(input_root, rel_path, basename, sources, originals,
             original,
             translation,
             revised,
-            cmt["CMT_JP"].replace('\n', ' '),
-            cmt["CMT_KR"].replace('\n', ' ')
+            entry.cmt_jp.replace('\n', ' '),
+            entry.cmt_kr.replace('\n', ' ')
         ]
         rows.append((csv_key, row))
     
@@ -399,79 +509,407 @@ def load_existing_timestamps(csv_path):
     return timestamps, contents
 
 
+def get_output_file_path(output_dir, file_name):
+    """レポート・マニフェストの出力先（ローカル実行時は output_dir 内、ワークフロー実行時はリポジトリ直下）"""
+    if LOCAL_MODE:
+        return os.path.join(output_dir, file_name)
+    return file_name
+
+
+def load_report_rows_by_path(output_dir):
+    """既存レポートを読み込み、元ファイルの相対パスごとにレポート行（更新日時列を除く）を返す
+
+    write_csv_report の書き出し形式（タブ区切り・CRLF・引用符なし）をそのまま逆変換する。
+    列数が合わない行がある場合は引き継げないため None を返す。
+    """
+    rows_by_path = defaultdict(list)
+    for csv_key, csv_name in REPORT_FILES.items():
+        report_path = get_output_file_path(output_dir, csv_name)
+        if not os.path.exists(report_path):
+            continue
+        with open(report_path, encoding='utf-8-sig', newline='') as f:
+            lines = f.read().split('\r\n')
+        for line in lines[1:]:
+            if not line:
+                continue
+            row = line.split('\t')
+            if len(row) != 9:
+                return None
+            rel_path = row[0].rpartition(":")[0]
+            rows_by_path[rel_path].append((csv_key, row[:2] + row[3:]))
+    return rows_by_path
+
+
 def write_csv_report(output_dir, collected_rows):
-    """収集したCSV行をファイルごとに自然順で書き出す"""
+    """収集したCSV行をレポートストアに反映し、ファイルごとに自然順で書き出す"""
     grouped_rows = defaultdict(list)
     for csv_key, row in collected_rows:
         grouped_rows[csv_key].append(row)
 
-    # 自然順のキーを生成
+    # 自然順のキーを生成（同じファイルの行が多いため、パスごとのキーを再利用する）
     natkey = natsort_keygen()
+    path_keys = {}
 
     def sort_key(row):
         """1列目の 'path:line' を分解して階層・自然順にソート"""
         full_path, _, line_str = row[0].rpartition(":")
         line_num = int(line_str) if line_str.isdigit() else 0
-        path_parts = full_path.split(os.sep)  # ディレクトリ階層に分解
-        return (len(path_parts), natkey(full_path), line_num)
-
-    for csv_key, rows in grouped_rows.items():
-        csv_name = REPORT_FILES.get(csv_key)
-        if LOCAL_MODE:
-            report_path = os.path.join(output_dir, csv_name)
-            os.makedirs(os.path.dirname(report_path), exist_ok=True)
-        else:
-            report_path = csv_name
+        path_key = path_keys.get(full_path)
+        if path_key is None:
+            path_parts = full_path.split(os.sep)  # ディレクトリ階層に分解
+            path_key = path_keys[full_path] = (len(path_parts), natkey(full_path))
+        return (*path_key, line_num)
+
+    store_path = get_output_file_path(output_dir, REPORT_STORE_FILE)
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    with ReportStore(store_path) as store:
+        for csv_key, rows in grouped_rows.items():
+            report_path = get_output_file_path(output_dir, REPORT_FILES.get(csv_key))
+            if LOCAL_MODE:
+                os.makedirs(os.path.dirname(report_path), exist_ok=True)
+
+            # ストアの作成後の初回のみ、既存レポートの行（更新日時を含む）を取り込む
+            if store.count_rows(csv_key) == 0 and os.path.exists(report_path):
+                _, existing_rows = load_existing_timestamps(report_path)
+                store.import_rows(csv_key, existing_rows.values())
+
+            # 内容のハッシュが変わった行のみ更新日時を更新する
+            updated_rows, counts = store.update_report(csv_key, rows, today, keep_timestamps=IGNORE_TIMESTAMP_UPDATE)
+            print(f"Report {csv_key}: {counts['added']} added, {counts['changed']} changed, "
+                  f"{counts['removed']} removed, {counts['unchanged']} unchanged")
+
+            with open(report_path, 'w', encoding='utf-8-sig', newline='\r\n') as txtfile:
+                txtfile.write('\t'.join(REPORT_HEADER) + '\n')
+                for row in sorted(updated_rows, key=sort_key):
+                    txtfile.write('\t'.join(row) + '\n')
+
+
+def get_cpu_seconds():
+    """このプロセスと終了済みの子プロセスのCPU時間の合計"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def get_peak_rss_bytes(children=False):
+    """プロセス開始からのピークRSS（children=True の場合は子プロセスの最大値、取得できない場合は None）"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss の単位は macOS ではバイト、Linux ではキロバイト
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+class StageTimer:
+    """1ファイル分の処理の段階ごとの実時間を計測する（ワーカープロセス内でも使用）"""
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.stage_seconds = {}
+
+    def lap(self, name):
+        """前回の lap からの経過時間を name の段階として記録し、その秒数を返す"""
+        now = time.perf_counter()
+        elapsed = now - self.last
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + elapsed
+        self.last = now
+        return elapsed
+
+    def summary(self):
+        """ファイル全体の実時間・CPU時間と段階ごとの実時間"""
+        return {
+            "wall_seconds": self.last - self.start,
+            "cpu_seconds": time.process_time() - self.cpu_start,
+            "stage_seconds": dict(self.stage_seconds),
+        }
+
+
+class StageMetrics:
+    """
+    実行全体の処理段階ごとの実時間・CPU時間・ピークRSSと、ファイルごとの処理時間を記録する。
 
-        # 古いレポートを一時保存（比較用）
-        old_path = report_path + '.old'
-        if os.path.exists(report_path):
-            shutil.move(report_path, old_path)
-        else:
-            old_path = None
+    lap(name) を呼ぶと、前回の lap からの区間を name の段階として記録する。
+    ピークRSSはプロセス開始からの最大値のため、前の段階より増えていればその段階で最大値を更新したことを表す。
+    並列処理時のワーカーのCPU時間・ピークRSSは、プールの終了後に子プロセスの値として記録される。
+    """
 
-        existing_timestamps, existing_rows = load_existing_timestamps(old_path) if old_path else ({}, {})
+    def __init__(self, **info):
+        self.run_id = datetime.now().isoformat(timespec='seconds')
+        self.info = info
+        self.start = self.last = time.perf_counter()
+        self.cpu_start = self.cpu_last = get_cpu_seconds()
+        self.stages = []
+        self.files = []  # [(相対パス, process_json_file の stats)]
+
+    def lap(self, name):
+        """前回の lap からの区間を name の段階として記録する"""
+        now = time.perf_counter()
+        cpu_now = get_cpu_seconds()
+        self.stages.append({
+            "stage": name,
+            "wall_seconds": now - self.last,
+            "cpu_seconds": cpu_now - self.cpu_last,
+            "peak_rss_bytes": get_peak_rss_bytes(),
+            "children_peak_rss_bytes": get_peak_rss_bytes(children=True),
+        })
+        self.last = now
+        self.cpu_last = cpu_now
+
+    def add_file(self, rel_path, stats):
+        """処理したファイルの計測結果を記録する"""
+        self.files.append((rel_path, stats))
+
+    def get_file_stage_totals(self):
+        """ファイル単位の処理の段階ごとの実時間の合計（並列処理時は各ワーカーの合計）"""
+        totals = {}
+        for _, stats in self.files:
+            for name, seconds in stats["stage_seconds"].items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def get_slowest_files(self, count=SLOWEST_FILES_COUNT):
+        return sorted(self.files, key=lambda item: item[1]["wall_seconds"], reverse=True)[:count]
+
+    def build_records(self, slowest_count=SLOWEST_FILES_COUNT):
+        """JSON lines の各行となるレコードのリスト（同じ実行のレコードは同じ run を持つ）"""
+        run = {"run": self.run_id}
+        records = [{
+            "type": "run", **run, **self.info,
+            "files": len(self.files),
+            "wall_seconds": self.last - self.start,
+            "cpu_seconds": self.cpu_last - self.cpu_start,
+            "peak_rss_bytes": get_peak_rss_bytes(),
+            "children_peak_rss_bytes": get_peak_rss_bytes(children=True),
+        }]
+        records.extend({"type": "stage", **run, **stage} for stage in self.stages)
+        records.extend(
+            {"type": "file_stage", **run, "stage": name, "files": len(self.files), "wall_seconds": seconds}
+            for name, seconds in self.get_file_stage_totals().items()
+        )
+        for rank, (rel_path, stats) in enumerate(self.get_slowest_files(slowest_count), 1):
+            records.append({
+                "type": "slow_file", **run, "rank": rank, "path": rel_path,
+                "bytes": stats["decoded_bytes"],
+                "wall_seconds": stats["wall_seconds"],
+                "cpu_seconds": stats["cpu_seconds"],
+                "stage_seconds": stats["stage_seconds"],
+            })
+        return records
+
+    def write(self, metrics_path, slowest_count=SLOWEST_FILES_COUNT):
+        """計測結果を JSON lines として追記する（実行ごとの比較用）"""
+        if os.path.dirname(metrics_path):
+            os.makedirs(os.path.dirname(metrics_path), exist_ok=True)
+        with open(metrics_path, 'a', encoding='utf-8', newline='\n') as f:
+            for record in self.build_records(slowest_count):
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def print_summary(self, slowest_count=SLOWEST_FILES_COUNT):
+        """段階ごとの計測結果を表示"""
+        def format_rss(value):
+            return f"{value / (1024 * 1024):.0f} MB" if value is not None else "-"
+
+        print("Stage timings:")
+        for stage in self.stages:
+            line = (f"  {stage['stage']:<20} {stage['wall_seconds']:8.2f}s  cpu {stage['cpu_seconds']:8.2f}s  "
+                    f"peak RSS {format_rss(stage['peak_rss_bytes'])}")
+            if self.info.get("jobs", 1) > 1:
+                line += f" (workers {format_rss(stage['children_peak_rss_bytes'])})"
+            print(line)
+        totals = self.get_file_stage_totals()
+        if totals:
+            print(f"  per-file stages ({len(self.files)} files): "
+                  + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in totals.items()))
+        slowest = self.get_slowest_files(slowest_count)
+        if slowest:
+            print("Slowest files:")
+            for rel_path, stats in slowest:
+                slowest_stage = max(stats["stage_seconds"].items(), key=lambda item: item[1])
+                print(f"  {stats['wall_seconds']:6.3f}s  {rel_path} ({slowest_stage[0]} {slowest_stage[1]:.3f}s)")
+
+
+def process_json_file(task):
+    """1ファイル分の翻訳適用・出力を行い、レポート行を返す（ワーカープロセスからも呼ばれる）"""
+    input_root, input_path, rel_path, output_path, output_mod_path, paratranz_location = task
+
+    filename = os.path.basename(input_path)
+    basename = os.path.splitext(filename)[0]
+
+    # 出力ディレクトリを作成
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    os.makedirs(os.path.dirname(output_mod_path), exist_ok=True)
 
-        now = datetime.now().strftime('%Y-%m-%d')
-        updated_rows = []
+    try:
+        timer = StageTimer()
+        codec_start = json_codec.get_codec_stats()
+
+        # 翻訳ファイルはこのファイルの処理時に読み込み、処理後は保持しない
+        entries = load_paratranz_entries(paratranz_location)
+        translations = {key: entry.translation for key, entry in entries.items()}
+        organized_translations = organize_duplicate_translations(translations)
+        timer.lap("translations")
+
+        # 元ファイルは1回だけ読み込み、デコード・インデント収集・行番号検索で共有する
+        source_text, has_trailing_newline = read_source_text(input_path)
+        original_indents = collect_linewise_indents(source_text)
+        timer.lap("read")
+
+        # JSONのデコードは1回のみ行い、書式情報の収集と翻訳適用で同じツリーを使う
+        original_json = json_codec.loads(source_text)
+        stats = {
+            "decoded_bytes": os.path.getsize(input_path),
+            "decode_seconds": timer.lap("decode"),
+        }
+
+        # 翻訳適用前に書式情報を収集
+        file_formats = collect_file_formats(original_json)
+        stats["format_entries"] = len(file_formats)
+        stats["format_bytes"] = estimate_formats_size(file_formats)
+        timer.lap("formats")
+
+        # dataListの翻訳処理
+        if "dataList" in original_json:
+            dup_counters = defaultdict(int)
+            # 翻訳キーをエントリID・パスで索引化し、翻訳のないエントリや部分木は走査しない
+            entry_ids = [item.get("id") for item in original_json["dataList"] if item.get("id") is not None]
+            path_index = build_translation_path_index(translations, organized_translations, entry_ids)
+            for i, item in enumerate(original_json["dataList"]):
+                entry_id = item.get("id")
+                if entry_id is not None:
+                    path_prefixes = path_index.get(f"{entry_id}")
+                    if path_prefixes is None:
+                        continue
+                    original_json["dataList"][i] = apply_translation_to_obj(
+                        item,
+                        translations,
+                        file_formats,
+                        organized_translations,
+                        entry_id,
+                        dup_counters=dup_counters,
+                        filename=filename,
+                        path_prefixes=path_prefixes
+                    )
+        timer.lap("apply")
+
+        # 翻訳済みJSONをメモリ上でシリアライズし、元ファイルのインデントを適用
+        serialized_text = json_codec.dumps(original_json)
+        timer.lap("dump")
+        output_text = apply_linewise_indent(original_indents, serialized_text, insert_trailing_lf=has_trailing_newline)
+        timer.lap("indent")
+
+        # 同じ内容を jp_fixed と jp_mod に書き出す
+        for path in (output_path, output_mod_path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(output_text)
+        timer.lap("write")
+
+        # レポート行を収集
+        rows = collect_csv_report_rows(
+            input_root=input_root,
+            rel_path=rel_path,
+            basename=basename,
+            entries=entries,
+            full_json_path=input_path,
+            source_text=source_text
+        )
+        timer.lap("report_rows")
+        stats.update(timer.summary())
+        stats["codec"] = json_codec.diff_codec_stats(codec_start, json_codec.get_codec_stats())
+        return rows, stats
 
-        for row in rows:
-            path, key = row[0], row[1]
-            row_key = (path, key)
-            old_row = existing_rows.get(row_key)
+    except Exception as e:
+        print(f"Error processing {input_path}: {e}")
+        return [], None
 
-            if not old_row or row[4:8] != old_row[5:9]:
-                if IGNORE_TIMESTAMP_UPDATE:
-                    try:
-                        timestamp = old_row[2]
-                    except:
-                        timestamp = now
-                else:
-                    timestamp = now
-            else:
-                timestamp = old_row[2]
 
-            updated_row = row[:2] + [timestamp] + row[2:]
-            updated_rows.append(updated_row)
+def print_single_pass_summary(all_stats):
+    """JSONのデコード量・時間と、ファイルごとに保持した書式情報の量を表示"""
+    if not all_stats:
+        return
+    decoded_mb = sum(s["decoded_bytes"] for s in all_stats) / (1024 * 1024)
+    decode_seconds = sum(s["decode_seconds"] for s in all_stats)
+    format_entries = sum(s["format_entries"] for s in all_stats)
+    format_mb = sum(s["format_bytes"] for s in all_stats) / (1024 * 1024)
+    largest_format_mb = max(s["format_bytes"] for s in all_stats) / (1024 * 1024)
+    print(f"JSON decoded once: {len(all_stats)} files, {decoded_mb:.1f} MB in {decode_seconds:.2f}s")
+    print(f"  formats: {format_entries} entries, ~{format_mb:.1f} MB in total, largest file ~{largest_format_mb:.2f} MB")
 
-        header = [
-            "경로", "키", "갱신 시각", "카테고리", "원문", "번역문", # パス, キー, 更新日時, カテゴリ, 原文, 翻訳文,
-            "수정문", "(일) 코멘트", "(한) 코멘트" # 修正文, (日)コメント, (韓)コメント
-        ]
 
-        with open(report_path, 'w', encoding='utf-8-sig', newline='\r\n') as txtfile:
-            txtfile.write('\t'.join(header) + '\n')
-            for row in sorted(updated_rows, key=sort_key):
-                txtfile.write('\t'.join(row) + '\n')
+def print_codec_summary(codec_info):
+    """JSONのバックエンドの使用状況（検証モードの場合は比較結果）を表示"""
+    print(f"JSON codec: {codec_info['backend']} ({codec_info['fast']} fast, {codec_info['fallback']} stdlib fallback)")
+    if codec_info["verified"]:
+        print(f"  verified against stdlib json: {codec_info['verified']} calls, {codec_info['mismatches']} mismatches")
 
-        if old_path and os.path.exists(old_path):
-            os.remove(old_path)
 
+def compute_file_hash(file_path):
+    """ファイル内容のSHA-256ハッシュを返す"""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
-def process_all_json(input_root, translation_root, json_output_lang_root, json_output_mod_root, output_root):
-    """各JSONファイルの総処理"""
-    
-    # 出力ディレクトリをクリア
+
+def compute_tool_hash():
+    """このスクリプトと共通モジュールのハッシュを返す"""
+    sha = hashlib.sha256()
+    for file_path in TOOL_FILES:
+        with open(file_path, 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def collect_paratranz_hashes(paratranz_dir):
+    """ParaTranzファイルのハッシュを、元ファイルと同じ basename（JP_ 付き）をキーにして収集"""
+    hashes = {}
+    for rel_path, read_file in iter_paratranz_files(paratranz_dir):
+        basename = "JP_" + os.path.splitext(posixpath.basename(rel_path))[0]
+        hashes[basename] = hashlib.sha256(read_file()).hexdigest()
+    return hashes
+
+
+def collect_source_hashes(input_root):
+    """元ファイルのハッシュを相対パス（/ 区切り）をキーにして os.walk の順序で収集"""
+    source_hashes = {}
+    for root, _, files in os.walk(input_root):
+        for filename in [f for f in files if f.endswith(".json")]:
+            input_path = os.path.join(root, filename)
+            rel_path = os.path.relpath(input_path, input_root).replace('\\', '/')
+            source_hashes[rel_path] = compute_file_hash(input_path)
+    return source_hashes
+
+
+def is_source_unchanged(input_root, output_root):
+    """前回実行時から元ファイルとこのスクリプト（共通モジュールを含む）が変更されていないかをマニフェストで確認"""
+    manifest = load_manifest(get_output_file_path(output_root, MANIFEST_FILE))
+    if manifest is None:
+        return False
+    return (manifest.get("tool") == compute_tool_hash()
+            and manifest.get("sources") == collect_source_hashes(input_root))
+
+
+def load_manifest(manifest_path):
+    """前回実行時のマニフェストを読み込む（存在しない・壊れている場合は None）"""
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"マニフェストの読み込みに失敗しました: {manifest_path}, エラー: {e}")
+        return None
+
+
+def save_manifest(manifest_path, manifest):
+    """マニフェストを書き出す"""
+    if os.path.dirname(manifest_path):
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def clear_output_dirs(json_output_lang_root, json_output_mod_root):
+    """出力ディレクトリをクリア（jp_mod は Font フォルダを残す）"""
     if os.path.exists(json_output_lang_root):
         shutil.rmtree(json_output_lang_root, ignore_errors=True)
 
@@ -485,112 +923,205 @@ def process_all_json(input_root, translation_root, json_output_lang_root, json_o
                 shutil.rmtree(item_path, ignore_errors=True)
             else:
                 os.remove(item_path)
-    
 
 
-    print("Loading translations...")
-    originals_by_file, translations_by_file, sources_by_file, comments_by_file = load_translations_and_comments_by_filename(translation_root)
-    
-    print("Loading original formats...")
-    original_formats = load_original_entries(input_root)
-    
-    # 重複翻訳を整理
-    organized_translations_by_file = {}
-    for basename, translations in translations_by_file.items():
-        organized_translations_by_file[basename] = organize_duplicate_translations(translations)
-    
-    print("Processing files...")
+def get_output_paths(rel_path, json_output_lang_root, json_output_mod_root):
+    """元ファイルの相対パスから jp_fixed / jp_mod の出力パスを返す"""
+    output_path = os.path.join(json_output_lang_root, rel_path)
+    output_mod_path = os.path.join(json_output_mod_root, os.path.dirname(rel_path), os.path.basename(rel_path).removeprefix('JP_'))
+    return output_path, output_mod_path
 
-    all_report_rows = []  # 全レポート行を格納
 
-    for root, _, files in os.walk(input_root):
-        for filename in [f for f in files if f.endswith(".json")]:
-            input_path = os.path.join(root, filename)
-            rel_path = os.path.relpath(input_path, input_root)
-            output_path = os.path.join(json_output_lang_root, rel_path)
-            output_mod_path = os.path.join(json_output_mod_root, os.path.dirname(rel_path), os.path.basename(rel_path).removeprefix('JP_'))
+def process_all_json(input_root, translation_root, json_output_lang_root, json_output_mod_root, output_root, jobs=1, incremental=False, metrics=None):
+    """
+    各JSONファイルの総処理（jobs > 1 の場合はプロセスプールで並列処理、incremental の場合は変更分のみ処理）
+    metrics（StageMetrics）を指定した場合は、処理段階ごとの計測結果を記録する
+    """
+    if metrics is None:
+        metrics = StageMetrics()
+
+    manifest_path = get_output_file_path(output_root, MANIFEST_FILE)
+    tool_hash = compute_tool_hash()
+
+    # 元ファイル・ParaTranzファイルのハッシュを収集（os.walk の順序を維持）
+    source_hashes = collect_source_hashes(input_root)
+    paratranz_hashes = collect_paratranz_hashes(translation_root)
+    metrics.lap("hash_inputs")
+
+    previous_rows_by_path = {}
+    if incremental:
+        manifest = load_manifest(manifest_path)
+        if manifest is None:
+            print("No manifest found, processing all files.")
+            incremental = False
+        elif manifest.get("tool") != tool_hash:
+            print("Importer has changed since the last run, processing all files.")
+            incremental = False
+        else:
+            previous_rows_by_path = load_report_rows_by_path(output_root)
+            if previous_rows_by_path is None:
+                print("Existing reports could not be parsed, processing all files.")
+                incremental = False
+                previous_rows_by_path = {}
+
+    if incremental:
+        old_sources = manifest.get("sources", {})
+        old_paratranz = manifest.get("paratranz", {})
+
+        # 元ファイルが削除された出力のみを削除
+        for rel_path in old_sources:
+            if rel_path not in source_hashes:
+                for path in get_output_paths(rel_path, json_output_lang_root, json_output_mod_root):
+                    if os.path.exists(path):
+                        os.remove(path)
+                print(f"Removed outputs of deleted source: {rel_path}")
+
+        # 元ファイル・ParaTranzファイル・出力のいずれかが変化したファイルを対象にする
+        target_paths = set()
+        for rel_path, source_hash in source_hashes.items():
+            basename = os.path.splitext(os.path.basename(rel_path))[0]
+            output_paths = get_output_paths(rel_path, json_output_lang_root, json_output_mod_root)
+            if (old_sources.get(rel_path) != source_hash
+                    or old_paratranz.get(basename) != paratranz_hashes.get(basename)
+                    or not all(os.path.exists(path) for path in output_paths)):
+                target_paths.add(rel_path)
+        print(f"Incremental mode: {len(target_paths)} / {len(source_hashes)} files changed.")
+    else:
+        clear_output_dirs(json_output_lang_root, json_output_mod_root)
+        target_paths = set(source_hashes)
 
-            # 出力ディレクトリを作成
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            os.makedirs(os.path.dirname(output_mod_path), exist_ok=True)
+    metrics.lap("plan_targets")
 
-            # ファイル形式を検出
-            has_trailing_newline = check_trailing_newline(input_path)
-            
-            try:
-                with open(input_path, encoding='utf-8') as f:
-                    original_json = json.load(f)
-
-                # データ取得
-                basename = os.path.splitext(filename)[0]
-                translations = translations_by_file.get(basename, {})
-                sources = sources_by_file.get(basename, {})
-                originals = originals_by_file.get(basename, {})
-                comments = comments_by_file.get(basename, {})
-                file_formats = original_formats.get(basename, {})
-                organized_translations = organized_translations_by_file.get(basename, defaultdict(list))
-
-                # dataListの翻訳処理
-                if "dataList" in original_json:
-                    dup_counters = defaultdict(int)
-                    for i, item in enumerate(original_json["dataList"]):
-                        entry_id = item.get("id")
-                        if entry_id is not None:
-                            original_json["dataList"][i] = apply_translation_to_obj(
-                                item,
-                                translations,
-                                file_formats,
-                                organized_translations,
-                                entry_id,
-                                dup_counters=dup_counters,
-                                filename=filename
-                            )
-                
-                # 翻訳済みJSONファイルを出力
-                tmp_path = output_path + '_temp'
-                with open(tmp_path, 'w', encoding='utf-8') as f:
-                    json.dump(original_json, f, ensure_ascii=False, indent=2)
-
-                apply_linewise_indent(original_path=input_path, temp_path=tmp_path, final_output_path=output_path, insert_trailing_lf=has_trailing_newline)
-                apply_linewise_indent(original_path=input_path, temp_path=tmp_path, final_output_path=output_mod_path, insert_trailing_lf=has_trailing_newline)
+    # 翻訳ファイルは読み込み位置のみ記録し、各ファイルの処理時に読み込む
+    paratranz_locations = index_paratranz_files(translation_root)
+    codec_totals = dict.fromkeys(json_codec.get_codec_stats(), 0)
+    metrics.lap("index_translations")
+    
+    print("Processing files...")
 
-                os.remove(tmp_path)
+    # ファイル単位のタスクを作成（os.walk の順序を維持）
+    tasks = []
+    task_paths = []
+    for rel_path in source_hashes:
+        if rel_path not in target_paths:
+            continue
+        input_path = os.path.join(input_root, rel_path)
+        output_path, output_mod_path = get_output_paths(rel_path, json_output_lang_root, json_output_mod_root)
+        basename = os.path.splitext(os.path.basename(rel_path))[0]
+
+        tasks.append((
+            input_root,
+            input_path,
+            rel_path,
+            output_path,
+            output_mod_path,
+            paratranz_locations.get(basename)
+        ))
+        task_paths.append(rel_path)
+
+    rows_by_path = {}  # 処理したファイルのレポート行
+    all_stats = []  # ファイルごとのデコード統計
+    failed_paths = set()
+
+    if jobs > 1:
+        # ファイル単位で並列処理（map は投入順に結果を返すため、レポートは逐次実行と同一になる）
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(process_json_file, tasks, chunksize=16)
+            for rel_path, (rows, stats) in zip(task_paths, results):
+                rows_by_path[rel_path] = rows
+                if stats:
+                    all_stats.append(stats)
+                    metrics.add_file(rel_path, stats)
+                else:
+                    failed_paths.add(rel_path)
+    else:
+        for rel_path, task in zip(task_paths, tasks):
+            rows, stats = process_json_file(task)
+            rows_by_path[rel_path] = rows
+            if stats:
+                all_stats.append(stats)
+                metrics.add_file(rel_path, stats)
+            else:
+                failed_paths.add(rel_path)
+    close_paratranz_archives()
+    metrics.lap("process_files")
 
-                # レポート行を収集
-                rows = collect_csv_report_rows(
-                    input_root=input_root,
-                    rel_path=rel_path,
-                    basename=basename,
-                    sources=sources,
-                    originals=originals,
-                    translations=translations,
-                    comments=comments,
-                    full_json_path=input_path
-                )
-                all_report_rows.extend(rows)
+    print_single_pass_summary(all_stats)
 
-            except Exception as e:
-                print(f"Error processing {input_path}: {e}")
+    # JSONのバックエンドの使用状況（ワーカープロセスの分はファイルごとの結果から集計）
+    for stats in all_stats:
+        codec_totals = json_codec.add_codec_stats(codec_totals, stats["codec"])
+    metrics.info["json_codec"] = {"backend": json_codec.get_backend(), **codec_totals}
+    print_codec_summary(metrics.info["json_codec"])
+
+    # 未変更のファイルは既存レポートの行を引き継ぐ
+    all_report_rows = []  # 全レポート行を格納
+    for rel_path in source_hashes:
+        if rel_path in rows_by_path:
+            all_report_rows.extend(rows_by_path[rel_path])
+        else:
+            all_report_rows.extend(previous_rows_by_path.get(rel_path, []))
 
     # CSVレポートを出力
     write_csv_report(output_root, all_report_rows)
-
-def download_paratranz_artifact(token_id, projects_id, output_file='paratranz_artifact.zip'):
+    metrics.lap("write_report")
+
+    # 処理に失敗したファイルは次回も再処理されるようにハッシュを記録しない
+    save_manifest(manifest_path, {
+        "tool": tool_hash,
+        "sources": {p: h for p, h in source_hashes.items() if p not in failed_paths},
+        "paratranz": paratranz_hashes
+    })
+    metrics.lap("save_manifest")
+
+def load_artifact_cache(cache_path):
+    """前回取得したアーティファクトの記録を読み込む（存在しない場合は空の辞書）"""
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"キャッシュの読み込みに失敗しました: {cache_path}, エラー: {e}")
+    return {}
+
+
+def save_artifact_cache(cache_path, cache_record):
+    """アーティファクトの記録を書き出す"""
+    if os.path.dirname(cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(cache_record, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def download_paratranz_artifact(token_id, projects_id, output_file='paratranz_artifact.zip', api_url=PARATRANZ_API_URL, cache_record=None):
     """
     ParaTranz からアーティファクトをダウンロードする関数。
+    レスポンスはストリーミングで受信し、チャンク単位でファイルに書き込む。
+    接続エラー・タイムアウト・一時的なエラー（429, 5xx）は間隔を倍増させながらリトライする。
+
+    cache_record を指定した場合は ETag / Last-Modified による条件付きリクエストを送り、
+    アーティファクトが未変更（304、またはハッシュが一致）であれば保存せずに None を返す。
 
     Parameters:
         token_id (str): API トークン。
         projects_id (str or int): プロジェクト ID。
         output_path (str): ダウンロードしたファイルの保存先ファイル名。
+        api_url (str): API のベースURL（ローカルのテスト用サーバーを指定可）。
+        cache_record (dict): 前回取得時の記録（etag, last_modified, sha256）。
 
     Returns:
-        str: 保存されたファイルのパス。
+        tuple: (保存されたファイルのパス または None, 今回のアーティファクトの記録)。
     """
-    url = f"https://paratranz.cn/api/projects/{projects_id}/artifacts/download"
+    url = f"{api_url}/projects/{projects_id}/artifacts/download"
     headers = {
         "Authorization": f"Bearer {token_id}"
     }
+    if cache_record:
+        if cache_record.get("etag"):
+            headers["If-None-Match"] = cache_record["etag"]
+        if cache_record.get("last_modified"):
+            headers["If-Modified-Since"] = cache_record["last_modified"]
 
     print('token_id=',token_id,'projects_id=',projects_id)
     print("Current working directory:", os.getcwd())
@@ -600,35 +1131,138 @@ def download_paratranz_artifact(token_id, projects_id, output_file='paratranz_ar
         os.makedirs(IN_DIR_ARCHIVE)
         print(f"ディレクトリを作成しました: {IN_DIR_ARCHIVE}")
 
-    response = requests.get(url, headers=headers)
+    output_path = os.path.join(IN_DIR_ARCHIVE, output_file)
+    # 途中で失敗した場合に不完全なzipが残らないよう、一時ファイルに書き込んでから置き換える
+    tmp_path = output_path + '.part'
+
+    for attempt in range(1, DOWNLOAD_MAX_RETRIES + 1):
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status_code == 304:
+                    print("アーティファクトは前回から変更されていません (304 Not Modified)")
+                    return None, cache_record
+
+                if response.status_code in RETRY_STATUS_CODES and attempt < DOWNLOAD_MAX_RETRIES:
+                    raise requests.exceptions.HTTPError(f"{response.status_code} - {response.reason}")
+
+                if response.status_code != 200:
+                    raise Exception(f"ダウンロードに失敗しました: {response.status_code} - {response.text}")
+
+                content_hash = hashlib.sha256()
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        content_hash.update(chunk)
+
+                new_record = {
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                    "sha256": content_hash.hexdigest()
+                }
+            break
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError, requests.exceptions.HTTPError) as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if attempt >= DOWNLOAD_MAX_RETRIES:
+                raise Exception(f"ダウンロードに失敗しました: {e}") from e
+            wait = DOWNLOAD_BACKOFF_SECONDS * (2 ** (attempt - 1))
+            print(f"ダウンロードを再試行します ({attempt}/{DOWNLOAD_MAX_RETRIES}, {wait}秒後): {e}")
+            time.sleep(wait)
 
-    if response.status_code == 200:
-        output_path = os.path.join(IN_DIR_ARCHIVE, output_file)
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
-        print(f"アーティファクトを保存しました: {output_path}")
-        return output_path
-    else:
-        raise Exception(f"ダウンロードに失敗しました: {response.status_code} - {response.text}")
+    # 内容が前回と同一であれば変更なしとして扱う
+    if cache_record and cache_record.get("sha256") == new_record["sha256"]:
+        os.remove(tmp_path)
+        print("アーティファクトは前回から変更されていません (ハッシュ一致)")
+        return None, new_record
+
+    os.replace(tmp_path, output_path)
+    print(f"アーティファクトを保存しました: {output_path}")
+    return output_path, new_record
 
 
 # メイン実行部
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JP - ParaTranz Translation Importer")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="ファイル処理の並列数（1の場合は逐次処理）")
+    parser.add_argument('--incremental', action='store_true',
+                        help="前回実行時から変更のあったファイルのみ処理")
+    parser.add_argument('--no-extract', action='store_true',
+                        help="アーカイブを展開せず、zipから翻訳ファイルを直接読み込む")
+    parser.add_argument('--force', action='store_true',
+                        help="アーティファクトが未変更でも処理を実行する")
+    parser.add_argument('--json-backend', choices=json_codec.BACKENDS,
+                        help="JSONの読み書きに使うバックエンド（既定は orjson があれば orjson）")
+    parser.add_argument('--verify-codec', action='store_true',
+                        help="orjson の結果を標準ライブラリと比較し、不一致があれば終了コード 1")
+    parser.add_argument('--metrics',
+                        help="処理段階ごとの計測結果を追記する JSON lines ファイル")
+    parser.add_argument('--profile',
+                        help="cProfile の結果の出力先（--jobs 2 以上の場合、ワーカーの処理は含まれない）")
+    args = parser.parse_args()
+    json_codec.configure(backend=args.json_backend, verify=args.verify_codec or None)
+
+    metrics = StageMetrics(jobs=args.jobs, incremental=args.incremental, local_mode=LOCAL_MODE)
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
 
     # ワークフローとして実行時、アーカイブをダウンロードする
+    archive_path = None
+    artifact_record = None
+    cache_path = get_output_file_path(OUT_DIR_ROOT, ARTIFACT_CACHE_FILE)
     if not LOCAL_MODE:
-        archive_path = download_paratranz_artifact(TOKEN_ID, PROJECT_ID)
-
-        # アーカイブを展開し、翻訳ディレクトリのパスを取得
-        translation_directory = extract_latest_archive()
-        os.remove(archive_path)
+        # 元ファイルが前回から変わっていない場合のみ条件付きリクエストを送る
+        cache_record = None
+        if not args.force and is_source_unchanged(IN_DIR_INPUT, OUT_DIR_ROOT):
+            cache_record = load_artifact_cache(cache_path)
+
+        archive_path, artifact_record = download_paratranz_artifact(TOKEN_ID, PROJECT_ID, cache_record=cache_record)
+        metrics.lap("download")
+        if archive_path is None:
+            if artifact_record:
+                save_artifact_cache(cache_path, artifact_record)
+            print("No changes since the last sync.")
+            sys.exit(0)
+
+    if args.no_extract:
+        # zipを翻訳ファイルの読み込み元として直接使用
+        translation_directory = open_latest_archive()
     else:
+        # アーカイブを展開し、翻訳ディレクトリのパスを取得
         translation_directory = extract_latest_archive()
-    
+        if archive_path:
+            os.remove(archive_path)
+            archive_path = None
+    metrics.lap("extract")
+
     process_all_json(
         input_root=IN_DIR_INPUT,
         translation_root=translation_directory,
         json_output_lang_root=OUT_DIR_JP_FIXED, 
         json_output_mod_root=OUT_DIR_JP_MOD, 
-        output_root=OUT_DIR_ROOT
-    )
\ No newline at end of file
+        output_root=OUT_DIR_ROOT,
+        jobs=args.jobs,
+        incremental=args.incremental,
+        metrics=metrics
+    )
+
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"Profile saved: {args.profile}")
+    metrics.print_summary()
+    if args.metrics:
+        metrics.write(args.metrics)
+
+    if archive_path:
+        os.remove(archive_path)
+
+    # 処理が完了してから記録を更新（失敗時は次回も再取得される）
+    if artifact_record:
+        save_artifact_cache(cache_path, artifact_record)
+
+    if metrics.info["json_codec"]["mismatches"]:
+        sys.exit(1)
\ No newline at end of file
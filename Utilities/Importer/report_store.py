@@ -0,0 +1,336 @@
+"""
+レポートストア
+=====================================
+
+【概要】
+JP_TRImporter のレポート行を SQLite に保存するモジュールです。
+(ファイルのパス, 키) ごとに現在の行と内容のハッシュを保持し、内容が変わるたびに履歴を追加します。
+レポート（report_general.csv / report_storydata.csv）はこのストアから書き出します。
+
+【テーブル】
+- report_rows   : 現在の行（(path, key) が主キー、レポートから削除された行は active = 0）
+- report_history: 行の追加・変更・削除の履歴（recorded は記録した日付）
+경로 列の "ファイルのパス:行番号" は path（ファイルのパス）と line（行番号）に分けて保存します。
+行番号はファイル内の位置が変わるだけで変わるため、行の識別と 갱신 시각 の判定には使いません。
+
+【갱신 시각の判定】
+- 번역문・수정문・(일) 코멘트・(한) 코멘트 のハッシュが前回と同じ場合は前回の 갱신 시각 を引き継ぐ
+- 新しい行（前回のレポートにない行）と内容が変わった行は実行した日付になる
+- ストアにまだ行がない場合は、既存のレポートの行（갱신 시각を含む）を取り込んでから判定する
+
+【使い方（検索）】
+python report_store.py --category "오역 의심" --since 2025-07-01
+  * --db FILE   : ストアのファイル（既定は report_store.sqlite3）
+  * --report    : general / story のいずれかのみ検索
+  * --history   : 現在の行ではなく履歴（変更・削除を含む）を表示
+結果はレポートと同じ列のタブ区切りで標準出力に書き出します。
+"""
+
+import os
+import sys
+import sqlite3
+import hashlib
+import argparse
+
+
+DEFAULT_STORE_FILE = 'report_store.sqlite3'
+SCHEMA_VERSION = 2  # 2: 경로 を path と line に分割
+
+# 갱신 시각の判定に使う列（行は JP_TRImporter.collect_csv_report_rows と同じ8列、その번역문・수정문・(일) 코멘트・(한) 코멘트）
+CONTENT_SLICE = slice(4, 8)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_rows (
+    path TEXT NOT NULL,
+    key TEXT NOT NULL,
+    line TEXT NOT NULL,
+    report TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    updated TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    revised TEXT NOT NULL,
+    comment_jp TEXT NOT NULL,
+    comment_kr TEXT NOT NULL,
+    PRIMARY KEY (path, key)
+);
+CREATE INDEX IF NOT EXISTS report_rows_report ON report_rows (report, active, position);
+CREATE INDEX IF NOT EXISTS report_rows_updated ON report_rows (updated);
+CREATE TABLE IF NOT EXISTS report_history (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    key TEXT NOT NULL,
+    line TEXT NOT NULL,
+    report TEXT NOT NULL,
+    recorded TEXT NOT NULL,
+    event TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    revised TEXT NOT NULL,
+    comment_jp TEXT NOT NULL,
+    comment_kr TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS report_history_recorded ON report_history (recorded);
+CREATE INDEX IF NOT EXISTS report_history_row ON report_history (path, key);
+"""
+
+# 경로 列（"ファイルのパス:行番号"）を組み立てる式
+LOCATION_COLUMN = "CASE line WHEN '' THEN path ELSE path || ':' || line END"
+
+REPORT_HEADER = [
+    "경로", "키", "갱신 시각", "카테고리", "원문", "번역문",  # パス, キー, 更新日時, カテゴリ, 原文, 翻訳文,
+    "수정문", "(일) 코멘트", "(한) 코멘트"  # 修正文, (日)コメント, (韓)コメント
+]
+
+
+def split_location(location):
+    """경로 列の "ファイルのパス:行番号" を (ファイルのパス, 行番号) に分割する（行番号がない場合は空文字列）"""
+    path, separator, line = location.rpartition(':')
+    if not separator:
+        return location, ''
+    return path, line
+
+
+def compute_content_hash(row):
+    """갱신 시각の判定に使う列のハッシュ"""
+    return hashlib.sha1('\x1f'.join(row[CONTENT_SLICE]).encode('utf-8')).hexdigest()
+
+
+def build_query_conditions(date_column, category, since, report):
+    """検索条件の WHERE 句（" AND ..." の形式）とパラメータ"""
+    conditions = ""
+    params = []
+    if category:
+        # 카테고리は "오기, 오역 의심" のようにカンマ区切り
+        conditions += " AND (', ' || category || ', ') LIKE ?"
+        params.append(f"%, {category}, %")
+    if since:
+        conditions += f" AND {date_column} >= ?"
+        params.append(since)
+    if report:
+        conditions += " AND report = ?"
+        params.append(report)
+    return conditions, params
+
+
+class ReportStore:
+    """
+    レポート行のストア（with 文で使用し、正常に終了した場合のみ変更を確定する）
+
+    行は collect_csv_report_rows と同じ8列のリスト、書き出す行は 갱신 시각 を3列目に加えた9列のリスト。
+    """
+
+    def __init__(self, db_path):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            self.connection.close()
+            raise ValueError(f"レポートストアのバージョンが新しすぎます: {db_path} (version {version})")
+        if version == 1:
+            self.migrate_from_v1()
+        self.connection.executescript(SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def migrate_from_v1(self):
+        """
+        バージョン1（path に行番号を含む）のストアを変換する（途中で失敗した場合は変換前のまま）。
+        行番号だけが異なる同じキーの行は1行にまとめ、現在の行（active = 1）、その中では最後に書き込んだ行を残す。
+        """
+        rows = {}
+        for location, key, *values in self.connection.execute(
+                "SELECT path, key, report, position, updated, content_hash, active, category, source, "
+                "translation, revised, comment_jp, comment_kr FROM report_rows ORDER BY active, rowid"):
+            path, line = split_location(location)
+            rows[(path, key)] = (path, key, line, *values)
+        history = [(*split_location(location), row_id)
+                   for row_id, location in self.connection.execute("SELECT id, path FROM report_history")]
+
+        self.connection.execute("BEGIN")
+        try:
+            self.connection.execute("DROP TABLE report_rows")
+            self.connection.execute("ALTER TABLE report_history ADD COLUMN line TEXT NOT NULL DEFAULT ''")
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    self.connection.execute(statement)
+            self.upsert_rows(rows.values())
+            self.connection.executemany("UPDATE report_history SET path = ?, line = ? WHERE id = ?", history)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except BaseException:
+            self.connection.rollback()
+            self.connection.close()
+            raise
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.connection.commit()
+        else:
+            self.connection.rollback()
+        self.connection.close()
+
+    def count_rows(self, report):
+        """report の行数（削除された行を含む）"""
+        return self.connection.execute("SELECT COUNT(*) FROM report_rows WHERE report = ?", (report,)).fetchone()[0]
+
+    def add_history(self, entries):
+        """履歴を追加する（entries は (path, key, line, report, recorded, event, content_hash, 8列の残り6列...) のタプル）"""
+        self.connection.executemany(
+            "INSERT INTO report_history (path, key, line, report, recorded, event, content_hash, "
+            "category, source, translation, revised, comment_jp, comment_kr) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", entries)
+
+    def upsert_rows(self, records):
+        """行を追加・更新する（records は report_rows の列順のタプル）"""
+        self.connection.executemany(
+            "INSERT INTO report_rows (path, key, line, report, position, updated, content_hash, active, "
+            "category, source, translation, revised, comment_jp, comment_kr) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (path, key) DO UPDATE SET line = excluded.line, report = excluded.report, position = excluded.position, "
+            "updated = excluded.updated, content_hash = excluded.content_hash, active = excluded.active, "
+            "category = excluded.category, source = excluded.source, translation = excluded.translation, "
+            "revised = excluded.revised, comment_jp = excluded.comment_jp, comment_kr = excluded.comment_kr",
+            records)
+
+    def import_rows(self, report, report_rows):
+        """既存のレポートの行（9列）を取り込む（ストアを作成した初回のみ使用）"""
+        records = []
+        history = []
+        for position, report_row in enumerate(report_rows):
+            row = report_row[:2] + report_row[3:9]
+            updated = report_row[2]
+            path, line = split_location(row[0])
+            content_hash = compute_content_hash(row)
+            records.append((path, row[1], line, report, position, updated, content_hash, 1, *row[2:]))
+            history.append((path, row[1], line, report, updated, "imported", content_hash, *row[2:]))
+        self.upsert_rows(records)
+        self.add_history(history)
+
+    def update_report(self, report, rows, today, keep_timestamps=False):
+        """
+        report の行を今回の rows に置き換え、갱신 시각 を判定する。
+        rows にない行は削除済み（active = 0）にする。keep_timestamps の場合、既存の行は内容が変わっても 갱신 시각 を引き継ぐ。
+        行は (ファイルのパス, 키) で識別するため、行番号だけが変わった行は変更なしとして扱う（行番号のみ更新する）。
+
+        Returns:
+            tuple: (書き出す行（9列、rows と同じ順序）, 追加・変更・削除・変更なしの行数の dict)。
+        """
+        # 번역문などの列はハッシュで比較するため、それ以外の列のみ読み込む
+        existing = {
+            (path, key): state
+            for path, key, *state in self.connection.execute(
+                "SELECT path, key, line, position, updated, content_hash, active, category, source "
+                "FROM report_rows WHERE report = ?", (report,))
+        }
+        counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+        report_rows = []
+        records = []
+        history = []
+        seen = set()
+        for position, row in enumerate(rows):
+            path, line = split_location(row[0])
+            row_key = (path, row[1])
+            seen.add(row_key)
+            content_hash = compute_content_hash(row)
+            old = existing.get(row_key)
+            if old is None or not old[4]:
+                event = "added"
+                updated = today
+            elif old[3] != content_hash:
+                event = "changed"
+                updated = old[2] if keep_timestamps else today
+            else:
+                event = None
+                updated = old[2]
+
+            if event:
+                counts[event] += 1
+                history.append((path, row[1], line, report, today, event, content_hash, *row[2:]))
+            else:
+                counts["unchanged"] += 1
+            report_rows.append(row[:2] + [updated] + row[2:])
+            # 内容・行番号・順序・更新日時がすべて同じ行は書き込まない
+            if old != [line, position, updated, content_hash, 1, row[2], row[3]]:
+                records.append((path, row[1], line, report, position, updated, content_hash, 1, *row[2:]))
+
+        removed_keys = [row_key for row_key, old in existing.items() if old[4] and row_key not in seen]
+        if removed_keys:
+            history.extend(
+                (path, key, line, report, today, "removed", *values)
+                for path, key, line, *values in self.fetch_rows(removed_keys)
+            )
+            self.connection.executemany("UPDATE report_rows SET active = 0 WHERE path = ? AND key = ?", removed_keys)
+            counts["removed"] = len(removed_keys)
+
+        self.upsert_rows(records)
+        self.add_history(history)
+        return report_rows, counts
+
+    def fetch_rows(self, row_keys):
+        """(path, key) の行を (path, key, line, content_hash, 8列の残り6列...) で返す"""
+        rows = []
+        for path, key in row_keys:
+            rows.extend(self.connection.execute(
+                "SELECT path, key, line, content_hash, category, source, translation, revised, comment_jp, comment_kr "
+                "FROM report_rows WHERE path = ? AND key = ?", (path, key)))
+        return rows
+
+    def export_rows(self, report):
+        """report の現在の行（9列）を前回の update_report に渡された順序で返す（update_report の戻り値と同じ）"""
+        return [list(row) for row in self.connection.execute(
+            f"SELECT {LOCATION_COLUMN}, key, updated, category, source, translation, revised, comment_jp, comment_kr "
+            "FROM report_rows WHERE report = ? AND active = 1 ORDER BY position", (report,))]
+
+    def query_rows(self, category=None, since=None, report=None):
+        """現在の行（9列）を検索する（since は 갱신 시각 の下限 YYYY-MM-DD）"""
+        conditions, params = build_query_conditions("updated", category, since, report)
+        return [list(row) for row in self.connection.execute(
+            f"SELECT {LOCATION_COLUMN}, key, updated, category, source, translation, revised, comment_jp, comment_kr "
+            f"FROM report_rows WHERE active = 1{conditions} ORDER BY updated, report, position", params)]
+
+    def query_history(self, category=None, since=None, report=None):
+        """履歴（9列 + 操作）を検索する（since は記録した日付の下限 YYYY-MM-DD）"""
+        conditions, params = build_query_conditions("recorded", category, since, report)
+        return [list(row) for row in self.connection.execute(
+            f"SELECT {LOCATION_COLUMN}, key, recorded, category, source, translation, revised, comment_jp, comment_kr, event "
+            f"FROM report_history WHERE 1 = 1{conditions} ORDER BY recorded, id", params)]
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report Store")
+    parser.add_argument('--db', default=DEFAULT_STORE_FILE,
+                        help="レポートストアのファイル")
+    parser.add_argument('--category',
+                        help="카테고리（오기 / 오역 의심 / 표현 개선）")
+    parser.add_argument('--since',
+                        help="この日付（YYYY-MM-DD）以降に更新された行のみ")
+    parser.add_argument('--report', choices=['general', 'story'],
+                        help="検索するレポート")
+    parser.add_argument('--history', action='store_true',
+                        help="現在の行ではなく履歴を表示")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"レポートストアが見つかりません: {args.db}")
+
+    with ReportStore(args.db) as store:
+        if args.history:
+            header = REPORT_HEADER[:2] + ["기록 시각"] + REPORT_HEADER[3:] + ["이벤트"]  # 記録日時, イベント
+            rows = store.query_history(args.category, args.since, args.report)
+        else:
+            header = REPORT_HEADER
+            rows = store.query_rows(args.category, args.since, args.report)
+
+    sys.stdout.write('\t'.join(header) + '\n')
+    for row in rows:
+        sys.stdout.write('\t'.join(row) + '\n')
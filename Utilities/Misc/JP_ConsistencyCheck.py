@@ -0,0 +1,319 @@
+import os
+import sys
+import time
+import zlib
+import argparse
+import unicodedata
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from paratranz_entry import split_context, strip_comments
+from paratranz_source import open_paratranz_files
+import json_codec
+
+
+# ---------------------------------------------------
+
+PARATRANZ_DIR = 'paratranz'
+OUTPUT_FILE = 'translation_consistency.tsv'
+
+MIN_SOURCE_LENGTH = 2  # これより短い原文（正規化後）は対象外
+
+# 類似した原文の検出（--fuzzy）
+FUZZY_MIN_LENGTH = 8  # これより短い原文は対象外（数文字の違いで類似度が大きく変わるため）
+FUZZY_THRESHOLD = 0.8  # 原文の類似度（文字 n-gram の Jaccard 係数）がこれ以上の組を類似とみなす
+DIVERGENCE_MARGIN = 0.3  # 翻訳文の類似度が原文の類似度よりこれ以上低い組を報告する
+SOURCE_SHINGLE_SIZE = 3
+TRANSLATION_SHINGLE_SIZE = 2
+MINHASH_BIN_BITS = 5  # MinHash の署名の長さ（2 ** MINHASH_BIN_BITS = 32）
+LSH_ROWS = 4  # LSH の1バンドの長さ（32 / 4 = 8 バンド。類似度 0.8 の組は約 98% の確率で候補になる）
+MAX_BUCKET_SIZE = 200  # これより多くの原文が入るバケットは定型文とみなして候補にしない
+
+MAX_KEYS_SHOWN = 5  # レポートの1行に表示するキーの数
+
+REPORT_HEADER = [
+    "그룹", "종류", "유사도", "원문(KR)", "원문(EN)", "번역문", "건수", "키"  # グループ, 種別, 類似度, 原文(KR), 原文(EN), 翻訳文, 件数, キー
+]
+
+# ---------------------------------------------------
+
+
+"""
+JP Consistency Check
+=====================================
+
+【概要】
+ParaTranz のエクスポートから、同じ原文（KR / EN）に異なる翻訳文が付いているキーを検出するツールです。
+BattleAnnouncerDlg・AbDlg_*・StoryData など、複数のファイルに同じ原文がある場合の訳揺れの確認に使います。
+
+【処理内容】
+1. 各キーの原文（context の KR / EN）と翻訳文（コメントを除いた本文）を読み込む
+2. 原文を正規化（NFKC・英字の小文字化・空白の統一）し、正規化した原文をキーにした辞書（ハッシュ表）でキーをまとめる
+3. 同じ原文のキーで、正規化した翻訳文が2種類以上あるものを「일치」（一致）として報告
+4. --fuzzy を指定した場合、原文がほぼ同じで翻訳文が大きく異なる組を「유사」（類似）として報告
+   * 原文の文字 3-gram から MinHash（1回のハッシュで32個の値を作る One Permutation Hashing）を計算し、
+     署名を8つのバンドに分けた LSH で候補の組を探してから、Jaccard 係数を計算して確認
+   * 候補の検索は原文の数にほぼ比例する時間で終わるため、10万件以上でも数秒で処理可能
+
+【使い方】
+python JP_ConsistencyCheck.py [PARATRANZ_DIR_OR_ZIP] --fuzzy
+  * --group-by kr|en|both : 原文としてまとめる言語（既定は kr。KR がない場合は EN を使用。both は KR と EN の組）
+  * --output FILE         : レポートの出力先（既定は translation_consistency.tsv）
+  * --threshold 0.8       : --fuzzy で類似とみなす原文の類似度（0 より大きく 1 以下）
+"""
+
+
+def normalize_text(text):
+    """比較用に正規化する（NFKC・英字の小文字化・連続する空白を1つにまとめる）"""
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+def load_records(paratranz_source):
+    """
+    ParaTranz のエクスポートから、翻訳済みのキーを読み込む
+
+    Returns:
+        list: [(ファイル, キー, KRの原文, ENの原文, 翻訳文)]
+    """
+    records = []
+    with open_paratranz_files(paratranz_source) as paratranz_files:
+        for base_name in sorted(paratranz_files):
+            for item in json_codec.loads(paratranz_files[base_name]()):
+                translation = strip_comments(item.get("translation", ""))
+                if not translation.strip():
+                    continue
+                source_kr, source_en = split_context(item.get("context") or "")
+                records.append((base_name, item["key"], source_kr, source_en, translation))
+    return records
+
+
+def get_source_text(record, source):
+    """
+    正規化した原文（まとめる単位）を返す。対象外の原文の場合は None
+
+    source が both の場合は KR と EN の原文を改行でつなげる（正規化で改行はなくなるため区切りが重ならない）
+    """
+    source_kr, source_en = normalize_text(record[2]), normalize_text(record[3])
+    if source == "both":
+        text = f"{source_kr}\n{source_en}"
+    elif source == "en":
+        text = source_en or source_kr
+    else:
+        text = source_kr or source_en
+
+    if len(text) < MIN_SOURCE_LENGTH or not any(ch.isalpha() for ch in text):
+        return None
+    return text
+
+
+def group_by_source(records, source):
+    """正規化した原文ごとに、レコードの番号をまとめる {原文: [番号]}"""
+    groups = defaultdict(list)
+    for index, record in enumerate(records):
+        source_text = get_source_text(record, source)
+        if source_text is not None:
+            groups[source_text].append(index)
+    return groups
+
+
+def group_translations(records, indexes):
+    """正規化した翻訳文ごとに、レコードの番号をまとめる（件数の多い順）"""
+    variants = defaultdict(list)
+    for index in indexes:
+        variants[normalize_text(records[index][4])].append(index)
+    return sorted(variants.values(), key=len, reverse=True)
+
+
+def find_divergent_groups(records, groups):
+    """同じ原文で翻訳文が2種類以上あるグループ [[同じ翻訳文のレコードの番号]]（キーの多い順）"""
+    divergent = []
+    for indexes in groups.values():
+        if len(indexes) < 2:
+            continue
+        variants = group_translations(records, indexes)
+        if len(variants) > 1:
+            divergent.append(variants)
+    divergent.sort(key=lambda variants: -sum(map(len, variants)))
+    return divergent
+
+
+def get_shingles(text, size):
+    """文字 n-gram のハッシュ値（CRC32）の集合（size より短いテキストは全体を1つとする）"""
+    # 1文字4バイトに固定して1回だけエンコードし、n-gram ごとのエンコードを省く
+    data = text.encode('utf-32-le')
+    width = size * 4
+    if len(data) <= width:
+        return {zlib.crc32(data)}
+    return {zlib.crc32(data[i:i + width]) for i in range(0, len(data) - width + 1, 4)}
+
+
+def compute_minhash(shingles):
+    """
+    One Permutation Hashing による MinHash の署名
+
+    ハッシュ値の下位ビットで振り分けた区間（ビン）ごとの最小値を署名とする。
+    値が入らなかったビンは、右隣で最初に値があるビンの値を距離に応じてずらして使う（回転による補完）。
+    """
+    bin_count = 1 << MINHASH_BIN_BITS
+    value_range = 1 << (32 - MINHASH_BIN_BITS)
+    empty = value_range * bin_count
+    signature = [empty] * bin_count
+    for shingle in shingles:
+        bin_index = shingle & (bin_count - 1)
+        value = shingle >> MINHASH_BIN_BITS
+        if value < signature[bin_index]:
+            signature[bin_index] = value
+
+    if empty not in signature:
+        return signature
+    densified = list(signature)
+    for bin_index, value in enumerate(signature):
+        if value != empty:
+            continue
+        for distance in range(1, bin_count):
+            borrowed = signature[(bin_index + distance) % bin_count]
+            if borrowed != empty:
+                densified[bin_index] = borrowed + distance * empty
+                break
+    return densified
+
+
+def jaccard(a, b):
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+def find_candidate_pairs(signatures, sizes, threshold):
+    """
+    LSH（署名をバンドに分け、バンドの値が一致するもの同士を候補にする）で類似している可能性がある組を返す
+
+    signatures は n-gram の数（sizes）の昇順に並べておく。
+    Jaccard 係数は n-gram の数の比を超えないため、数の比が threshold 未満の組は候補にしない。
+    """
+    buckets = defaultdict(list)
+    for unit_index, signature in enumerate(signatures):
+        for start in range(0, len(signature), LSH_ROWS):
+            buckets[(start, tuple(signature[start:start + LSH_ROWS]))].append(unit_index)
+
+    pairs = set()
+    for unit_indexes in buckets.values():
+        if len(unit_indexes) < 2 or len(unit_indexes) > MAX_BUCKET_SIZE:
+            continue
+        for i, first in enumerate(unit_indexes):
+            max_size = sizes[first] / threshold
+            for second in unit_indexes[i + 1:]:
+                if sizes[second] > max_size:
+                    break
+                pairs.add((first, second))
+    return pairs
+
+
+def find_divergent_pairs(records, groups, threshold):
+    """
+    原文が類似していて、翻訳文が大きく異なる組を探す
+
+    Returns:
+        list: [(原文の類似度, 翻訳文の類似度, グループA, グループB)]（類似度の差が大きい順）。
+              グループは同じ原文のレコードの番号のリスト。
+    """
+    units = []
+    for source_text, indexes in groups.items():
+        if len(source_text) >= FUZZY_MIN_LENGTH:
+            units.append((get_shingles(source_text, SOURCE_SHINGLE_SIZE), indexes))
+    units.sort(key=lambda unit: len(unit[0]))
+
+    source_shingles = [shingles for shingles, _ in units]
+    signatures = [compute_minhash(shingles) for shingles in source_shingles]
+    translation_shingles = {}
+
+    def get_translation_shingles(unit_index):
+        # グループで最も多い翻訳文を代表とする
+        shingles = translation_shingles.get(unit_index)
+        if shingles is None:
+            translation = normalize_text(records[group_translations(records, units[unit_index][1])[0][0]][4])
+            shingles = translation_shingles[unit_index] = get_shingles(translation, TRANSLATION_SHINGLE_SIZE)
+        return shingles
+
+    divergent = []
+    for first, second in find_candidate_pairs(signatures, [len(shingles) for shingles in source_shingles], threshold):
+        source_similarity = jaccard(source_shingles[first], source_shingles[second])
+        if source_similarity < threshold:
+            continue
+        translation_similarity = jaccard(get_translation_shingles(first), get_translation_shingles(second))
+        if source_similarity - translation_similarity >= DIVERGENCE_MARGIN:
+            divergent.append((source_similarity, translation_similarity, units[first][1], units[second][1]))
+    divergent.sort(key=lambda pair: (pair[1] - pair[0], pair[2][0], pair[3][0]))
+    return divergent
+
+
+def format_row(records, group_id, kind, similarity, indexes):
+    """同じ原文・翻訳文のレコードをレポートの1行にする"""
+    _, _, source_kr, source_en, translation = records[indexes[0]]
+    keys = [f"{records[index][0]}:{records[index][1]}" for index in indexes[:MAX_KEYS_SHOWN]]
+    if len(indexes) > MAX_KEYS_SHOWN:
+        keys.append(f"... (+{len(indexes) - MAX_KEYS_SHOWN})")
+    return [
+        str(group_id), kind, similarity,
+        source_kr.replace('\n', '\\n'), source_en.replace('\n', '\\n'), translation.replace('\n', '\\n'),
+        str(len(indexes)), ", ".join(keys)
+    ]
+
+
+def write_report(output_path, records, divergent_groups, divergent_pairs):
+    """レポートをタブ区切りで書き出す（JP_TRImporter のレポートと同じ形式）"""
+    rows = []
+    group_id = 0
+    for variants in divergent_groups:
+        group_id += 1
+        for indexes in variants:
+            rows.append(format_row(records, group_id, "일치", "", indexes))  # 一致
+    for source_similarity, translation_similarity, *units in divergent_pairs:
+        group_id += 1
+        similarity = f"{source_similarity:.2f} / {translation_similarity:.2f}"
+        for indexes in units:
+            # 類似した原文の組は、それぞれの原文で最も多い翻訳文を代表として表示
+            rows.append(format_row(records, group_id, "유사", similarity, group_translations(records, indexes)[0]))  # 類似
+
+    with open(output_path, 'w', encoding='utf-8-sig', newline='\r\n') as txtfile:
+        txtfile.write('\t'.join(REPORT_HEADER) + '\n')
+        for row in rows:
+            txtfile.write('\t'.join(row) + '\n')
+
+
+def parse_threshold(value):
+    """--threshold の値を確認する（0 の場合は候補の絞り込みで 0 除算になるため受け付けない）"""
+    threshold = float(value)
+    if not 0 < threshold <= 1:
+        raise argparse.ArgumentTypeError(f"0 より大きく 1 以下の値を指定してください: {value}")
+    return threshold
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="JP Consistency Check")
+    parser.add_argument('source', nargs='?', default=PARATRANZ_DIR,
+                        help="ParaTranz のエクスポート（展開済みのフォルダ、または zip ファイル）")
+    parser.add_argument('--group-by', choices=["kr", "en", "both"], default="kr",
+                        help="原文としてまとめる言語")
+    parser.add_argument('--fuzzy', action='store_true',
+                        help="原文が類似していて翻訳文が大きく異なる組も報告する")
+    parser.add_argument('--threshold', type=parse_threshold, default=FUZZY_THRESHOLD,
+                        help="--fuzzy で類似とみなす原文の類似度（0 より大きく 1 以下）")
+    parser.add_argument('--output', default=OUTPUT_FILE,
+                        help="レポートの出力先")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = load_records(args.source)
+    groups = group_by_source(records, args.group_by)
+    print(f"{len(records)} キー, {len(groups)} 種類の原文 ({time.perf_counter() - start:.1f}s)")
+
+    divergent_groups = find_divergent_groups(records, groups)
+    print(f"翻訳文が異なる同じ原文: {len(divergent_groups)} 件 ({time.perf_counter() - start:.1f}s)")
+
+    divergent_pairs = []
+    if args.fuzzy:
+        divergent_pairs = find_divergent_pairs(records, groups, args.threshold)
+        print(f"翻訳文が大きく異なる類似した原文: {len(divergent_pairs)} 組 ({time.perf_counter() - start:.1f}s)")
+
+    write_report(args.output, records, divergent_groups, divergent_pairs)
+    print(f"レポートを書き出しました: {args.output}")
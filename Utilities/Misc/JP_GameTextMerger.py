@@ -1,7 +1,14 @@
 import os
-import json
 import re
-from collections import OrderedDict
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from text_extraction import UniqueRootIdKeyPolicy, extract_target_values as engine_extract_target_values
+from json_cache import load_cached, hash_files, prune_cache
+import json_codec
 
 
 CUSTOM_FILE_ORDER_PATH = "JP_GameTextMerger_Rules.txt"
@@ -63,7 +70,7 @@ TARGET_KEYS = {'abName', 'abnormalityName', 'add', 'area', 'askLevelUp',
 【使用方法】
 1. 各言語のJSONファイルを対応するディレクトリに配置
 2. JP_ScenarioModelCodes-AutoCreated.json をLocalize/jp/に配置（キャラクター名変換用）
-3. python このファイル名.py を実行
+3. python このファイル名.py を実行（--jobs N を指定するとN並列でファイルを処理）
 4. txt_outputディレクトリの統合ファイルで校正作業を実施
 
 【設定オプション】
@@ -84,8 +91,7 @@ TARGET_KEYS = {'abName', 'abnormalityName', 'add', 'area', 'askLevelUp',
 
 def create_id_name_dictionary():
     # JSONファイルを読み込む
-    with open(model_json, 'r', encoding='utf-8') as file:
-        data = json.load(file)
+    data = json_codec.load_file(model_json)
     
     # "id"をキーとし、"name"を値とする辞書を作成
     # nameが空の場合はスキップする
@@ -96,105 +102,89 @@ def create_id_name_dictionary():
 
 MODEL_NAMES = create_id_name_dictionary()
 
+# 抽出結果のキャッシュの識別子（ツール・モデル名の定義が変更された場合は別のキャッシュになる）
+CACHE_NAMESPACE = "merger-" + hash_files(
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common', 'text_extraction.py'),
+    model_json
+)
+
+
+
+def format_display_value(key, val):
+    """校正用に表示形式を整える（話者・タイトル・場所・モデル名）"""
+    if key == 'teller':
+        val = f"[{val}]" if val else "[...]"
+    elif key == 'title':
+        val = f"({val})" if val else val
+    elif key == 'place':
+        val = f"- {val} -" if val else val
+    elif key == 'model':
+        model_name = MODEL_NAMES.get(val)
+        val = f"[{model_name}]" if model_name else ""
+    return val
+
+
+class ProofreadKeyPolicy(UniqueRootIdKeyPolicy):
+    """
+    校正用テキストのキー規則。
+    UniqueRootIdKeyPolicy に加え、title と desc を持つ dataList の要素の desc 末尾に
+    区切りマーカーを付加する（入力データは変更しない）。
+    """
+
+    def __init__(self, target_keys):
+        super().__init__(target_keys, format_display_value)
+        self.desc_crlf_entries = set()  # {id(dataListの要素)}
+
+    def root_id_for(self, data, root_id):
+        data_list = data.get("dataList")
+        if isinstance(data_list, list):
+            for item in data_list:
+                if isinstance(item, dict) and "id" in item and "title" in item and isinstance(item.get("desc"), str):
+                    self.desc_crlf_entries.add(id(item))
+        return super().root_id_for(data, root_id)
+
+    def transform(self, key, value, root_id, entry):
+        if key == "desc" and id(entry) in self.desc_crlf_entries:
+            # 従来の出力と同じくマーカーを2つ付加する（重複削除の判定に影響するため）
+            value += "<JSON_CRLF><JSON_CRLF>"
+        return super().transform(key, value, root_id, entry)
 
 
 def extract_target_values(data, root_id=None, path="", skip_top_dataList=True, in_dataList=False):
-    id_groups = {}
-    id_key_order = {}
-    id_has_array = {}
-
-    # 新しい：IDに連番を付けて一意化し、順番を保持
-    root_id_map = {}  # {original_id: count}
-    def get_unique_root_id(original_id):
-        count = root_id_map.get(original_id, 0) + 1
-        root_id_map[original_id] = count
-        return f"{original_id}#{count}"
-
-    def _extract_values(data, root_id=None, path="", skip_top_dataList=True, in_dataList=False):
-        values = OrderedDict()
-
-        if isinstance(data, dict) and "dataList" in data and isinstance(data["dataList"], list):
-            dataList = data["dataList"]
-            for item in dataList:
-                if isinstance(item, dict) and "id" in item and "title" in item and "desc" in item:
-                    if isinstance(item["desc"], str):
-                        item["desc"] += "<JSON_CRLF>"
-
-        if isinstance(data, dict):
-            current_id = data.get("id")
-            if root_id is None and current_id is not None:
-                root_id = get_unique_root_id(str(current_id))
-
-            for key, val in data.items():
-                if key == "id" and path != "":
-                    continue
-
-                if skip_top_dataList and path == "" and key == "dataList":
-                    values.update(_extract_values(val, root_id, path="", skip_top_dataList=False, in_dataList=True))
-                    continue
-
-                new_path = f"{path}.{key}" if path else key
-
-                if isinstance(val, str) and key in TARGET_KEYS:
-                    if key == 'teller':
-                        val = f"[{val}]" if val else "[...]"
-                    elif key == 'title':
-                        val = f"({val})" if val else val
-                    elif key == 'place':
-                        val = f"- {val} -" if val else val
-                    elif key == 'model':
-                        model_name = MODEL_NAMES.get(val)
-                        val = f"[{model_name}]" if model_name else ""
-
-                    # コメントアウト処理（root_id == '-1' かつ content の場合）
-                    if root_id:
-                        if root_id.startswith('-1'):
-                            val = f"// {val}"
-
-                    final_key = f"{root_id}-{new_path}" if root_id else new_path
-                    values[final_key] = val
-
-                    if root_id:
-                        id_groups.setdefault(root_id, []).append(final_key)
-                        id_key_order.setdefault(root_id, []).append(final_key)
-                else:
-                    if isinstance(val, list) and root_id:
-                        id_has_array[root_id] = True
-
-                    values.update(_extract_values(val, root_id, new_path, skip_top_dataList=False, in_dataList=False))
-
-        elif isinstance(data, list):
-            if root_id:
-                id_has_array[root_id] = True
-
-            for index, item in enumerate(data):
-                if isinstance(item, str):
-                    if path:
-                        final_key = f"{root_id}-{path}[{index}]" if root_id else f"{path}[{index}]"
-                        values[final_key] = item
-                        if root_id:
-                            id_groups.setdefault(root_id, []).append(final_key)
-                            id_key_order.setdefault(root_id, []).append(final_key)
-                else:
-                    if in_dataList:
-                        values.update(_extract_values(item, root_id, path, skip_top_dataList=False, in_dataList=False))
-                    else:
-                        new_path = f"{path}[{index}]" if path else f"[{index}]"
-                        values.update(_extract_values(item, root_id, new_path, skip_top_dataList=False, in_dataList=False))
-
-        return values
-
-    processed_data = json.loads(json.dumps(data))
-    _extract_values(processed_data, root_id, path, skip_top_dataList, in_dataList)
-    all_values = _extract_values(processed_data, root_id, path, skip_top_dataList, in_dataList)
-
-    for id_val, keys in id_groups.items():
-        if keys and id_has_array.get(id_val, False):
-            last_key = id_key_order[id_val][-1]
+    # IDに連番を付けて一意化し、順番を保持する（共通抽出エンジンで1回だけ走査）
+    policy = ProofreadKeyPolicy(TARGET_KEYS)
+    all_values = engine_extract_target_values(data, policy, root_id, path, skip_top_dataList, in_dataList)
+
+    # リストを含むIDは最後のテキストの後に区切りマーカーを付加
+    for id_val, keys in policy.id_key_order.items():
+        if keys and policy.id_has_array.get(id_val, False):
+            last_key = keys[-1]
             if last_key in all_values:
                 all_values[last_key] += "<JSON_CRLF>"
 
-    return all_values
+    return offset_root_ids(all_values, policy)
+
+
+def offset_root_ids(values, policy):
+    """
+    キーの連番を同じIDの出現数の後から振り直す（"{ID}#{出現数+N}"）。
+    従来は2回走査した2回目の結果を使っていたため、JP/KR/EN間のキーの対応を従来と一致させる。
+    """
+    key_root_ids = {}
+    for id_val, keys in policy.id_key_order.items():
+        for key in keys:
+            key_root_ids[key] = id_val
+
+    renamed = {}
+    for key, value in values.items():
+        id_val = key_root_ids.get(key)
+        if id_val:
+            original_id, count = id_val.rsplit('#', 1)
+            new_id = f"{original_id}#{policy.root_id_map[original_id] + int(count)}"
+            key = new_id + key[len(id_val):]
+        renamed[key] = value
+    return renamed
 
 
 
@@ -235,6 +225,56 @@ def restore_crlf_in_text(text):
 #    result = text
     return result
 
+def is_story_file_path(jp_path):
+    """ストーリーファイルかどうかを判定（大文字小文字を区別しない）"""
+    return "storydata" in jp_path.lower() if jp_path else False
+
+
+def read_jp_values(jp_path):
+    """JPファイルを読み込み、校正用のテキストを抽出する（ストーリーファイルはID・話者を補完）"""
+    jp_data = json_codec.load_file(jp_path)
+    if is_story_file_path(jp_path):
+        for idx, entry in enumerate(jp_data.get('dataList', [])):
+            # Add sequential ID if 'id' key is missing
+            if 'id' not in entry:
+                entry['id'] = idx + 1
+            
+            # Add 'teller' field if both 'model' and 'teller' are missing
+            if 'model' not in entry and 'teller' not in entry:
+                new_entry = {}
+                inserted = False
+                for key, value in entry.items():
+                    if not inserted and key == 'content':
+                        new_entry['teller'] = ''
+                        inserted = True
+                    new_entry[key] = value
+                jp_data['dataList'][idx] = new_entry
+
+    jp_values = extract_target_values(jp_data)
+
+    # jp_valuesを作成後、不要な'>> 'エントリを除外
+    keys_to_delete = []
+    prev_key = None
+    prev_value = None
+    for key, value in jp_values.items():
+#        if prev_value == '[]' and isinstance(value, str) and value.startswith('['):
+        if prev_value == '[]' and isinstance(value, str) and value.startswith('['):
+            keys_to_delete.append(prev_key)
+        elif isinstance(value, str) and prev_value == value and value.startswith('['):
+            keys_to_delete.append(prev_key)
+        prev_key = key
+        prev_value = value
+
+    for key in keys_to_delete:
+        jp_values.pop(key, None)
+    return jp_values
+
+
+def read_values(file_path):
+    """KR/ENファイルを読み込み、校正用のテキストを抽出する"""
+    return extract_target_values(json_codec.load_file(file_path))
+
+
 def process_translation_files(base_name, jp_file, kr_file, en_file, jp_all_texts, kr_all_texts, en_all_texts, 
                               jp_story_texts, kr_story_texts, en_story_texts):
     jp_path = os.path.join(JP_DIR[0], jp_file)
@@ -242,47 +282,11 @@ def process_translation_files(base_name, jp_file, kr_file, en_file, jp_all_texts
     en_path = os.path.join(EN_DIR[0], en_file) if en_file else None
     
     # Check if this is a story file (using case-insensitive check)
-    is_story_file = "storydata" in jp_path.lower() if jp_path else False
+    is_story_file = is_story_file_path(jp_path)
     
-    # Load JSON files
+    # Load JSON files（前回の抽出結果がキャッシュにあればそれを使用）
     try:
-        with open(jp_path, "r", encoding="utf-8") as f:
-            jp_data = json.load(f)
-        if is_story_file:
-            for idx, entry in enumerate(jp_data.get('dataList', [])):
-                # Add sequential ID if 'id' key is missing
-                if 'id' not in entry:
-                    entry['id'] = idx + 1
-                
-                # Add 'teller' field if both 'model' and 'teller' are missing
-                if 'model' not in entry and 'teller' not in entry:
-                    new_entry = {}
-                    inserted = False
-                    for key, value in entry.items():
-                        if not inserted and key == 'content':
-                            new_entry['teller'] = ''
-                            inserted = True
-                        new_entry[key] = value
-                    jp_data['dataList'][idx] = new_entry
-
-        jp_values = extract_target_values(jp_data)
-
-        # jp_valuesを作成後、不要な'>> 'エントリを除外
-        keys_to_delete = []
-        prev_key = None
-        prev_value = None
-        for key, value in jp_values.items():
-#            if prev_value == '[]' and isinstance(value, str) and value.startswith('['):
-            if prev_value == '[]' and isinstance(value, str) and value.startswith('['):
-                keys_to_delete.append(prev_key)
-            elif isinstance(value, str) and prev_value == value and value.startswith('['):
-                keys_to_delete.append(prev_key)
-            prev_key = key
-            prev_value = value
-
-        for key in keys_to_delete:
-            jp_values.pop(key, None)
-
+        jp_values = load_cached(jp_path, CACHE_NAMESPACE + "-jp", read_jp_values)
     except Exception as e:
         print(f"Error processing JP file {jp_path}: {e}")
         jp_values = {}
@@ -293,16 +297,14 @@ def process_translation_files(base_name, jp_file, kr_file, en_file, jp_all_texts
     kr_values = {}
     if kr_path and os.path.exists(kr_path):
         try:
-            with open(kr_path, "r", encoding="utf-8") as f:
-                kr_values = extract_target_values(json.load(f))
+            kr_values = load_cached(kr_path, CACHE_NAMESPACE, read_values)
         except Exception as e:
             print(f"Error processing KR file {kr_path}: {e}")
     
     en_values = {}
     if en_path and os.path.exists(en_path):
         try:
-            with open(en_path, "r", encoding="utf-8") as f:
-                en_values = extract_target_values(json.load(f))
+            en_values = load_cached(en_path, CACHE_NAMESPACE, read_values)
         except Exception as e:
             print(f"Error processing EN file {en_path}: {e}")
     
@@ -397,6 +399,14 @@ def process_translation_files(base_name, jp_file, kr_file, en_file, jp_all_texts
                 en_all_texts.append((base_name, en_file_texts))
 
 
+def process_translation_task(task):
+    """1ファイル分（JP/KR/EN）を処理し、マージ用テキストのリストを返す（ワーカープロセス用）"""
+    base_name, jp_file, kr_file, en_file = task
+    texts = ([], [], [], [], [], [])  # jp/kr/en の一般ファイル用、jp/kr/en のストーリーファイル用
+    process_translation_files(base_name, jp_file, kr_file, en_file, *texts)
+    return texts
+
+
 def load_priority_patterns():
     """優先度パターンファイルを読み込み、ファイル名と優先度の辞書を返す"""
     priority_patterns = {}
@@ -420,86 +430,106 @@ def load_priority_patterns():
             print(f"優先度パターンファイルの読み込みに失敗しました: {e}")
     return priority_patterns
 
-def write_merged_file(output_path, text_data, remove_duplicates=False, story_texts=False):
-    """マージしたテキストをファイルに書き込む"""
-    
-    # 優先度パターンを読み込み
-    priority_patterns = load_priority_patterns()
+def extract_sort_info(filename, priority_patterns):
+    """ストーリーファイルのソートキーを返す"""
+    name, _ = os.path.splitext(os.path.basename(filename))
     
-    def extract_sort_info(filename):
-        name, _ = os.path.splitext(os.path.basename(filename))
-        
-        if match := re.match(r'^S(\d+)', name):
-            number = match.group(1)
-            length = len(number)
-            if length == 3:
-                chapter_num = int(number[0])
-            elif length == 4:
-                chapter_num = int(number[:2])
-            elif length >= 5:
-                chapter_num = int(number[:3])
-            else:
-                chapter_num = int(number)
-            
-            # 外部ファイルで指定された優先度があればそれを使用、なければデフォルト値
-            group_priority = priority_patterns.get(name, 0)  # S系のデフォルトは0
-                
-        elif match := re.match(r'^(\d+)D', name):
-            chapter_num = int(match.group(1))
-            # 外部ファイルで指定された優先度があればそれを使用、なければデフォルト値
-            group_priority = priority_patterns.get(name, 1)  # D系のデフォルトは1
-        else:
-            chapter_num = float('inf')
-            # 外部ファイルで指定された優先度があればそれを使用、なければデフォルト値
-            group_priority = priority_patterns.get(name, 2)  # 想定外のデフォルトは2
-            
-        # A/B識別子（デフォルトは'A'より'B'を先にする）
-        if name.endswith('B'):
-            ab_name = f"{name[0:-1]}_0"
-        elif re.match(r'.*I\d*$', name):
-            ab_name = re.sub(r'(.*)I(.*)', r'\1_1\2', name)
-        elif name.endswith('A'):
-            ab_name = f"{name[0:-1]}_2"
+    if match := re.match(r'^S(\d+)', name):
+        number = match.group(1)
+        length = len(number)
+        if length == 3:
+            chapter_num = int(number[0])
+        elif length == 4:
+            chapter_num = int(number[:2])
+        elif length >= 5:
+            chapter_num = int(number[:3])
         else:
-            ab_name = f"{name}_3"
+            chapter_num = int(number)
+        
+        # 外部ファイルで指定された優先度があればそれを使用、なければデフォルト値
+        group_priority = priority_patterns.get(name, 0)  # S系のデフォルトは0
             
-        # チャプター番号、グループ優先度、A/B優先度、ファイル名で比較する
-        return (chapter_num, group_priority, ab_name, name)
-
-    def sort_key(item):
-        base_name, _ = item
-        return extract_sort_info(base_name)
-
-    if story_texts:
-        text_data = sorted(text_data, key=sort_key)
-
-    lines = []
-    for base_name, texts in text_data:
-        if texts:
-            separator = f"---------------{base_name}---------------\n"
-            lines.append(separator)
-            if remove_duplicates and story_texts == False:
-                unique_texts = []
-                seen = set()
-                for text in texts:
-                    if text.strip() == "<JSON_CRLF>":
-                        unique_texts.append(text)
-                    elif text not in seen:
-                        unique_texts.append(text)
-                        seen.add(text)
-                for text in unique_texts:
-                    text = restore_crlf_in_text(text)
-                    lines.append(f"{text}\n")
-            else:
-                for text in texts:
-                    text = restore_crlf_in_text(text)
-                    lines.append(f"{text}\n")
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.writelines(lines)
-
-
-def process_directories():
+    elif match := re.match(r'^(\d+)D', name):
+        chapter_num = int(match.group(1))
+        # 外部ファイルで指定された優先度があればそれを使用、なければデフォルト値
+        group_priority = priority_patterns.get(name, 1)  # D系のデフォルトは1
+    else:
+        chapter_num = float('inf')
+        # 外部ファイルで指定された優先度があればそれを使用、なければデフォルト値
+        group_priority = priority_patterns.get(name, 2)  # 想定外のデフォルトは2
+        
+    # A/B識別子（デフォルトは'A'より'B'を先にする）
+    if name.endswith('B'):
+        ab_name = f"{name[0:-1]}_0"
+    elif re.match(r'.*I\d*$', name):
+        ab_name = re.sub(r'(.*)I(.*)', r'\1_1\2', name)
+    elif name.endswith('A'):
+        ab_name = f"{name[0:-1]}_2"
+    else:
+        ab_name = f"{name}_3"
+        
+    # チャプター番号、グループ優先度、A/B優先度、ファイル名で比較する
+    return (chapter_num, group_priority, ab_name, name)
+
+
+def sort_story_items(items, priority_patterns, get_base_name=lambda item: item[0]):
+    """ストーリーファイルをソートする（ソートキーはファイルごとに1回だけ計算）"""
+    sort_keys = {}
+    for item in items:
+        base_name = get_base_name(item)
+        if base_name not in sort_keys:
+            sort_keys[base_name] = extract_sort_info(base_name, priority_patterns)
+    return sorted(items, key=lambda item: sort_keys[get_base_name(item)])
+
+
+class MergedFileWriter:
+    """
+    マージファイルへファイル単位のテキストを順次書き込むライター。
+    全ファイル分の行をメモリに溜めず、渡された順にそのままディスクへ書き出す。
+    """
+
+    def __init__(self, output_path, remove_duplicates=False, story_texts=False):
+        self.output_path = output_path
+        self.remove_duplicates = remove_duplicates
+        self.story_texts = story_texts
+        self.file_count = 0  # 書き込んだファイル数
+        self.line_count = 0  # 書き込んだテキスト数（重複削除前）
+        self.f = None
+
+    def __enter__(self):
+        self.f = open(self.output_path, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc_info):
+        self.f.close()
+
+    def write(self, base_name, texts):
+        """1ファイル分のテキストを区切り行とともに書き込む"""
+        if not texts:
+            return
+        self.file_count += 1
+        self.line_count += len(texts)
+
+        separator = f"---------------{base_name}---------------\n"
+        self.f.write(separator)
+        if self.remove_duplicates and self.story_texts == False:
+            unique_texts = []
+            seen = set()
+            for text in texts:
+                if text.strip() == "<JSON_CRLF>":
+                    unique_texts.append(text)
+                elif text not in seen:
+                    unique_texts.append(text)
+                    seen.add(text)
+            texts = unique_texts
+        self.f.writelines(f"{restore_crlf_in_text(text)}\n" for text in texts)
+
+
+def process_directories(jobs=1):
+    """
+    全ファイルを処理してマージファイルを出力（jobs > 1 の場合はプロセスプールで並列処理）
+    処理結果は受け取った順にマージファイルへ書き込み、全言語のテキストをメモリに保持しない。
+    """
     if not os.path.exists(JP_DIR[0]):
         print(f"{JP_DIR[0]} directory not found!")
         return
@@ -524,79 +554,77 @@ def process_directories():
     print(f"KRファイル数: {len(kr_files)}")
     print(f"ENファイル数: {len(en_files)}")
     
-    # マージするテキスト用のリスト (一般ファイル用)
-    jp_all_texts = []  # (base_name, [text1, text2, ...]) のリスト
-    kr_all_texts = []
-    en_all_texts = []
-    
-    # マージするテキスト用のリスト (ストーリーファイル用)
-    jp_story_texts = []
-    kr_story_texts = []
-    en_story_texts = []
-    
-    processed_count = 0
+    # 対応するKRファイルとENファイルを取得
+    # 一般ファイルは元の順序、ストーリーファイルはマージ時の順序（章順）で処理する
+    general_tasks = []
+    story_tasks = []
     for base_name, jp_file in jp_files.items():
-        # 対応するKRファイルとENファイルを取得
-        kr_file = kr_files.get(base_name)
-        en_file = en_files.get(base_name)
-        
-        # 各言語のファイルを処理し、マージ用テキストを収集
-        process_translation_files(
-            base_name, jp_file, kr_file, en_file, 
-            jp_all_texts, kr_all_texts, en_all_texts,
-            jp_story_texts, kr_story_texts, en_story_texts
-        )
-        processed_count += 1
-        
-        # 進捗を表示（100ファイルごと）
-        if processed_count % 100 == 0:
-            print(f"{processed_count} ファイルを処理しました...")
-    
-    # マージしたファイルを出力 (一般ファイル)
-    print("\n一般ファイルのマージを開始...")
-    write_merged_file(os.path.join(OUTPUT_DIR, "jp_all_general.txt"), jp_all_texts, DEL_DUPLICATES)
-    write_merged_file(os.path.join(OUTPUT_DIR, "kr_all_general.txt"), kr_all_texts, DEL_DUPLICATES)
-    write_merged_file(os.path.join(OUTPUT_DIR, "en_all_general.txt"), en_all_texts, DEL_DUPLICATES)
-    
-    # マージしたファイルを出力 (ストーリーファイル)
-    print("ストーリーファイルのマージを開始...")
-    write_merged_file(os.path.join(OUTPUT_DIR, "jp_all_story.txt"), jp_story_texts, DEL_DUPLICATES, story_texts=True)
-    write_merged_file(os.path.join(OUTPUT_DIR, "kr_all_story.txt"), kr_story_texts, DEL_DUPLICATES, story_texts=True)
-    write_merged_file(os.path.join(OUTPUT_DIR, "en_all_story.txt"), en_story_texts, DEL_DUPLICATES, story_texts=True)
+        task = (base_name, jp_file, kr_files.get(base_name), en_files.get(base_name))
+        if is_story_file_path(os.path.join(JP_DIR[0], jp_file)):
+            story_tasks.append(task)
+        else:
+            general_tasks.append(task)
+    # 優先度パターンは一度だけ読み込む
+    priority_patterns = load_priority_patterns()
+    tasks = general_tasks + sort_story_items(story_tasks, priority_patterns)
+
+    # マージファイルのライター（jp/kr/en の一般ファイル用、jp/kr/en のストーリーファイル用）
+    writers = [
+        MergedFileWriter(os.path.join(OUTPUT_DIR, f"{lang}_all_general.txt"), DEL_DUPLICATES)
+        for lang in ("jp", "kr", "en")
+    ] + [
+        MergedFileWriter(os.path.join(OUTPUT_DIR, f"{lang}_all_story.txt"), DEL_DUPLICATES, story_texts=True)
+        for lang in ("jp", "kr", "en")
+    ]
+
+    print("\nファイルの処理とマージを開始...")
+    with ExitStack() as stack:
+        for writer in writers:
+            stack.enter_context(writer)
+
+        # map は投入順に結果を返すため、マージ順は逐次実行と同一になる
+        if jobs > 1:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+            results = executor.map(process_translation_task, tasks, chunksize=16)
+        else:
+            results = map(process_translation_task, tasks)
+
+        processed_count = 0
+        for texts in results:
+            # 各言語のマージ用テキストをそのまま書き込む
+            for writer, file_texts in zip(writers, texts):
+                for base_name, merged_texts in file_texts:
+                    writer.write(base_name, merged_texts)
+            processed_count += 1
+
+            # 進捗を表示（100ファイルごと）
+            if processed_count % 100 == 0:
+                print(f"{processed_count} ファイルを処理しました...")
     
     print(f"\n合計 {processed_count} ファイルを処理しました。")
+    prune_cache()
     
     # マージ結果の情報を表示
     dup_status = "重複削除済み" if DEL_DUPLICATES else "重複含む"
-    
-    # ファイル数の計算
-    jp_general_files = len(jp_all_texts)
-    jp_story_files = len(jp_story_texts)
-    kr_general_files = len(kr_all_texts)
-    kr_story_files = len(kr_story_texts)
-    en_general_files = len(en_all_texts)
-    en_story_files = len(en_story_texts)
-    
-    # テキスト行数の計算
-    jp_general_lines = sum(len(texts) for _, texts in jp_all_texts)
-    jp_story_lines = sum(len(texts) for _, texts in jp_story_texts)
-    kr_general_lines = sum(len(texts) for _, texts in kr_all_texts)
-    kr_story_lines = sum(len(texts) for _, texts in kr_story_texts)
-    en_general_lines = sum(len(texts) for _, texts in en_all_texts)
-    en_story_lines = sum(len(texts) for _, texts in en_story_texts)
+    jp_general, kr_general, en_general, jp_story, kr_story, en_story = writers
     
     print(f"\nマージされたファイル（{dup_status}）:")
     print(f"  一般ファイル:")
-    print(f"    jp_all_general.txt: {jp_general_files}ファイル、{jp_general_lines}行")
-    print(f"    kr_all_general.txt: {kr_general_files}ファイル、{kr_general_lines}行")
-    print(f"    en_all_general.txt: {en_general_files}ファイル、{en_general_lines}行")
+    print(f"    jp_all_general.txt: {jp_general.file_count}ファイル、{jp_general.line_count}行")
+    print(f"    kr_all_general.txt: {kr_general.file_count}ファイル、{kr_general.line_count}行")
+    print(f"    en_all_general.txt: {en_general.file_count}ファイル、{en_general.line_count}行")
     print(f"  ストーリーファイル:")
-    print(f"    jp_all_story.txt: {jp_story_files}ファイル、{jp_story_lines}行")
-    print(f"    kr_all_story.txt: {kr_story_files}ファイル、{kr_story_lines}行")
-    print(f"    en_all_story.txt: {en_story_files}ファイル、{en_story_lines}行")
+    print(f"    jp_all_story.txt: {jp_story.file_count}ファイル、{jp_story.line_count}行")
+    print(f"    kr_all_story.txt: {kr_story.file_count}ファイル、{kr_story.line_count}行")
+    print(f"    en_all_story.txt: {en_story.file_count}ファイル、{en_story.line_count}行")
 
 if __name__ == "__main__":
-    process_directories()
+    parser = argparse.ArgumentParser(description="JP - Game Text Merger")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="ファイル処理の並列数（1の場合は逐次処理）")
+    args = parser.parse_args()
+
+    process_directories(jobs=args.jobs)
     print("処理が完了しました。テキストファイルは txt_output ディレクトリに出力されました。")
 
 
@@ -0,0 +1,285 @@
+import os
+import sys
+import time
+import argparse
+import fnmatch
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from aho_corasick import AhoCorasick
+from paratranz_entry import split_context, strip_comments
+from paratranz_source import open_paratranz_files
+import json_codec
+from JP_LangJsonGenerator import load_json_values
+from JP_TextSearch import find_source_files
+
+
+# ---------------------------------------------------
+
+# 確認する翻訳（Localize_Fixed の JP と Localize の KR / EN を同じキーで対応させる）
+FIXED_DIR = ("Localize_Fixed/jp_fixed", "JP_")
+PARATRANZ_DIR = 'paratranz'
+OUTPUT_FILE = 'glossary_report.tsv'
+
+# 用語集として使うファイルとキー（ファイル名のパターン, キーの末尾）
+GLOSSARY_SOURCES = (
+    ("ScenarioModelCodes-AutoCreated.json", ("-name", "-nickName")),  # 人物名・呼び名
+    ("BattleKeywords*.json", ("-name",)),  # キーワード
+    ("Bufs*.json", ("-name",)),  # 状態効果
+    ("Passives*.json", ("-name",)),  # パッシブ
+)
+MIN_KR_TERM_LENGTH = 2
+MIN_EN_TERM_LENGTH = 3
+SUMMARY_TERMS_SHOWN = 10
+
+REPORT_HEADER = [
+    "경로", "키", "종류", "용어(KR)", "용어(EN)", "기대 표기", "사용된 표기", "원문", "번역문"  # パス, キー, 種別, 用語(KR), 用語(EN), 期待する表記, 使われた表記, 原文, 翻訳文
+]
+KIND_MISSING = "누락"  # 用語の訳がない
+KIND_VARIANT = "표기 다름"  # 用語集の別の表記が使われている
+
+ROLE_KR, ROLE_EN, ROLE_JP = 0, 1, 2
+
+# ---------------------------------------------------
+
+
+"""
+JP Glossary Check
+=====================================
+
+【概要】
+人物名・キーワード・状態効果・パッシブの名前を用語集として、翻訳文で用語が正しく訳されているかを確認するツールです。
+原文（KR / EN）に用語があるのに、翻訳文（JP）に用語集の表記がないキーをレポートに書き出します。
+
+【用語集】
+- GLOSSARY_SOURCES のファイルの名前のキー（KR・EN の原文と JP の翻訳文）から作成
+- 同じ用語（KR と EN の組）に複数の表記がある場合は、最も多い表記を正しい表記とし、それ以外を別表記とする
+- 用語は KR / EN / JP の表記をすべて1つの Aho-Corasick オートマトンにまとめ、各テキストを1回の走査で検索する
+
+【判定】
+- 用語が原文にある : KR の原文に KR の用語があり、かつ EN の原文に EN の用語がある（原文がない言語は確認しない）
+                     EN は大文字・小文字を区別せず、単語の途中での一致は除外。長い用語に含まれる短い用語は除外
+- 「누락」（訳がない）        : 翻訳文に用語集の表記がない
+- 「표기 다름」（別の表記）   : 翻訳文に正しい表記がなく、用語集の別表記がある
+
+【使い方】
+python JP_GlossaryCheck.py --jobs 4（Localize・Localize_Fixed フォルダがあるディレクトリで実行）
+  * --target fixed     : Localize_Fixed/jp_fixed を Localize の KR / EN と比較（既定）
+  * --target paratranz : ParaTranz のエクスポート（--paratranz で指定、フォルダまたは zip）の翻訳文を確認
+  * --output FILE      : レポートの出力先（既定は glossary_report.tsv）
+"""
+
+
+def is_glossary_entry(base_name, key):
+    """用語集として使うキーか"""
+    return any(fnmatch.fnmatch(base_name, pattern) and key.endswith(suffixes)
+               for pattern, suffixes in GLOSSARY_SOURCES)
+
+
+def collect_tasks(target, paratranz_source):
+    """ファイルごとの確認処理の引数 (種類, 相対パス, 読み込み元) をパスの順に返す"""
+    if target == "paratranz":
+        with open_paratranz_files(paratranz_source) as paratranz_files:
+            return [("paratranz", base_name, paratranz_files[base_name]()) for base_name in sorted(paratranz_files)]
+    return [("fixed", base_name, paths) for base_name, paths in sorted(find_source_files(FIXED_DIR).items())]
+
+
+def iter_records(task):
+    """1ファイル分の (キー, KRの原文, ENの原文, 翻訳文) を返す（翻訳文が空のキーは除く）"""
+    kind, _, source = task
+    if kind == "paratranz":
+        for item in json_codec.loads(source):
+            translation = strip_comments(item.get("translation", ""))
+            if translation.strip():
+                source_kr, source_en = split_context(item.get("context") or "")
+                yield item["key"], source_kr, source_en, translation
+        return
+
+    jp_values, kr_values, en_values = (load_json_values(path) for path in source)
+    for key, translation in jp_values.items():
+        if translation.strip():
+            yield key, kr_values.get(key, ""), en_values.get(key, ""), translation
+
+
+def build_glossary(tasks):
+    """
+    用語集ファイルから用語を集め、オートマトンを作成する
+
+    Returns:
+        tuple: (オートマトン, 用語のリスト [(KR, EN, (正しい表記, 別表記, ...))])
+    """
+    renderings = defaultdict(Counter)
+    for task in tasks:
+        if not any(fnmatch.fnmatch(task[1], pattern) for pattern, _ in GLOSSARY_SOURCES):
+            continue
+        for key, source_kr, source_en, translation in iter_records(task):
+            if not is_glossary_entry(task[1], key):
+                continue
+            term_kr, term_en, rendering = source_kr.strip(), source_en.strip(), translation.strip()
+            if len(term_kr) < MIN_KR_TERM_LENGTH:
+                term_kr = ""
+            if len(term_en) < MIN_EN_TERM_LENGTH:
+                term_en = ""
+            # 原文がない用語、未翻訳（原文のまま）の用語は除く
+            if (term_kr or term_en) and rendering not in (term_kr, term_en):
+                renderings[(term_kr, term_en)][rendering] += 1
+
+    terms = []
+    automaton = AhoCorasick()
+    for (term_kr, term_en), counter in sorted(renderings.items()):
+        term_index = len(terms)
+        ordered = tuple(rendering for rendering, _ in counter.most_common())
+        terms.append((term_kr, term_en, ordered))
+        if term_kr:
+            automaton.add(term_kr, (term_index, ROLE_KR, 0))
+        if term_en:
+            automaton.add(term_en.casefold(), (term_index, ROLE_EN, 0))
+        for rendering_index, rendering in enumerate(ordered):
+            automaton.add(rendering, (term_index, ROLE_JP, rendering_index))
+    return automaton.build(), terms
+
+
+def is_word_boundary(text, start, end):
+    """text[start:end] の前後が英数字でないか（EN の用語が単語の途中で一致していないか）"""
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+def find_source_terms(automaton, text, role):
+    """
+    原文に含まれる用語の番号の集合
+
+    同じ位置で一致したより長い用語に含まれる用語は除く（「出血」と「出血威力」など）
+    """
+    matches = []
+    for start, end, (term_index, match_role, _) in automaton.iter_matches(text):
+        if match_role == role and (role != ROLE_EN or is_word_boundary(text, start, end)):
+            matches.append((start, end, term_index))
+    if len(matches) > 1:
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        kept = []
+        covered_start, covered_end = -1, -1
+        for start, end, term_index in matches:
+            if end <= covered_end and (start, end) != (covered_start, covered_end):
+                continue
+            if end > covered_end:
+                covered_start, covered_end = start, end
+            kept.append((start, end, term_index))
+        matches = kept
+    return {term_index for _, _, term_index in matches}
+
+
+def check_texts(automaton, terms, source_kr, source_en, translation):
+    """
+    1つのキーの用語の訳を確認する
+
+    Returns:
+        list: [(用語の番号, 種別, 使われた別表記)]
+    """
+    kr_terms = find_source_terms(automaton, source_kr, ROLE_KR) if source_kr else set()
+    source_en = source_en.casefold()
+    en_terms = find_source_terms(automaton, source_en, ROLE_EN) if source_en else set()
+    if not kr_terms and not en_terms:
+        return []
+
+    findings = []
+    found_renderings = None
+    for term_index in sorted(kr_terms | en_terms):
+        term_kr, term_en, renderings = terms[term_index]
+        # 原文がある言語で、用語集の用語がすべて一致している場合のみ確認する
+        if (term_kr and source_kr and term_index not in kr_terms) or \
+           (term_en and source_en and term_index not in en_terms):
+            continue
+        if found_renderings is None:
+            found_renderings = defaultdict(set)
+            for _, _, (found_index, role, rendering_index) in automaton.iter_matches(translation):
+                if role == ROLE_JP:
+                    found_renderings[found_index].add(rendering_index)
+        found = found_renderings.get(term_index, set())
+        if 0 in found:
+            continue
+        if found:
+            findings.append((term_index, KIND_VARIANT, renderings[min(found)]))
+        else:
+            findings.append((term_index, KIND_MISSING, ""))
+    return findings
+
+
+# ワーカープロセスで使う用語集（init_worker で設定）
+worker_glossary = None
+
+def init_worker(glossary):
+    global worker_glossary
+    worker_glossary = glossary
+
+
+def check_file_task(task):
+    """
+    1ファイル分の用語の訳を確認する
+
+    Returns:
+        tuple: (確認したキーの数, レポートの行のリスト, 用語ごとの件数)
+    """
+    automaton, terms = worker_glossary
+    rows = []
+    term_counts = Counter()
+    checked = 0
+    for key, source_kr, source_en, translation in iter_records(task):
+        checked += 1
+        for term_index, kind, used in check_texts(automaton, terms, source_kr, source_en, translation):
+            term_kr, term_en, renderings = terms[term_index]
+            rows.append([
+                task[1], key, kind, term_kr, term_en, renderings[0], used,
+                (source_kr or source_en).replace('\n', '\\n'), translation.replace('\n', '\\n')
+            ])
+            term_counts[term_index] += 1
+    return checked, rows, term_counts
+
+
+def check_glossary(target, paratranz_source, output_path, jobs=1):
+    """用語集を作成し、すべてのファイルを確認してレポートを書き出す（jobs > 1 の場合はプロセスプールで並列処理）"""
+    start = time.perf_counter()
+    tasks = collect_tasks(target, paratranz_source)
+    glossary = build_glossary(tasks)
+    terms = glossary[1]
+    print(f"{len(tasks)} ファイル, 用語 {len(terms)} 件 ({time.perf_counter() - start:.1f}s)")
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(glossary,)) as executor:
+            results = list(executor.map(check_file_task, tasks, chunksize=16))
+    else:
+        init_worker(glossary)
+        results = [check_file_task(task) for task in tasks]
+
+    checked = 0
+    term_counts = Counter()
+    with open(output_path, 'w', encoding='utf-8-sig', newline='\r\n') as txtfile:
+        txtfile.write('\t'.join(REPORT_HEADER) + '\n')
+        for file_checked, rows, file_term_counts in results:
+            checked += file_checked
+            term_counts.update(file_term_counts)
+            for row in rows:
+                txtfile.write('\t'.join(row) + '\n')
+
+    kind_counts = Counter(row[2] for _, rows, _ in results for row in rows)
+    print(f"{checked} キーを確認: {KIND_MISSING} {kind_counts[KIND_MISSING]} 件, "
+          f"{KIND_VARIANT} {kind_counts[KIND_VARIANT]} 件 ({time.perf_counter() - start:.1f}s)")
+    for term_index, count in term_counts.most_common(SUMMARY_TERMS_SHOWN):
+        term_kr, term_en, renderings = terms[term_index]
+        print(f"  {count:>5} 件: {' / '.join(filter(None, [term_kr, term_en]))} → {renderings[0]}")
+    print(f"レポートを書き出しました: {output_path}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="JP Glossary Check")
+    parser.add_argument('--target', choices=["fixed", "paratranz"], default="fixed",
+                        help="確認する翻訳（fixed: Localize_Fixed/jp_fixed, paratranz: ParaTranz のエクスポート）")
+    parser.add_argument('--paratranz', default=PARATRANZ_DIR,
+                        help="ParaTranz のエクスポート（展開済みのフォルダ、または zip ファイル）")
+    parser.add_argument('--output', default=OUTPUT_FILE,
+                        help="レポートの出力先")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="ファイル処理の並列数（1の場合は逐次処理）")
+    args = parser.parse_args()
+
+    check_glossary(args.target, args.paratranz, args.output, jobs=args.jobs)
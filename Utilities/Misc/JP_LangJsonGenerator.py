@@ -2,8 +2,16 @@ import os
 import shutil
 import json
 import re
-from collections import OrderedDict
+import sys
+import hashlib
 import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from text_extraction import DupSuffixKeyPolicy, extract_target_values as engine_extract_target_values
+from json_cache import load_cached, hash_files, prune_cache
+import json_codec
 
 # 設定
 OUTPUT_UPDATED = False  # True: 変更があったファイルのみ出力, False: すべてのファイルを出力
@@ -20,6 +28,27 @@ EN_DIR_OLD = ("Localize_old\\en", "EN_")
 
 OUTPUT_DIR = "json_output"
 
+# 差分更新（--incremental）用のマニフェスト（入力ファイルのハッシュと出力の有無を記録）
+MANIFEST_FILE = "json_output_manifest.json"
+# マニフェストに記録するツールのファイル（変更された場合はすべて再生成する）
+TOOL_FILES = (
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common', 'text_extraction.py'),
+)
+# 抽出結果のキャッシュの識別子（ツールが変更された場合は別のキャッシュになる）
+CACHE_NAMESPACE = f"generator-{hash_files(*TOOL_FILES)}"
+LOG_FILE = 'translation_processing.log'
+
+# キー単位のスナップショット（キーごとの各言語テキストのハッシュ）
+# SNAPSHOT_FILE は ParaTranz への反映を確認済みの状態で、差分モードの比較の基準（--confirm-snapshot でのみ更新）
+# 実行のたびに今回の状態を SNAPSHOT_PENDING_FILE に書き出し、アップロードの成功後に --confirm-snapshot で確定する
+SNAPSHOT_FILE = "json_output_snapshot.json"
+SNAPSHOT_PENDING_FILE = "json_output_snapshot_pending.json"
+KEY_HASH_SIZE = 8  # キーごとのハッシュのバイト数
+# 差分モード（--delta）の出力先（追加・変更されたキーのみ）と削除されたキーの一覧
+DELTA_OUTPUT_DIR = "json_output_delta"
+DELTA_REMOVED_FILE = "json_output_delta_removed.json"
+
 TARGET_KEYS = {'abName', 'abnormalityName', 'add', 'area', 'askLevelUp', 
 'behaveDesc', 'chapter', 'chapterNumber', 'chaptertitle', 'clue', 'codeName', 
 'company', 'content', 'desc', 'description', 'dialog', 'dlg', 'eventDesc', 'failureDesc', 
@@ -28,101 +57,23 @@ TARGET_KEYS = {'abName', 'abnormalityName', 'add', 'area', 'askLevelUp',
 'place', 'prevDesc', 'rawDesc', 'shortName', 'simpleDesc', 'story', 'subDesc', 'successDesc', 
 'summary', 'teller', 'title', 'variation', 'variation2', 'text'}
 
-# ロギングの設定
-logging.basicConfig(
-    filename='translation_processing.log',
-    filemode='w',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+def setup_logging(filemode='w'):
+    """
+    ロギングの設定
+    並列処理のワーカープロセスでは filemode='a' で呼び出し、親プロセスのログを上書きしない
+    """
+    logging.basicConfig(
+        filename=LOG_FILE,
+        filemode=filemode,
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
 
 def extract_target_values(data, root_id=None, path="", skip_top_dataList=True, in_dataList=False):
-    values = OrderedDict()
-    key_counts = {}  # キーの出現回数を追跡するための辞書
-
-    if isinstance(data, dict):
-        current_root_id = root_id
-        if current_root_id is None and "id" in data:
-            current_root_id = str(data["id"])
-
-        # root_id が "-1" の場合はこのエントリをスキップ
-        if current_root_id == "-1":
-            return values
-
-        for key, val in data.items():
-            if key == "id" and path != "":
-                continue  # ネストされた "id" は無視
-            # "dataList" のキーは最上位でのみスキップ対象
-            if skip_top_dataList and path == "" and key == "dataList":
-                values.update(extract_target_values(val, current_root_id, path="", skip_top_dataList=False, in_dataList=True))
-                continue
-            new_path = f"{path}.{key}" if path else key
-            if isinstance(val, str) and key in TARGET_KEYS:
-                final_key = f"{current_root_id}-{new_path}" if current_root_id else new_path
-
-                # キーの重複を確認し、必要に応じて接尾辞を追加
-                if final_key in values:
-                    if final_key not in key_counts:
-                        key_counts[final_key] = 1
-                    else:
-                        key_counts[final_key] += 1
-
-                    # 値が同じであれば上書き、異なる場合は接尾辞を付加
-                    if values[final_key] != val:
-                        dup_key = f"{final_key}-dup{key_counts[final_key]}"
-                        values[dup_key] = val
-                    # 値が同じ場合は何もしない（上書きせず既存のエントリを保持）
-                else:
-                    values[final_key] = val
-            else:
-                extracted_values = extract_target_values(val, current_root_id, new_path, skip_top_dataList=False, in_dataList=False)
-
-                # 抽出された値の各キー重複をチェック
-                for extracted_key, extracted_val in extracted_values.items():
-                    if extracted_key in values:
-                        if extracted_key not in key_counts:
-                            key_counts[extracted_key] = 1
-                        else:
-                            key_counts[extracted_key] += 1
-
-                        # 値が異なる場合のみ接尾辞を付加
-                        if values[extracted_key] != extracted_val:
-                            dup_key = f"{extracted_key}-dup{key_counts[extracted_key]}"
-                            values[dup_key] = extracted_val
-                    else:
-                        values[extracted_key] = extracted_val
-
-    elif isinstance(data, list):
-        for index, item in enumerate(data):
-            if isinstance(item, str):  # 文字列が直接リスト内にある場合の処理
-                if path:  # パスが存在する場合のみ処理
-                    final_key = f"{root_id}-{path}[{index}]" if root_id else f"{path}[{index}]"
-                    values[final_key] = item
-            else:
-                # dataList直下の項目ではインデックスを含めない
-                if in_dataList:
-                    extracted_values = extract_target_values(item, root_id, path, skip_top_dataList=False, in_dataList=False)
-                else:
-                    new_path = f"{path}[{index}]" if path else f"[{index}]"
-                    extracted_values = extract_target_values(item, root_id, new_path, skip_top_dataList=False, in_dataList=False)
-
-                # 抽出された値の各キー重複をチェック
-                for extracted_key, extracted_val in extracted_values.items():
-                    if extracted_key in values:
-                        if extracted_key not in key_counts:
-                            key_counts[extracted_key] = 1
-                        else:
-                            key_counts[extracted_key] += 1
-
-                        # 値が異なる場合のみ接尾辞を付加
-                        if values[extracted_key] != extracted_val:
-                            dup_key = f"{extracted_key}-dup{key_counts[extracted_key]}"
-                            values[dup_key] = extracted_val
-                    else:
-                        values[extracted_key] = extracted_val
-
-    return values
+    """対象キーの値を抽出する（重複キーには -dupN を付加、共通抽出エンジンを使用）"""
+    policy = DupSuffixKeyPolicy(TARGET_KEYS)
+    return engine_extract_target_values(data, policy, root_id, path, skip_top_dataList, in_dataList)
 
 def find_matching_files(is_old_version=False):
     """
@@ -151,21 +102,83 @@ def find_matching_files(is_old_version=False):
 
     return results["JP_"], results["KR_"], results["EN_"]
 
+def read_json_values(file_path):
+    """JSONファイルを読み込み、値を抽出する（キャッシュに格納できるよう dict で返す）"""
+    return dict(extract_target_values(json_codec.load_file(file_path)))
+
 def load_json_values(file_path):
     """
-    JSONファイルを読み込み、値を抽出する
+    JSONファイルを読み込み、値を抽出する（前回の抽出結果がキャッシュにあればそれを使用）
     """
     if file_path and os.path.exists(file_path):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return extract_target_values(json.load(f))
+            return load_cached(file_path, CACHE_NAMESPACE, read_json_values)
         except Exception as e:
             logging.error(f"エラー: {file_path} の読み込みに失敗 - {e}")
     return {}
 
-def process_translation_files(base_name, jp_file, kr_file, en_file):
+def get_output_path(base_name, output_dir=OUTPUT_DIR):
+    """base_name に対応する出力ファイルのパスを返す"""
+    # base_nameにはパス区切り文字が含まれる可能性がある
+    # ディレクトリ部分とファイル名部分を分離
+    dir_part, file_part = os.path.split(base_name)
+    file_part = os.path.splitext(file_part)[0]  # 拡張子を削除
+    
+    # ファイル名からJP_接頭辞を削除
+    if file_part.startswith(JP_DIR[1]):
+        file_part = file_part[len(JP_DIR[1]):]
+    
+    # ディレクトリ部分とファイル名部分を再結合
+    output_filename = os.path.join(dir_part, file_part)
+        
+    return os.path.join(output_dir, output_filename + ".json")
+
+def compute_text_hash(text):
+    """スナップショット用のテキストの短いハッシュ（空文字列の場合は空文字列）"""
+    if not text:
+        return ""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_HASH_SIZE).hexdigest()
+
+def build_output_entries(jp_values, kr_values, en_values):
+    """
+    出力データ（ParaTranz形式のエントリ）と、キーごとの各言語のハッシュ {キー: [JP, KR, EN]} を作成する
+    """
+    output_data = []
+    key_hashes = {}
+    for key in jp_values.keys():  # `jp_values` の順番通りに処理
+        jp_text = jp_values.get(key, "").strip()
+        kr_text = kr_values.get(key, "").strip()
+        en_text = en_values.get(key, "").strip()
+
+        # すべての値が空ならスキップ
+        if not jp_text and not kr_text and not en_text:
+            continue
+
+        original = f"{jp_text}\n<CMT_KR>\n<CMT_JP>"
+        translation = f"{jp_text}\n<CMT_KR>\n<CMT_JP>"
+        stage = 1
+        context = "\n".join(filter(None, [
+            f"KR:\n{kr_text}" if kr_text else "",
+            f"EN:\n{en_text}" if en_text else ""
+        ]))
+        output_data.append({
+            "key": key,
+            "original": original,
+            "translation": translation,
+            "stage": stage,
+            "context": context
+        })
+        key_hashes[key] = [compute_text_hash(jp_text), compute_text_hash(kr_text), compute_text_hash(en_text)]
+    return output_data, key_hashes
+
+def process_translation_files(base_name, jp_file, kr_file, en_file, old_key_hashes=None):
     """
     翻訳ファイルを処理し、必要に応じて出力する
+    old_key_hashes（前回のスナップショット）を指定した場合は差分モードとし、
+    追加・変更されたキーのみを DELTA_OUTPUT_DIR に出力する
+
+    Returns:
+        tuple: (出力したかどうか, キーごとのハッシュ, 削除されたキーのリスト)
     """
     jp_path = os.path.join(JP_DIR[0], jp_file)
     kr_path = os.path.join(KR_DIR[0], kr_file) if kr_file else None
@@ -176,12 +189,25 @@ def process_translation_files(base_name, jp_file, kr_file, en_file):
     kr_values = load_json_values(kr_path)
     en_values = load_json_values(en_path)
 
+    # 出力データを作成
+    output_data, key_hashes = build_output_entries(jp_values, kr_values, en_values)
+    output_dir = OUTPUT_DIR
+    removed_keys = []
+
+    if old_key_hashes is not None:
+        # 差分モード：スナップショットと比較し、追加・変更されたキーのみ出力
+        output_data = [entry for entry in output_data if old_key_hashes.get(entry["key"]) != key_hashes[entry["key"]]]
+        removed_keys = [key for key in old_key_hashes if key not in key_hashes]
+        output_dir = DELTA_OUTPUT_DIR
+        if removed_keys:
+            logging.info(f"キーを削除: {base_name} - {', '.join(removed_keys)}")
+
     # すべてのJSONファイルが空（有効なデータがない）場合は処理をスキップ
-    if not jp_values and not kr_values and not en_values:
-        return
+    elif not jp_values and not kr_values and not en_values:
+        return False, key_hashes, removed_keys
     
     # OUTPUT_UPDATEDがTrue（更新されたファイルのみ出力）かつ過去のバージョンのディレクトリが存在する場合
-    if OUTPUT_UPDATED:
+    elif OUTPUT_UPDATED:
         # 過去のバージョンのJSONファイルを読み込み
         old_jp_path = os.path.join(JP_DIR_OLD[0], jp_file) if os.path.exists(JP_DIR_OLD[0]) else None
         old_kr_path = os.path.join(KR_DIR_OLD[0], kr_file) if kr_file and os.path.exists(KR_DIR_OLD[0]) else None
@@ -220,57 +246,93 @@ def process_translation_files(base_name, jp_file, kr_file, en_file):
         
         # 変更がなければ出力をスキップ
         if not has_changes:
-            return
-    
-    # 出力データを作成
-    output_data = []
-    for key in jp_values.keys():  # `jp_values` の順番通りに処理
-        jp_text = jp_values.get(key, "").strip()
-        kr_text = kr_values.get(key, "").strip()
-        en_text = en_values.get(key, "").strip()
-
-        # すべての値が空ならスキップ
-        if not jp_text and not kr_text and not en_text:
-            continue
-
-        original = f"{jp_text}\n<CMT_KR>\n<CMT_JP>"
-        translation = f"{jp_text}\n<CMT_KR>\n<CMT_JP>"
-        stage = 1
-        context = "\n".join(filter(None, [
-            f"KR:\n{kr_text}" if kr_text else "",
-            f"EN:\n{en_text}" if en_text else ""
-        ]))
-        output_data.append({
-            "key": key,
-            "original": original,
-            "translation": translation,
-            "stage": stage,
-            "context": context
-        })
+            return False, key_hashes, removed_keys
     
     # 出力データが存在する場合のみファイルを作成
     if output_data:
-        # base_nameにはパス区切り文字が含まれる可能性がある
-        # ディレクトリ部分とファイル名部分を分離
-        dir_part, file_part = os.path.split(base_name)
-        file_part = os.path.splitext(file_part)[0]  # 拡張子を削除
-        
-        # ファイル名からJP_接頭辞を削除
-        if file_part.startswith(JP_DIR[1]):
-            file_part = file_part[len(JP_DIR[1]):]
-        
-        # ディレクトリ部分とファイル名部分を再結合
-        output_filename = os.path.join(dir_part, file_part)
-            
-        output_path = os.path.join(OUTPUT_DIR, output_filename + ".json")
+        output_path = get_output_path(base_name, output_dir)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
-
-def process_directories():
+            f.write(json_codec.dumps(output_data))
+        return True, key_hashes, removed_keys
+    return False, key_hashes, removed_keys
+
+def process_translation_task(task):
+    """1ファイル分の翻訳ファイルを処理する（ワーカープロセス用）"""
+    base_name, jp_file, kr_file, en_file, old_key_hashes = task
+    return process_translation_files(base_name, jp_file, kr_file, en_file, old_key_hashes)
+
+def compute_file_hash(file_path):
+    """ファイル内容のSHA-256ハッシュを返す（ファイルが存在しない場合は None）"""
+    if not file_path or not os.path.exists(file_path):
+        return None
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def compute_tool_hash():
+    """このツールと共通抽出エンジンのハッシュを返す"""
+    sha = hashlib.sha256()
+    for file_path in TOOL_FILES:
+        with open(file_path, 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+def collect_source_hashes(jp_file, kr_file, en_file):
+    """
+    出力に影響する入力ファイルのハッシュを返す
+    OUTPUT_UPDATEDがTrueの場合は過去のバージョンのファイルも含める
+    """
+    hashes = {
+        "jp": compute_file_hash(os.path.join(JP_DIR[0], jp_file)),
+        "kr": compute_file_hash(os.path.join(KR_DIR[0], kr_file) if kr_file else None),
+        "en": compute_file_hash(os.path.join(EN_DIR[0], en_file) if en_file else None),
+    }
+    if OUTPUT_UPDATED:
+        hashes["old_jp"] = compute_file_hash(os.path.join(JP_DIR_OLD[0], jp_file))
+        hashes["old_kr"] = compute_file_hash(os.path.join(KR_DIR_OLD[0], kr_file) if kr_file else None)
+        hashes["old_en"] = compute_file_hash(os.path.join(EN_DIR_OLD[0], en_file) if en_file else None)
+    return hashes
+
+def load_manifest(manifest_path):
+    """前回実行時のマニフェストを読み込む（存在しない・壊れている場合は None）"""
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.error(f"マニフェストの読み込みに失敗: {manifest_path} - {e}")
+        return None
+
+def save_manifest(manifest_path, manifest, indent=1):
+    """マニフェスト（スナップショット）を書き出す"""
+    with open(manifest_path, 'w', encoding='utf-8', newline='\n') as f:
+        if indent is None:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        else:
+            json.dump(manifest, f, ensure_ascii=False, indent=indent, sort_keys=True)
+        f.write('\n')
+
+def get_snapshot_sources(hashes):
+    """スナップショットに記録する現在のバージョンの入力ハッシュ（JP/KR/EN）"""
+    return {lang: hashes[lang] for lang in ("jp", "kr", "en")}
+
+def confirm_snapshot():
+    """前回の実行で書き出したスナップショットを、差分モードの比較の基準として確定する"""
+    if not os.path.exists(SNAPSHOT_PENDING_FILE):
+        print(f"{SNAPSHOT_PENDING_FILE} がありません。先に生成を実行してください。")
+        return False
+    os.replace(SNAPSHOT_PENDING_FILE, SNAPSHOT_FILE)
+    print(f"スナップショットを確定しました: {SNAPSHOT_FILE}")
+    return True
+
+def process_directories(jobs=1, incremental=False, delta=False):
     """
     ディレクトリ処理のメイン関数
+    jobs > 1 の場合はプロセスプールで並列処理、incremental の場合は入力が変化したファイルのみ再生成する
+    delta の場合は確定済みのスナップショットと比較し、追加・変更されたキーと削除されたキーのみを出力する
+    （確定するまでは何度実行しても同じ基準と比較するため、前回の差分出力の内容も含まれる）
     """
     # ログファイルの初期化
     logging.info(f"=== 処理開始 ===")
@@ -288,9 +350,6 @@ def process_directories():
         logging.error(f"{EN_DIR[0]} directory not found!")
         print(f"{EN_DIR[0]} directory not found!")
         return
-    
-    # 出力ディレクトリをクリア
-    shutil.rmtree(OUTPUT_DIR, ignore_errors=True)
 
     # 現在のバージョンのファイルを取得
     jp_files, kr_files, en_files = find_matching_files(is_old_version=False)
@@ -298,8 +357,8 @@ def process_directories():
 
 #    print(jp_files)
 
-    # OUTPUT_UPDATEDがTrueの場合、過去のバージョンのファイルも取得
-    if OUTPUT_UPDATED:
+    # OUTPUT_UPDATEDがTrueの場合、過去のバージョンのファイルも取得（差分モードでは不要）
+    if OUTPUT_UPDATED and not delta:
         old_jp_files, old_kr_files, old_en_files = find_matching_files(is_old_version=True)
         
         # 削除されたファイルを検出してログに記録
@@ -307,15 +366,160 @@ def process_directories():
             for base_name in old_jp_files:
                 if base_name not in jp_files:
                     logging.info(f"!!! ファイルを削除 !!!: {base_name}")
-    
-    # 各ファイルを処理
+
+    # 各ファイルの入力ハッシュを収集
+    tool_hash = compute_tool_hash()
+    tasks = {}
+    source_hashes = {}
     for base_name, jp_file in jp_files.items():
         kr_file = kr_files.get(base_name)
         en_file = en_files.get(base_name)
-        process_translation_files(base_name, jp_file, kr_file, en_file)
+        tasks[base_name] = (base_name, jp_file, kr_file, en_file)
+        source_hashes[base_name] = collect_source_hashes(jp_file, kr_file, en_file)
+
+    # 差分モードは確定済みのスナップショット、それ以外は直近の実行のスナップショットを引き継ぐ
+    # （ツールが変更された場合、入力ハッシュによる判定には使わない）
+    snapshot = load_manifest(SNAPSHOT_FILE) or {}
+    if not delta:
+        snapshot = load_manifest(SNAPSHOT_PENDING_FILE) or snapshot
+    snapshot_files = snapshot.get("files", {})
+    snapshot_valid = snapshot.get("tool") == tool_hash
+
+    removed_keys_by_file = {}
+    old_outputs = {}
+    if delta:
+        # 差分モード：スナップショットから入力が変化したファイルのみ対象にする
+        shutil.rmtree(DELTA_OUTPUT_DIR, ignore_errors=True)
+        if not snapshot_files:
+            print("スナップショットがないため、すべてのキーを追加として出力します。")
+
+        # 削除されたファイルは全キーを削除として記録
+        for base_name, entry in snapshot_files.items():
+            if base_name not in source_hashes:
+                removed_keys_by_file[base_name] = list(entry.get("keys", {}))
+                logging.info(f"!!! ファイルを削除 !!!: {base_name}")
+
+        target_names = [
+            base_name for base_name, hashes in source_hashes.items()
+            if not snapshot_valid
+            or snapshot_files.get(base_name, {}).get("sources") != get_snapshot_sources(hashes)
+        ]
+        print(f"差分モード: {len(target_names)} / {len(source_hashes)} ファイルの入力が変更されています。")
+    else:
+        if incremental:
+            manifest = load_manifest(MANIFEST_FILE)
+            if manifest is None:
+                print("マニフェストがないため、すべてのファイルを処理します。")
+                incremental = False
+            elif manifest.get("tool") != tool_hash or manifest.get("output_updated") != OUTPUT_UPDATED:
+                print("前回の実行からツールまたは設定が変更されたため、すべてのファイルを処理します。")
+                incremental = False
+
+        if incremental:
+            old_files = manifest.get("files", {})
+            old_outputs = manifest.get("outputs", {})
+
+            # 元ファイルが削除された出力のみを削除
+            for base_name in old_files:
+                if base_name not in source_hashes:
+                    output_path = get_output_path(base_name)
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+                    logging.info(f"出力を削除: {base_name}")
+
+            # 入力ファイル・出力のいずれかが変化したファイル（スナップショットにないファイルを含む）を対象にする
+            target_names = []
+            for base_name, hashes in source_hashes.items():
+                output_path = get_output_path(base_name)
+                if (old_files.get(base_name) != hashes
+                        or old_outputs.get(base_name, False) != os.path.exists(output_path)
+                        or not snapshot_valid or base_name not in snapshot_files):
+                    target_names.append(base_name)
+                    # 今回出力されない場合に古い出力が残らないよう削除しておく
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+            print(f"差分更新: {len(target_names)} / {len(source_hashes)} ファイルが変更されています。")
+        else:
+            # 出力ディレクトリをクリア
+            shutil.rmtree(OUTPUT_DIR, ignore_errors=True)
+            target_names = list(source_hashes)
+    
+    # 各ファイルを処理（map は投入順に結果を返す）
+    # 差分モードではスナップショットのキーごとのハッシュを渡す
+    target_tasks = [
+        tasks[base_name] + (snapshot_files.get(base_name, {}).get("keys", {}) if delta else None,)
+        for base_name in target_names
+    ]
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=setup_logging, initargs=('a',)) as executor:
+            results = list(executor.map(process_translation_task, target_tasks, chunksize=16))
+    else:
+        results = [process_translation_task(task) for task in target_tasks]
+
+    # 対象外のファイルはスナップショットを引き継ぐ
+    new_snapshot_files = {
+        base_name: snapshot_files[base_name]
+        for base_name in source_hashes
+        if base_name in snapshot_files
+    }
+    outputs = {base_name: has_output for base_name, has_output in old_outputs.items() if base_name in source_hashes}
+    delta_file_count = 0
+    for base_name, (has_output, key_hashes, removed_keys) in zip(target_names, results):
+        new_snapshot_files[base_name] = {
+            "sources": get_snapshot_sources(source_hashes[base_name]),
+            "keys": key_hashes
+        }
+        outputs[base_name] = has_output
+        if removed_keys:
+            removed_keys_by_file[base_name] = removed_keys
+        if delta:
+            delta_file_count += int(has_output)
+        elif incremental:
+            logging.info(f"再生成: {base_name}")
+
+    if delta:
+        # 削除されたキーの一覧を出力
+        save_manifest(DELTA_REMOVED_FILE, removed_keys_by_file, indent=2)
+        removed_count = sum(len(keys) for keys in removed_keys_by_file.values())
+        print(f"差分出力: {delta_file_count} ファイル（{DELTA_OUTPUT_DIR}）、削除されたキー: {removed_count} 件（{DELTA_REMOVED_FILE}）")
+    else:
+        save_manifest(MANIFEST_FILE, {
+            "tool": tool_hash,
+            "output_updated": OUTPUT_UPDATED,
+            "files": source_hashes,
+            "outputs": outputs
+        })
+
+    # スナップショットはサイズを抑えるため改行・インデントなしで書き出す（確定は --confirm-snapshot）
+    save_manifest(SNAPSHOT_PENDING_FILE, {
+        "tool": tool_hash,
+        "files": new_snapshot_files
+    }, indent=None)
+    print("ParaTranz へのアップロードが完了したら --confirm-snapshot を実行し、今回の状態を差分の基準として確定してください。")
 
+    prune_cache()
     logging.info(f"=== 処理終了　===")
 
 if __name__ == "__main__":
-    process_directories()
-    print("処理が完了しました。ログファイルを確認してください。")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="JP - ParaTranz JSON Generator")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="ファイル処理の並列数（1の場合は逐次処理）")
+    parser.add_argument('--incremental', action='store_true',
+                        help="前回実行時から入力が変更されたファイルのみ再生成")
+    parser.add_argument('--delta', action='store_true',
+                        help=f"確定済みのスナップショットから追加・変更されたキーのみを {DELTA_OUTPUT_DIR} に出力")
+    parser.add_argument('--confirm-snapshot', action='store_true',
+                        help=f"前回の実行の状態（{SNAPSHOT_PENDING_FILE}）を差分の基準として確定する（アップロードの成功後に実行）")
+    parser.add_argument('--json-backend', choices=json_codec.BACKENDS,
+                        help="JSONの読み書きに使うバックエンド（既定は orjson があれば orjson）")
+    parser.add_argument('--verify-codec', action='store_true',
+                        help="orjson の結果を標準ライブラリと比較する（不一致の場合は標準ライブラリの結果を出力）")
+    args = parser.parse_args()
+    json_codec.configure(backend=args.json_backend, verify=args.verify_codec or None)
+
+    if args.confirm_snapshot:
+        raise SystemExit(0 if confirm_snapshot() else 1)
+
+    setup_logging()
+    process_directories(jobs=args.jobs, incremental=args.incremental, delta=args.delta)
+    print("処理が完了しました。ログファイルを確認してください。")
@@ -0,0 +1,407 @@
+import os
+import sys
+import json
+import time
+import array
+import sqlite3
+import hashlib
+import argparse
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from json_cache import hash_files
+from paratranz_entry import load_entries
+from paratranz_source import open_paratranz_files
+import json_codec
+from JP_LangJsonGenerator import TOOL_FILES as GENERATOR_TOOL_FILES, load_json_values
+
+
+# ---------------------------------------------------
+
+# Directory paths and prefixes
+JP_DIR = ("Localize/jp", "JP_")
+KR_DIR = ("Localize/kr", "KR_")
+EN_DIR = ("Localize/en", "EN_")
+
+INDEX_FILE = 'text_search_index.sqlite3'
+INDEX_FORMAT_VERSION = 1
+NGRAM_SIZE = 2  # 日本語・韓国語の単語は2文字のものが多いため bi-gram で索引化
+FETCH_BATCH_SIZE = 500
+FULL_REBUILD_RATIO = 0.5  # 変更・削除されたファイルがこの割合を超える場合は、索引全体を作り直す
+UPDATE_CACHE_KIB = 256 * 1024  # 索引の更新時の SQLite のページキャッシュ（転置索引への挿入は順不同のため大きめに取る）
+DEFAULT_LIMIT = 20
+
+# 検索対象の言語（列名, 表示名）。pt は ParaTranz の翻訳文（--paratranz を指定した場合のみ）
+LANGUAGES = (("jp", "JP"), ("kr", "KR"), ("en", "EN"), ("pt", "PT"))
+
+# 索引の作成方法（このツール・キーの抽出処理・ParaTranz のファイルの読み込み）が変わった場合は索引を作り直す
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common')
+TOOL_HASH = hash_files(
+    os.path.abspath(__file__),
+    *GENERATOR_TOOL_FILES,
+    os.path.join(COMMON_DIR, 'paratranz_entry.py'),
+    os.path.join(COMMON_DIR, 'paratranz_source.py'),
+)
+
+# ---------------------------------------------------
+
+
+"""
+JP Text Search
+=====================================
+
+【概要】
+Localize の JP / KR / EN のテキストを、ParaTranz のファイル・キー単位でまとめて検索するツールです。
+キーは JP_LangJsonGenerator（ParaTranz にアップロードするファイル）と同じで、
+検索結果は JP / KR / EN（と ParaTranz の翻訳文）を対応させて表示します。
+
+【索引】
+- text_search_index.sqlite3 に、テキストと bi-gram（連続する2文字）の転置索引を保存
+- 検索語の bi-gram をすべて含むテキストに絞り込んでから部分一致を確認（1文字の検索語は全件を確認）
+- 英字は大文字・小文字を区別しない
+- --update を指定すると、前回から内容（ハッシュ）が変わったファイルのみ索引を作り直す
+
+【使い方】
+1. python JP_TextSearch.py --update で索引を作成・更新（Localize フォルダがあるディレクトリで実行）
+   * --paratranz PATH : ParaTranz のエクスポート（フォルダまたは zip）の翻訳文も索引に含める
+                        （指定は索引に記録され、次回以降の --update でも使用。"" を指定すると含めない）
+2. python JP_TextSearch.py 検索語 で検索
+   * --lang jp kr : 指定した言語のみ検索
+   * --limit N    : 表示する件数（0 の場合はすべて）
+   * --tsv        : ファイル・キー・各言語のテキストをタブ区切りで出力
+   * --json       : 検索結果をJSONで出力
+"""
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    base_name TEXT NOT NULL UNIQUE,
+    signature TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    jp TEXT NOT NULL,
+    kr TEXT NOT NULL,
+    en TEXT NOT NULL,
+    pt TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_file ON docs (file_id);
+CREATE TABLE IF NOT EXISTS postings (
+    gram TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    doc_ids BLOB NOT NULL,
+    PRIMARY KEY (gram, file_id)
+) WITHOUT ROWID;
+"""
+
+
+def find_source_files(jp_dir=JP_DIR):
+    """
+    Localize の JP / KR / EN のファイルを、ParaTranz のファイルと同じ相対パス（接頭辞なし）をキーにして返す
+
+    jp_dir に Localize_Fixed/jp_fixed などを指定すると、JP のファイルをそのディレクトリから探す
+
+    Returns:
+        dict: {相対パス: (JPのパス, KRのパス, ENのパス)}（KR / EN がない場合は None）
+    """
+    found = {}
+    for dir_path, prefix in (jp_dir, KR_DIR, EN_DIR):
+        files = {}
+        for root, _, names in os.walk(dir_path):
+            for name in names:
+                if name.startswith(prefix) and name.endswith(".json"):
+                    full_path = os.path.join(root, name)
+                    relative_dir = os.path.relpath(root, dir_path).replace('\\', '/')
+                    base_name = name[len(prefix):] if relative_dir == '.' else f"{relative_dir}/{name[len(prefix):]}"
+                    files[base_name] = full_path
+        found[prefix] = files
+    return {
+        base_name: (jp_path, found[KR_DIR[1]].get(base_name), found[EN_DIR[1]].get(base_name))
+        for base_name, jp_path in found[jp_dir[1]].items()
+    }
+
+
+def read_bytes(file_path):
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def compute_signature(paths, paratranz_content):
+    """索引を作り直すかどうかの判定に使う、入力ファイルの内容のハッシュ"""
+    sha = hashlib.sha256()
+    for path in paths:
+        sha.update(b'\0')
+        if path is not None:
+            sha.update(read_bytes(path))
+    sha.update(b'\0')
+    if paratranz_content is not None:
+        sha.update(paratranz_content)
+    return sha.hexdigest()
+
+
+def build_docs(paths, paratranz_content):
+    """
+    1ファイル分の検索対象を作成する（キーの順序は JP のファイルに従い、JP にないキーは後ろに追加）
+
+    Returns:
+        list: [(キー, JP, KR, EN, ParaTranzの翻訳文)]（すべて空のキーは含めない）
+    """
+    jp_values, kr_values, en_values = (load_json_values(path) for path in paths)
+    pt_values = {}
+    if paratranz_content is not None:
+        pt_values = {key: entry.translation for key, entry in load_entries(json_codec.loads(paratranz_content)).items()}
+
+    keys = dict.fromkeys(jp_values)
+    for values in (kr_values, en_values, pt_values):
+        keys.update(dict.fromkeys(values))
+
+    docs = []
+    for key in keys:
+        texts = tuple(values.get(key, "").strip() for values in (jp_values, kr_values, en_values, pt_values))
+        if any(texts):
+            docs.append((key, *texts))
+    return docs
+
+
+def get_ngrams(texts):
+    """テキストの n-gram の集合（英字は小文字に統一）"""
+    grams = set()
+    for text in texts:
+        text = text.casefold()
+        grams.update({text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)})
+    return grams
+
+
+def build_postings(docs, first_doc_id):
+    """1ファイル分の転置索引 [(n-gram, doc_id の配列のバイト列)] を作成する（n-gram の順）"""
+    postings = defaultdict(list)
+    for doc_id, doc in enumerate(docs, first_doc_id):
+        for gram in get_ngrams(doc[1:]):
+            postings[gram].append(doc_id)
+    return [(gram, array.array('I', postings[gram]).tobytes()) for gram in sorted(postings)]
+
+
+def open_index(index_path):
+    """索引を開く（形式・ツールが変わっていた場合は空にする）"""
+    connection = sqlite3.connect(index_path)
+    connection.execute(f"PRAGMA cache_size = -{UPDATE_CACHE_KIB}")
+    connection.executescript(SCHEMA)
+    meta = dict(connection.execute("SELECT name, value FROM meta"))
+    if meta.get("version") != str(INDEX_FORMAT_VERSION) or meta.get("tool") != TOOL_HASH:
+        if meta:
+            print("索引の形式またはツールが変更されたため、索引を作り直します。")
+        connection.executescript("DELETE FROM postings; DELETE FROM docs; DELETE FROM files;")
+        connection.executemany("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                               [("version", str(INDEX_FORMAT_VERSION)), ("tool", TOOL_HASH)])
+        connection.commit()
+    return connection
+
+
+def remove_file(connection, file_id):
+    # 転置索引はファイルのテキストから n-gram を求め直して削除する（file_id の索引を持たないため）
+    grams = set()
+    for texts in connection.execute("SELECT jp, kr, en, pt FROM docs WHERE file_id = ?", (file_id,)):
+        grams.update(get_ngrams(texts))
+    connection.executemany("DELETE FROM postings WHERE gram = ? AND file_id = ?",
+                           [(gram, file_id) for gram in sorted(grams)])
+    connection.execute("DELETE FROM docs WHERE file_id = ?", (file_id,))
+    connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+
+def update_index(index_path=INDEX_FILE, paratranz_source=None):
+    """
+    索引を更新する（入力ファイルの内容のハッシュが前回と異なるファイルのみ作り直す）
+
+    paratranz_source が None の場合は前回と同じ ParaTranz のエクスポートを使用する（空文字列の場合は使用しない）
+
+    Returns:
+        dict: 更新・削除・変更なしのファイル数。
+    """
+    start = time.perf_counter()
+    source_files = find_source_files()
+    connection = open_index(index_path)
+    if paratranz_source is None:
+        row = connection.execute("SELECT value FROM meta WHERE name = 'paratranz'").fetchone()
+        paratranz_source = row[0] if row else ""
+    elif paratranz_source:
+        paratranz_source = os.path.abspath(paratranz_source)
+    connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('paratranz', ?)", (paratranz_source,))
+    indexed = {base_name: (file_id, signature)
+               for file_id, base_name, signature in connection.execute("SELECT id, base_name, signature FROM files")}
+    counts = {"updated": 0, "removed": 0, "unchanged": 0}
+
+    try:
+        with open_paratranz_files(paratranz_source) as paratranz_files:
+            def read_paratranz(base_name):
+                read_file = paratranz_files.get(base_name)
+                return read_file() if read_file else None
+
+            signatures = {base_name: compute_signature(paths, read_paratranz(base_name))
+                          for base_name, paths in source_files.items()}
+            changed = [base_name for base_name, (_, signature) in indexed.items()
+                       if signatures.get(base_name) != signature]
+
+            if len(changed) > len(indexed) * FULL_REBUILD_RATIO:
+                # 変更が多い場合は、ファイルごとに削除するより全体を作り直す方が速い
+                connection.executescript("DELETE FROM postings; DELETE FROM docs; DELETE FROM files;")
+                counts["removed"] = sum(1 for base_name in indexed if base_name not in source_files)
+                indexed = {}
+            else:
+                for base_name in changed:
+                    remove_file(connection, indexed.pop(base_name)[0])
+                    if base_name not in source_files:
+                        counts["removed"] += 1
+
+            next_doc_id = (connection.execute("SELECT MAX(id) FROM docs").fetchone()[0] or 0) + 1
+            for base_name, paths in source_files.items():
+                if base_name in indexed:
+                    counts["unchanged"] += 1
+                    continue
+
+                docs = build_docs(paths, read_paratranz(base_name))
+                file_id = connection.execute("INSERT INTO files (base_name, signature) VALUES (?, ?)",
+                                             (base_name, signatures[base_name])).lastrowid
+                connection.executemany(
+                    "INSERT INTO docs (id, file_id, key, jp, kr, en, pt) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(doc_id, file_id, *doc) for doc_id, doc in enumerate(docs, next_doc_id)])
+                connection.executemany(
+                    "INSERT INTO postings (gram, file_id, doc_ids) VALUES (?, ?, ?)",
+                    [(gram, file_id, doc_ids) for gram, doc_ids in build_postings(docs, next_doc_id)])
+                next_doc_id += len(docs)
+                counts["updated"] += 1
+        connection.commit()
+    finally:
+        connection.close()
+
+    print(f"索引を更新しました: {counts['updated']} 更新, {counts['removed']} 削除, "
+          f"{counts['unchanged']} 変更なし ({time.perf_counter() - start:.1f}s)")
+    return counts
+
+
+def find_candidate_ids(connection, query):
+    """検索語の n-gram をすべて含むテキストの doc_id（n-gram がない短い検索語の場合は None）"""
+    grams = get_ngrams([query])
+    if not grams:
+        return None
+    doc_ids_by_gram = {gram: array.array('I') for gram in grams}
+    placeholders = ", ".join("?" * len(grams))
+    for gram, doc_ids in connection.execute(
+            f"SELECT gram, doc_ids FROM postings WHERE gram IN ({placeholders})", list(grams)):
+        doc_ids_by_gram[gram].frombytes(doc_ids)
+
+    # 出現するテキストが少ない n-gram から順に絞り込む
+    candidates = None
+    for doc_ids in sorted(doc_ids_by_gram.values(), key=len):
+        candidates = set(doc_ids) if candidates is None else candidates.intersection(doc_ids)
+        if not candidates:
+            break
+    return sorted(candidates)
+
+
+def iter_texts(connection, doc_ids, columns, needle=None):
+    """
+    doc_id と指定した列のテキストを返す（doc_ids が None の場合はすべて）
+
+    needle を指定した場合は、いずれかの列に needle を含むテキストのみを SQLite で絞り込んで返す
+    """
+    select = f"SELECT id, {', '.join(columns)} FROM docs"
+    conditions, params = [], []
+    if needle is not None:
+        conditions.append(f"({' OR '.join(f'instr({column}, ?)' for column in columns)})")
+        params = [needle] * len(columns)
+    if doc_ids is None:
+        where = f" WHERE {conditions[0]}" if conditions else ""
+        yield from connection.execute(f"{select}{where} ORDER BY id", params)
+        return
+    for i in range(0, len(doc_ids), FETCH_BATCH_SIZE):
+        batch = doc_ids[i:i + FETCH_BATCH_SIZE]
+        where = " AND ".join([f"id IN ({', '.join('?' * len(batch))})"] + conditions)
+        yield from connection.execute(f"{select} WHERE {where} ORDER BY id", batch + params)
+
+
+def fetch_results(connection, doc_ids):
+    """doc_id の検索結果 {"file", "key", "jp", "kr", "en", "pt"} のリスト"""
+    columns = [column for column, _ in LANGUAGES]
+    rows = {}
+    for i in range(0, len(doc_ids), FETCH_BATCH_SIZE):
+        batch = doc_ids[i:i + FETCH_BATCH_SIZE]
+        for doc_id, file_name, key, *texts in connection.execute(
+                f"SELECT docs.id, files.base_name, docs.key, {', '.join('docs.' + column for column in columns)} "
+                f"FROM docs JOIN files ON files.id = docs.file_id WHERE docs.id IN ({', '.join('?' * len(batch))})", batch):
+            rows[doc_id] = {"file": file_name, "key": key, **dict(zip(columns, texts))}
+    return [rows[doc_id] for doc_id in doc_ids]
+
+
+def search(query, index_path=INDEX_FILE, languages=None, limit=DEFAULT_LIMIT):
+    """
+    部分一致でテキストを検索する
+
+    Returns:
+        tuple: (一致したテキストのリスト [{"file", "key", "jp", "kr", "en", "pt"}], 一致した件数)
+    """
+    languages = languages or [column for column, _ in LANGUAGES]
+    needle = query.casefold()
+    # 大文字・小文字のない検索語（日本語・韓国語など）は、テキストを小文字に統一せずに比較する
+    caseless = query == needle == query.upper()
+
+    connection = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+    try:
+        matched_ids = []
+        candidate_ids = find_candidate_ids(connection, query)
+        for doc_id, *texts in iter_texts(connection, candidate_ids, languages, needle if caseless else None):
+            if any(needle in (text if caseless else text.casefold()) for text in texts):
+                matched_ids.append(doc_id)
+        results = fetch_results(connection, matched_ids[:limit] if limit else matched_ids)
+    finally:
+        connection.close()
+    return results, len(matched_ids)
+
+
+def print_results(results, total, elapsed, output_format):
+    if output_format == "json":
+        print(json.dumps({"total": total, "results": results}, ensure_ascii=False, indent=2))
+        return
+    if output_format == "tsv":
+        for result in results:
+            print('\t'.join([result["file"], result["key"]] +
+                            [result[column].replace('\n', '\\n') for column, _ in LANGUAGES]))
+        return
+
+    for result in results:
+        print(f"[{result['file']}] {result['key']}")
+        for column, label in LANGUAGES:
+            if result[column]:
+                print(f"  {label}: {result[column].replace(chr(10), chr(10) + '      ')}")
+    print(f"{total} 件一致（{len(results)} 件表示, {elapsed * 1000:.1f} ms）")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="JP Text Search")
+    parser.add_argument('query', nargs='?',
+                        help="検索語（部分一致）")
+    parser.add_argument('--update', action='store_true',
+                        help="検索の前に索引を作成・更新する")
+    parser.add_argument('--paratranz',
+                        help="索引に含める ParaTranz のエクスポート（フォルダまたは zip、\"\" で解除）。省略時は前回の指定を使用")
+    parser.add_argument('--index', default=INDEX_FILE,
+                        help="索引のファイル")
+    parser.add_argument('--lang', nargs='+', choices=[column for column, _ in LANGUAGES],
+                        help="検索する言語（既定はすべて）")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help="表示する件数（0 の場合はすべて）")
+    parser.add_argument('--tsv', action='store_const', dest='format', const='tsv', default='text',
+                        help="タブ区切りで出力")
+    parser.add_argument('--json', action='store_const', dest='format', const='json',
+                        help="JSONで出力")
+    args = parser.parse_args()
+
+    if args.update or not os.path.exists(args.index):
+        update_index(args.index, args.paratranz)
+    if args.query:
+        start = time.perf_counter()
+        results, total = search(args.query, args.index, args.lang, args.limit)
+        print_results(results, total, time.perf_counter() - start, args.format)
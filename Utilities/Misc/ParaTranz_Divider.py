@@ -1,19 +1,20 @@
 import os
+import sys
 import shutil
 import json
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from paratranz_entry import split_comments
+
 INPUT_DIR = 'paratranz_input'
 OUTPUT_DIR = 'paratranz_extracted'
 
 def has_nonempty_cmt_jp(entry):
-    original = entry.get('original', '')
-    translation = entry.get('translation', '')
-    # 「<CMT_JP>」の後ろに実際に何か書かれているかを確認
-    for text in [original, translation]:
-        if '<CMT_JP>' in text:
-            after = text.split('<CMT_JP>')[-1]
-            if after.strip():
-                return True
+    # 「<CMT_JP>」の後ろに実際に何か書かれているかを確認（JP_TRImporter と同じ分け方）
+    for key in ['original', 'translation']:
+        _, _, cmt_jp = split_comments(entry.get(key, ''))
+        if cmt_jp.strip():
+            return True
     return False
 
 def process_json_file(input_path):
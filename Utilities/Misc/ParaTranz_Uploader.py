@@ -0,0 +1,349 @@
+import os
+import json
+import hashlib
+import time
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+
+# ---------------------------------------------------
+
+TOKEN_ID = os.getenv('PARATRANZ_TOKEN')
+PROJECT_ID = os.getenv('PARATRANZ_PROJECT_ID')
+
+# ParaTranz API 設定（ローカルのモックサーバーでテストする場合は環境変数で変更）
+PARATRANZ_API_URL = os.getenv('PARATRANZ_API_URL', 'https://paratranz.cn/api')
+REQUEST_TIMEOUT = (10, 120)  # (接続, 読み込み) のタイムアウト秒数
+UPLOAD_MAX_RETRIES = 5
+UPLOAD_BACKOFF_SECONDS = 2  # リトライ間隔（試行ごとに倍増）
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+UPLOAD_WORKERS = 4  # 同時にアップロードするファイル数
+
+# アップロード対象（JP_LangJsonGenerator の出力）
+INPUT_DIR = 'json_output'
+
+# リモートのファイル一覧とアップロード済みファイルのハッシュの記録（中断後の再開に使用）
+UPLOAD_STATE_FILE = 'paratranz_upload_state.json'
+
+# ---------------------------------------------------
+
+
+"""
+ParaTranz Uploader
+=====================================
+
+【概要】
+JP_LangJsonGenerator で生成した json_output のファイルを ParaTranz にアップロードするツールです。
+前回アップロードした内容のハッシュと比較し、変更されたファイルのみをアップロードします。
+
+【処理内容】
+1. ParaTranz のファイル一覧を取得（前回取得した一覧がある場合はそれを使用）
+2. json_output の各ファイルのハッシュを前回アップロード時のものと比較
+3. 変更されたファイルを並列でアップロード
+   * リモートに存在するファイル : 更新（Update File）
+   * リモートに存在しないファイル : 新規作成（Add File）
+4. アップロードに成功するたびに記録を保存（中断しても次回は未完了のファイルから再開）
+
+【使い方】
+1. 環境変数 PARATRANZ_TOKEN / PARATRANZ_PROJECT_ID を設定
+2. python ParaTranz_Uploader.py を実行
+   * --jobs N        : 同時にアップロードするファイル数
+   * --refresh-remote: ParaTranz のファイル一覧を取得し直す
+   * --dry-run       : アップロードせず、対象ファイルのみ表示
+
+【注意】
+* リモートにのみ存在するファイルは削除しません（一覧を表示するのみ）
+* 429（レート制限）を受けた場合は Retry-After の間、すべてのアップロードを待機します
+* 新規作成は、サーバーに届いていない（接続できない）場合と 429 の場合のみそのまま再送します。
+  タイムアウト・5xx などで作成されたか分からない場合は、ファイル一覧を取得し直して作成済みか確認してから再送します
+"""
+
+
+class RateLimiter:
+    """
+    全スレッドで共有するレート制限の待機時間。
+    429 を受けたスレッドが待機時間を設定し、他のスレッドも次のリクエストまで待機する。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.resume_at = 0.0
+
+    def wait(self):
+        """待機時間が設定されていれば、その時刻まで待つ"""
+        with self.lock:
+            delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """すべてのスレッドのリクエストを指定秒数止める"""
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+def parse_retry_after(value):
+    """Retry-After ヘッダー（秒数またはHTTP日付）を秒数に変換（解釈できない場合は None）"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class UncertainRequestError(Exception):
+    """リクエストがサーバーで処理されたかどうか分からないエラー（再送すると二重に処理される可能性がある）"""
+
+
+def is_connect_error(error):
+    """接続が確立できなかった（リクエストがサーバーに届いていない）エラーかどうか"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+def request_with_retry(method, url, rate_limiter, idempotent=True, **kwargs):
+    """
+    リトライ付きで API リクエストを送る。
+    接続エラー・タイムアウト・一時的なエラー（429, 5xx）は間隔を倍増させながらリトライし、
+    429 の場合は Retry-After を優先して全スレッドを待機させる。
+
+    idempotent=False（新規作成など、再送すると二重に処理されるリクエスト）の場合は、
+    接続できなかった場合と 429 の場合のみリトライし、それ以外は UncertainRequestError を送出する。
+    """
+    for attempt in range(1, UPLOAD_MAX_RETRIES + 1):
+        rate_limiter.wait()
+        try:
+            # ファイルを送る場合は試行ごとに先頭から読み直す
+            for _, file_tuple in kwargs.get('files', {}).items():
+                file_tuple[1].seek(0)
+            response = requests.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if not idempotent and not is_connect_error(e):
+                raise UncertainRequestError(f"{method} {url}: {e}") from e
+            error = e
+            retry_after = None
+        else:
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response
+            error = f"{response.status_code} - {response.reason}"
+            if not idempotent and response.status_code != 429:
+                raise UncertainRequestError(f"{method} {url}: {error}")
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+        if attempt >= UPLOAD_MAX_RETRIES:
+            raise Exception(f"リクエストに失敗しました: {method} {url}: {error}")
+        wait = retry_after if retry_after is not None else UPLOAD_BACKOFF_SECONDS * (2 ** (attempt - 1))
+        rate_limiter.pause(wait)
+        print(f"リクエストを再試行します ({attempt}/{UPLOAD_MAX_RETRIES}, {wait:.0f}秒後): {error}")
+
+
+def load_upload_state(state_path):
+    """前回の記録を読み込む（存在しない・壊れている場合は空の記録）"""
+    state = {"remote_files": None, "uploaded": {}}
+    if os.path.exists(state_path):
+        try:
+            with open(state_path, encoding='utf-8') as f:
+                state.update(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"記録の読み込みに失敗しました: {state_path}, エラー: {e}")
+    return state
+
+
+def save_upload_state(state_path, state):
+    """記録を書き出す（書き込み途中で中断しても壊れないよう一時ファイルから置き換える）"""
+    tmp_path = state_path + '.part'
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, state_path)
+
+
+def fetch_remote_files(token_id, project_id, rate_limiter, api_url=PARATRANZ_API_URL):
+    """ParaTranz のファイル一覧を {ファイル名: ファイルID} として取得"""
+    url = f"{api_url}/projects/{project_id}/files"
+    response = request_with_retry('GET', url, rate_limiter, headers={"Authorization": f"Bearer {token_id}"})
+    if response.status_code != 200:
+        raise Exception(f"ファイル一覧の取得に失敗しました: {response.status_code} - {response.text}")
+    return {item["name"]: item["id"] for item in response.json()}
+
+
+def collect_local_files(input_dir):
+    """アップロード対象のファイルを {ファイル名（/区切り）: SHA-256} として収集"""
+    local_files = {}
+    for root, _, files in os.walk(input_dir):
+        for file in sorted(files):
+            if not file.lower().endswith('.json'):
+                continue
+            file_path = os.path.join(root, file)
+            name = os.path.relpath(file_path, input_dir).replace(os.sep, '/')
+            with open(file_path, 'rb') as f:
+                local_files[name] = hashlib.sha256(f.read()).hexdigest()
+    return dict(sorted(local_files.items()))
+
+
+def create_file(token_id, project_id, input_dir, name, rate_limiter, api_url=PARATRANZ_API_URL):
+    """
+    新規ファイルとして作成する。
+    作成されたか分からないエラーの場合は、ファイル一覧を取得し直して作成済みか確認してから再送する。
+
+    Returns:
+        tuple: (ファイルID, 作成したかどうか)。作成済みだった場合は (既存のファイルID, False)。
+    """
+    url = f"{api_url}/projects/{project_id}/files"
+    headers = {"Authorization": f"Bearer {token_id}"}
+    directory, filename = os.path.split(name)
+    for attempt in range(1, UPLOAD_MAX_RETRIES + 1):
+        try:
+            with open(os.path.join(input_dir, name), 'rb') as f:
+                files = {"file": (filename, f, "application/json")}
+                response = request_with_retry('POST', url, rate_limiter, idempotent=False,
+                                              headers=headers, files=files, data={"path": directory})
+        except UncertainRequestError as e:
+            if attempt >= UPLOAD_MAX_RETRIES:
+                raise Exception(f"アップロードに失敗しました: {name}: {e}") from e
+            wait = UPLOAD_BACKOFF_SECONDS * (2 ** (attempt - 1))
+            rate_limiter.pause(wait)
+            print(f"作成されたか確認します ({attempt}/{UPLOAD_MAX_RETRIES}, {wait:.0f}秒後): {e}")
+            remote_files = fetch_remote_files(token_id, project_id, rate_limiter, api_url)
+            if name in remote_files:
+                return remote_files[name], False
+            continue
+
+        if response.status_code != 200:
+            raise Exception(f"アップロードに失敗しました: {name}: {response.status_code} - {response.text}")
+        result = response.json()
+        return result.get("file", result).get("id"), True
+
+
+def upload_file(token_id, project_id, input_dir, name, file_id, rate_limiter, api_url=PARATRANZ_API_URL):
+    """
+    1ファイルをアップロードする。
+    file_id がある場合は既存ファイルを更新し、ない場合は新規ファイルとして作成する
+    （作成済みだった場合は、そのファイルを更新する）。
+
+    Returns:
+        int: アップロードしたファイルのID。
+    """
+    if file_id is None:
+        file_id, created = create_file(token_id, project_id, input_dir, name, rate_limiter, api_url)
+        if created:
+            return file_id
+
+    headers = {"Authorization": f"Bearer {token_id}"}
+    filename = os.path.basename(name)
+    with open(os.path.join(input_dir, name), 'rb') as f:
+        files = {"file": (filename, f, "application/json")}
+        url = f"{api_url}/projects/{project_id}/files/{file_id}"
+        response = request_with_retry('POST', url, rate_limiter, headers=headers, files=files)
+
+    if response.status_code != 200:
+        raise Exception(f"アップロードに失敗しました: {name}: {response.status_code} - {response.text}")
+    return file_id
+
+
+def upload_changed_files(token_id, project_id, input_dir=INPUT_DIR, state_path=UPLOAD_STATE_FILE,
+                         jobs=UPLOAD_WORKERS, refresh_remote=False, dry_run=False, api_url=PARATRANZ_API_URL):
+    """
+    前回アップロード時から変更されたファイルのみを並列でアップロードする。
+
+    Returns:
+        tuple: (アップロードしたファイル数, 失敗したファイルのリスト)。
+    """
+    rate_limiter = RateLimiter()
+    state = load_upload_state(state_path)
+
+    # リモートのファイル一覧（前回取得したものがあれば再利用）
+    if refresh_remote or state["remote_files"] is None:
+        print("ParaTranz のファイル一覧を取得しています...")
+        state["remote_files"] = fetch_remote_files(token_id, project_id, rate_limiter, api_url)
+        # リモートに存在しないファイルの記録は破棄
+        state["uploaded"] = {name: h for name, h in state["uploaded"].items() if name in state["remote_files"]}
+        save_upload_state(state_path, state)
+    remote_files = state["remote_files"]
+
+    local_files = collect_local_files(input_dir)
+    targets = [name for name, file_hash in local_files.items() if state["uploaded"].get(name) != file_hash]
+    new_count = sum(1 for name in targets if name not in remote_files)
+    print(f"アップロード対象: {len(targets)} / {len(local_files)} ファイル（新規 {new_count}、更新 {len(targets) - new_count}）")
+
+    remote_only = [name for name in remote_files if name not in local_files]
+    if remote_only:
+        print(f"リモートにのみ存在するファイル（削除はしません）: {len(remote_only)} ファイル")
+        for name in remote_only:
+            print(f"  {name}")
+
+    if dry_run:
+        for name in targets:
+            print(f"  {'更新' if name in remote_files else '新規'}: {name}")
+        return 0, []
+
+    uploaded_count = 0
+    failed = []
+    state_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {
+            executor.submit(upload_file, token_id, project_id, input_dir, name, remote_files.get(name), rate_limiter, api_url): name
+            for name in targets
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                file_id = future.result()
+            except Exception as e:
+                print(f"エラー: {e}")
+                failed.append(name)
+                continue
+
+            # 成功するたびに記録を保存（中断しても次回はここから再開）
+            with state_lock:
+                remote_files[name] = file_id
+                state["uploaded"][name] = local_files[name]
+                save_upload_state(state_path, state)
+            uploaded_count += 1
+            print(f"アップロード完了 ({uploaded_count}/{len(targets)}): {name}")
+
+    return uploaded_count, sorted(failed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="ParaTranz Uploader")
+    parser.add_argument('--input-dir', default=INPUT_DIR,
+                        help="アップロードするファイルのディレクトリ")
+    parser.add_argument('--jobs', type=int, default=UPLOAD_WORKERS,
+                        help="同時にアップロードするファイル数")
+    parser.add_argument('--refresh-remote', action='store_true',
+                        help="ParaTranz のファイル一覧を取得し直す")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="アップロードせず、対象ファイルのみ表示")
+    args = parser.parse_args()
+
+    if not TOKEN_ID or not PROJECT_ID:
+        print("環境変数 PARATRANZ_TOKEN / PARATRANZ_PROJECT_ID を設定してください。")
+        raise SystemExit(1)
+
+    uploaded_count, failed = upload_changed_files(
+        TOKEN_ID, PROJECT_ID,
+        input_dir=args.input_dir,
+        jobs=args.jobs,
+        refresh_remote=args.refresh_remote,
+        dry_run=args.dry_run
+    )
+    print(f"{uploaded_count} ファイルをアップロードしました。")
+    if failed:
+        print(f"失敗したファイル: {len(failed)} 件（再実行すると未完了のファイルのみアップロードします）")
+        for name in failed:
+            print(f"  {name}")
+        raise SystemExit(1)
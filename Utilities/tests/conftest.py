@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+UTILITIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for sub_dir in ('Common', 'Importer', 'Misc'):
+    sys.path.insert(0, os.path.join(UTILITIES_DIR, sub_dir))
+
+
+class StubServer:
+    """
+    ParaTranz API の代わりに localhost で応答するサーバー。
+    handler(request) が (ステータス, ヘッダー, 本文) を返し、受け取ったリクエストは requests に記録する。
+    ヘッダーに Content-Length を指定した場合はそのまま送る（本文より大きくすると途中で切断した応答になる）。
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        stub = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def handle_request(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                request = {
+                    "method": self.command,
+                    "path": self.path,
+                    "headers": dict(self.headers),
+                    "body": self.rfile.read(length),
+                }
+                stub.requests.append(request)
+                status, headers, body = stub.handler(request)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if 'Content-Length' not in headers:
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            do_GET = do_POST = handle_request
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    """stub_server(handler) でサーバーを起動する（テストの終了時に停止）"""
+    servers = []
+
+    def start(handler):
+        server = StubServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def closed_port_url():
+    """接続を拒否される localhost の URL（ポートを確保してすぐに閉じる）"""
+    import socket
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api"
@@ -0,0 +1,291 @@
+"""
+共通抽出エンジン（text_extraction）に置き換える前の再帰的な実装
+
+test_text_extraction_parity で、現在の実装の出力と比較するための固定した実装です。
+各ツールの履歴（共通抽出エンジンを導入する直前のコミット）から処理部分をそのまま写しています。
+変更しないこと（比較の基準が変わるため）。
+"""
+
+import json
+from collections import OrderedDict, defaultdict
+
+import regex
+
+
+# 比較時にテスト側で現在のツールと同じものを設定する
+GENERATOR_TARGET_KEYS = set()
+MERGER_TARGET_KEYS = set()
+MODEL_NAMES = {}
+
+
+# ---- JP_LangJsonGenerator ----
+
+def generator_extract_target_values(data, root_id=None, path="", skip_top_dataList=True, in_dataList=False):
+    values = OrderedDict()
+    key_counts = {}  # キーの出現回数を追跡するための辞書
+
+    if isinstance(data, dict):
+        current_root_id = root_id
+        if current_root_id is None and "id" in data:
+            current_root_id = str(data["id"])
+
+        # root_id が "-1" の場合はこのエントリをスキップ
+        if current_root_id == "-1":
+            return values
+
+        for key, val in data.items():
+            if key == "id" and path != "":
+                continue  # ネストされた "id" は無視
+            # "dataList" のキーは最上位でのみスキップ対象
+            if skip_top_dataList and path == "" and key == "dataList":
+                values.update(generator_extract_target_values(val, current_root_id, path="", skip_top_dataList=False, in_dataList=True))
+                continue
+            new_path = f"{path}.{key}" if path else key
+            if isinstance(val, str) and key in GENERATOR_TARGET_KEYS:
+                final_key = f"{current_root_id}-{new_path}" if current_root_id else new_path
+
+                # キーの重複を確認し、必要に応じて接尾辞を追加
+                if final_key in values:
+                    if final_key not in key_counts:
+                        key_counts[final_key] = 1
+                    else:
+                        key_counts[final_key] += 1
+
+                    # 値が同じであれば上書き、異なる場合は接尾辞を付加
+                    if values[final_key] != val:
+                        dup_key = f"{final_key}-dup{key_counts[final_key]}"
+                        values[dup_key] = val
+                    # 値が同じ場合は何もしない（上書きせず既存のエントリを保持）
+                else:
+                    values[final_key] = val
+            else:
+                extracted_values = generator_extract_target_values(val, current_root_id, new_path, skip_top_dataList=False, in_dataList=False)
+
+                # 抽出された値の各キー重複をチェック
+                for extracted_key, extracted_val in extracted_values.items():
+                    if extracted_key in values:
+                        if extracted_key not in key_counts:
+                            key_counts[extracted_key] = 1
+                        else:
+                            key_counts[extracted_key] += 1
+
+                        # 値が異なる場合のみ接尾辞を付加
+                        if values[extracted_key] != extracted_val:
+                            dup_key = f"{extracted_key}-dup{key_counts[extracted_key]}"
+                            values[dup_key] = extracted_val
+                    else:
+                        values[extracted_key] = extracted_val
+
+    elif isinstance(data, list):
+        for index, item in enumerate(data):
+            if isinstance(item, str):  # 文字列が直接リスト内にある場合の処理
+                if path:  # パスが存在する場合のみ処理
+                    final_key = f"{root_id}-{path}[{index}]" if root_id else f"{path}[{index}]"
+                    values[final_key] = item
+            else:
+                # dataList直下の項目ではインデックスを含めない
+                if in_dataList:
+                    extracted_values = generator_extract_target_values(item, root_id, path, skip_top_dataList=False, in_dataList=False)
+                else:
+                    new_path = f"{path}[{index}]" if path else f"[{index}]"
+                    extracted_values = generator_extract_target_values(item, root_id, new_path, skip_top_dataList=False, in_dataList=False)
+
+                # 抽出された値の各キー重複をチェック
+                for extracted_key, extracted_val in extracted_values.items():
+                    if extracted_key in values:
+                        if extracted_key not in key_counts:
+                            key_counts[extracted_key] = 1
+                        else:
+                            key_counts[extracted_key] += 1
+
+                        # 値が異なる場合のみ接尾辞を付加
+                        if values[extracted_key] != extracted_val:
+                            dup_key = f"{extracted_key}-dup{key_counts[extracted_key]}"
+                            values[dup_key] = extracted_val
+                    else:
+                        values[extracted_key] = extracted_val
+
+    return values
+
+
+# ---- JP_GameTextMerger ----
+
+def merger_extract_target_values(data, root_id=None, path="", skip_top_dataList=True, in_dataList=False):
+    id_groups = {}
+    id_key_order = {}
+    id_has_array = {}
+
+    # 新しい：IDに連番を付けて一意化し、順番を保持
+    root_id_map = {}  # {original_id: count}
+    def get_unique_root_id(original_id):
+        count = root_id_map.get(original_id, 0) + 1
+        root_id_map[original_id] = count
+        return f"{original_id}#{count}"
+
+    def _extract_values(data, root_id=None, path="", skip_top_dataList=True, in_dataList=False):
+        values = OrderedDict()
+
+        if isinstance(data, dict) and "dataList" in data and isinstance(data["dataList"], list):
+            dataList = data["dataList"]
+            for item in dataList:
+                if isinstance(item, dict) and "id" in item and "title" in item and "desc" in item:
+                    if isinstance(item["desc"], str):
+                        item["desc"] += "<JSON_CRLF>"
+
+        if isinstance(data, dict):
+            current_id = data.get("id")
+            if root_id is None and current_id is not None:
+                root_id = get_unique_root_id(str(current_id))
+
+            for key, val in data.items():
+                if key == "id" and path != "":
+                    continue
+
+                if skip_top_dataList and path == "" and key == "dataList":
+                    values.update(_extract_values(val, root_id, path="", skip_top_dataList=False, in_dataList=True))
+                    continue
+
+                new_path = f"{path}.{key}" if path else key
+
+                if isinstance(val, str) and key in MERGER_TARGET_KEYS:
+                    if key == 'teller':
+                        val = f"[{val}]" if val else "[...]"
+                    elif key == 'title':
+                        val = f"({val})" if val else val
+                    elif key == 'place':
+                        val = f"- {val} -" if val else val
+                    elif key == 'model':
+                        model_name = MODEL_NAMES.get(val)
+                        val = f"[{model_name}]" if model_name else ""
+
+                    # コメントアウト処理（root_id == '-1' かつ content の場合）
+                    if root_id:
+                        if root_id.startswith('-1'):
+                            val = f"// {val}"
+
+                    final_key = f"{root_id}-{new_path}" if root_id else new_path
+                    values[final_key] = val
+
+                    if root_id:
+                        id_groups.setdefault(root_id, []).append(final_key)
+                        id_key_order.setdefault(root_id, []).append(final_key)
+                else:
+                    if isinstance(val, list) and root_id:
+                        id_has_array[root_id] = True
+
+                    values.update(_extract_values(val, root_id, new_path, skip_top_dataList=False, in_dataList=False))
+
+        elif isinstance(data, list):
+            if root_id:
+                id_has_array[root_id] = True
+
+            for index, item in enumerate(data):
+                if isinstance(item, str):
+                    if path:
+                        final_key = f"{root_id}-{path}[{index}]" if root_id else f"{path}[{index}]"
+                        values[final_key] = item
+                        if root_id:
+                            id_groups.setdefault(root_id, []).append(final_key)
+                            id_key_order.setdefault(root_id, []).append(final_key)
+                else:
+                    if in_dataList:
+                        values.update(_extract_values(item, root_id, path, skip_top_dataList=False, in_dataList=False))
+                    else:
+                        new_path = f"{path}[{index}]" if path else f"[{index}]"
+                        values.update(_extract_values(item, root_id, new_path, skip_top_dataList=False, in_dataList=False))
+
+        return values
+
+    processed_data = json.loads(json.dumps(data))
+    _extract_values(processed_data, root_id, path, skip_top_dataList, in_dataList)
+    all_values = _extract_values(processed_data, root_id, path, skip_top_dataList, in_dataList)
+
+    for id_val, keys in id_groups.items():
+        if keys and id_has_array.get(id_val, False):
+            last_key = id_key_order[id_val][-1]
+            if last_key in all_values:
+                all_values[last_key] += "<JSON_CRLF>"
+
+    return all_values
+
+
+# ---- JP_TRImporter ----
+
+def importer_collect_text_formats(obj, formats_dict, entry_id, leading_pattern, trailing_pattern, path=""):
+    """再帰的にオブジェクトを走査してテキストの書式情報を収集"""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            new_path = f"{path}.{k}" if path else k
+            if k == "id":
+                entry_id = v
+            importer_collect_text_formats(v, formats_dict, entry_id, leading_pattern, trailing_pattern, new_path)
+    elif isinstance(obj, list):
+        for i, item in enumerate(obj):
+            new_path = f"{path}[{i}]"
+            importer_collect_text_formats(item, formats_dict, entry_id, leading_pattern, trailing_pattern, new_path)
+    elif isinstance(obj, str):
+        full_key = f"{entry_id}-{path}"
+        leading_match = regex.match(leading_pattern, obj)
+        trailing_match = regex.search(trailing_pattern, obj)
+        leading = leading_match.group(1) if leading_match else ""
+        trailing = trailing_match.group(1) if trailing_match else ""
+        
+        # 先頭または末尾に空白がある場合に記録
+        if leading or trailing:
+            formats_dict[full_key] = {
+                "leading": leading,
+                "trailing": trailing
+            }
+
+
+def importer_apply_translation_to_obj(obj, translations, original_formats, organized_translations, entry_id, path="", dup_counters=None, filename="", path_prefixes=None):
+    """JSONオブジェクトに翻訳を適用（path_prefixes 指定時は翻訳対象を含む部分木のみ走査）"""
+    if dup_counters is None:
+        dup_counters = defaultdict(int)
+    
+    # トップレベルのIDを取得
+    if entry_id is None and isinstance(obj, dict) and path == "" and "id" in obj:
+        entry_id = obj["id"]
+    
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            new_path = f"{path}.{k}" if path else k
+            if path_prefixes is not None and new_path not in path_prefixes:
+                continue
+            obj[k] = importer_apply_translation_to_obj(v, translations, original_formats, organized_translations, entry_id, new_path, dup_counters, filename, path_prefixes)
+    elif isinstance(obj, list):
+        for i in range(len(obj)):
+            new_path = f"{path}[{i}]"
+            if path_prefixes is not None and new_path not in path_prefixes:
+                continue
+            obj[i] = importer_apply_translation_to_obj(obj[i], translations, original_formats, organized_translations, entry_id, new_path, dup_counters, filename, path_prefixes)
+    elif isinstance(obj, str):
+        full_key = f"{entry_id}-{path}"
+        base_key = full_key
+        
+        # 重複キーの処理
+        if base_key in organized_translations:
+            available_translations = organized_translations[base_key]
+            if available_translations:
+                dup_counters[base_key] += 1
+                counter = dup_counters[base_key]
+                if counter <= len(available_translations):
+                    key, translated_text = available_translations[counter - 1]
+                else:
+                    key, translated_text = available_translations[-1]
+                
+                # 書式情報を適用
+                if full_key in original_formats:
+                    format_info = original_formats[full_key]
+                    return format_info.get("leading", "") + translated_text + format_info.get("trailing", "")
+
+                return translated_text
+        # 通常の翻訳処理
+        elif full_key in translations:
+            translated_text = translations[full_key]
+            if full_key in original_formats:
+                format_info = original_formats[full_key]
+                return format_info.get("leading", "") + translated_text + format_info.get("trailing", "")
+            return translated_text
+    
+    return obj
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from aho_corasick import AhoCorasick
+
+
+def build(patterns):
+    automaton = AhoCorasick()
+    for pattern in patterns:
+        automaton.add(pattern, pattern)
+    return automaton.build()
+
+
+def find_all(patterns, text):
+    """str.find で求めた (開始位置, 終了位置, 文字列) の集合"""
+    matches = set()
+    for pattern in set(patterns):
+        start = text.find(pattern)
+        while start != -1:
+            matches.add((start, start + len(pattern), pattern))
+            start = text.find(pattern, start + 1)
+    return matches
+
+
+def test_empty_automaton_matches_nothing():
+    automaton = AhoCorasick().build()
+
+    assert list(automaton.iter_matches("")) == []
+    assert list(automaton.iter_matches("ushers")) == []
+
+
+def test_overlapping_patterns():
+    automaton = build(["he", "she", "his", "hers"])
+
+    assert list(automaton.iter_matches("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    assert list(automaton.iter_matches("ahishers")) == [
+        (1, 4, "his"), (3, 6, "she"), (4, 6, "he"), (4, 8, "hers")]
+
+
+def test_same_pattern_returns_every_value():
+    automaton = AhoCorasick()
+    automaton.add("ファウスト", 1)
+    automaton.add("ファウスト", 2)
+    automaton.build()
+
+    assert list(automaton.iter_matches("ファウストと")) == [(0, 5, 1), (0, 5, 2)]
+
+
+def test_matches_agree_with_str_find():
+    rng = random.Random(0)
+    alphabet = "abc."
+    for _ in range(200):
+        patterns = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        matches = list(build(patterns).iter_matches(text))
+
+        assert set(matches) == find_all(patterns, text)
+        assert [end for _, end, _ in matches] == sorted(end for _, end, _ in matches)
+
+
+def test_add_after_build_and_search_before_build_are_rejected():
+    automaton = AhoCorasick()
+    with pytest.raises(RuntimeError):
+        list(automaton.iter_matches("text"))
+    with pytest.raises(ValueError):
+        automaton.add("", 0)
+    automaton.build()
+    with pytest.raises(RuntimeError):
+        automaton.add("he", 0)
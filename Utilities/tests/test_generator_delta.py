@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+import JP_LangJsonGenerator as generator
+
+
+def write_source(root, lang, values):
+    """Localize の1ファイル分（dataList の各要素に id と name）を書き出す"""
+    path = os.path.join(root, "Localize", lang, f"{lang.upper()}_Test.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"dataList": [{"id": key, "name": value} for key, value in values.items()]}, f, ensure_ascii=False)
+
+
+def write_sources(root, names):
+    for lang in ("jp", "kr", "en"):
+        write_source(root, lang, {key: f"{lang}:{value}" for key, value in names.items()})
+
+
+def read_delta():
+    """差分出力のキーと、削除されたキーの一覧"""
+    path = generator.get_output_path("Test.json", generator.DELTA_OUTPUT_DIR)
+    keys = []
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            keys = [entry["key"] for entry in json.load(f)]
+    with open(generator.DELTA_REMOVED_FILE, encoding='utf-8') as f:
+        removed = json.load(f)
+    return keys, removed
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """一時ディレクトリを作業ディレクトリにし、入力を Localize/{jp,kr,en} から読み込む"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LCB_JSON_CACHE_DIR", "")
+    monkeypatch.setattr(generator, "JP_DIR", (os.path.join("Localize", "jp"), "JP_"))
+    monkeypatch.setattr(generator, "KR_DIR", (os.path.join("Localize", "kr"), "KR_"))
+    monkeypatch.setattr(generator, "EN_DIR", (os.path.join("Localize", "en"), "EN_"))
+    return tmp_path
+
+
+def test_delta_runs_compare_against_confirmed_snapshot(workspace):
+    write_sources(workspace, {1: "a", 2: "b", 3: "c"})
+    generator.process_directories(delta=True)
+    assert read_delta() == (["1-name", "2-name", "3-name"], {})
+    assert generator.confirm_snapshot()
+
+    # 確定せずに2回実行しても、1回目の変更は失われない
+    write_sources(workspace, {1: "a2", 2: "b", 3: "c"})
+    generator.process_directories(delta=True)
+    assert read_delta() == (["1-name"], {})
+
+    write_sources(workspace, {1: "a2", 2: "b2"})
+    generator.process_directories(delta=True)
+    assert read_delta() == (["1-name", "2-name"], {"Test.json": ["3-name"]})
+
+    # 確定後は、確定した状態からの差分のみ
+    assert generator.confirm_snapshot()
+    generator.process_directories(delta=True)
+    assert read_delta() == ([], {})
+
+
+def test_full_run_does_not_move_delta_base(workspace):
+    write_sources(workspace, {1: "a"})
+    generator.process_directories(delta=True)
+    assert generator.confirm_snapshot()
+
+    write_sources(workspace, {1: "a2"})
+    generator.process_directories()
+    assert os.path.exists(generator.get_output_path("Test.json"))
+    assert os.path.exists(generator.SNAPSHOT_PENDING_FILE)
+
+    # 通常の実行の後でも、未確定の変更は差分に含まれる
+    generator.process_directories(delta=True)
+    assert read_delta() == (["1-name"], {})
+
+
+def test_confirm_without_pending_snapshot(workspace):
+    assert not generator.confirm_snapshot()
+    assert not os.path.exists(generator.SNAPSHOT_FILE)
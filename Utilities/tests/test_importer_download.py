@@ -0,0 +1,105 @@
+import hashlib
+import os
+
+import pytest
+
+import JP_TRImporter as importer
+
+
+ARTIFACT = b"PK" + bytes(range(256)) * 8
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    """ダウンロード先を一時ディレクトリにし、リトライの待機とチャンクを小さくする"""
+    monkeypatch.setattr(importer, 'IN_DIR_ARCHIVE', str(tmp_path))
+    monkeypatch.setattr(importer, 'DOWNLOAD_BACKOFF_SECONDS', 0)
+    monkeypatch.setattr(importer, 'DOWNLOAD_CHUNK_SIZE', 100)
+    monkeypatch.setattr(importer, 'DOWNLOAD_TIMEOUT', (5, 5))
+    return tmp_path
+
+
+def download(server, cache_record=None):
+    return importer.download_paratranz_artifact("token", 1, api_url=server.url, cache_record=cache_record)
+
+
+def test_streams_artifact_to_part_file_then_replaces(stub_server, archive_dir):
+    server = stub_server(lambda request: (200, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, ARTIFACT))
+
+    path, record = download(server)
+
+    assert path == os.path.join(str(archive_dir), 'paratranz_artifact.zip')
+    with open(path, 'rb') as f:
+        assert f.read() == ARTIFACT
+    assert not os.path.exists(path + '.part')
+    assert record == {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+                      "sha256": hashlib.sha256(ARTIFACT).hexdigest()}
+    assert server.requests[0]["path"] == "/api/projects/1/artifacts/download"
+    assert server.requests[0]["headers"]["Authorization"] == "Bearer token"
+    assert "If-None-Match" not in server.requests[0]["headers"]
+
+
+def test_not_modified_returns_none_with_conditional_headers(stub_server, archive_dir):
+    server = stub_server(lambda request: (304, {}, b""))
+    cache_record = {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT", "sha256": "x"}
+
+    path, record = download(server, cache_record)
+
+    assert path is None
+    assert record == cache_record
+    assert server.requests[0]["headers"]["If-None-Match"] == '"v1"'
+    assert server.requests[0]["headers"]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert os.listdir(archive_dir) == []
+
+
+def test_same_hash_is_treated_as_unchanged(stub_server, archive_dir):
+    server = stub_server(lambda request: (200, {}, ARTIFACT))
+    cache_record = {"etag": "", "last_modified": "", "sha256": hashlib.sha256(ARTIFACT).hexdigest()}
+
+    path, record = download(server, cache_record)
+
+    assert path is None
+    assert record["sha256"] == cache_record["sha256"]
+    assert os.listdir(archive_dir) == []
+
+
+def test_retries_rate_limit_and_server_errors(stub_server, archive_dir):
+    statuses = [429, 503, 200]
+    server = stub_server(lambda request: (statuses.pop(0), {}, ARTIFACT))
+
+    path, _ = download(server)
+
+    assert len(server.requests) == 3
+    with open(path, 'rb') as f:
+        assert f.read() == ARTIFACT
+
+
+def test_retries_truncated_stream_without_leaving_part_file(stub_server, archive_dir):
+    responses = [(200, {"Content-Length": str(len(ARTIFACT))}, ARTIFACT[:150]), (200, {}, ARTIFACT)]
+    server = stub_server(lambda request: responses.pop(0))
+
+    path, _ = download(server)
+
+    assert len(server.requests) == 2
+    with open(path, 'rb') as f:
+        assert f.read() == ARTIFACT
+    assert sorted(os.listdir(archive_dir)) == ['paratranz_artifact.zip']
+
+
+def test_gives_up_after_max_retries(stub_server, archive_dir):
+    server = stub_server(lambda request: (500, {}, b"error"))
+
+    with pytest.raises(Exception, match="500"):
+        download(server)
+
+    assert len(server.requests) == importer.DOWNLOAD_MAX_RETRIES
+    assert os.listdir(archive_dir) == []
+
+
+def test_client_error_is_not_retried(stub_server, archive_dir):
+    server = stub_server(lambda request: (403, {}, b"forbidden"))
+
+    with pytest.raises(Exception, match="403"):
+        download(server)
+
+    assert len(server.requests) == 1
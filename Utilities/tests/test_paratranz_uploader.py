@@ -0,0 +1,306 @@
+import email.parser
+import email.policy
+import json
+import os
+import re
+import time
+
+import pytest
+import requests
+
+import ParaTranz_Uploader as uploader
+
+
+class MockParaTranz:
+    """
+    ParaTranz のファイル API（一覧・作成・更新）を再現する handler。
+    faults に (メソッド, パス) ごとの異常な応答を積むと、先頭から順に使う。
+    "after" の場合はファイルを作成・更新した後に異常な応答を返す（処理されたのに失敗に見えるケース）。
+    """
+
+    def __init__(self, files=None):
+        self.files = {}  # {ファイルID: {"name": ..., "content": ...}}
+        self.next_id = 100
+        self.faults = {}
+        for name, content in (files or {}).items():
+            self.add(name, content)
+
+    def add(self, name, content):
+        file_id = self.next_id
+        self.next_id += 1
+        self.files[file_id] = {"name": name, "content": content}
+        return file_id
+
+    def names(self):
+        return sorted(item["name"] for item in self.files.values())
+
+    def content(self, name):
+        return next(item["content"] for item in self.files.values() if item["name"] == name)
+
+    def __call__(self, request):
+        method, path = request["method"], request["path"]
+        fault = self.faults.get((method, path), [])
+        when, response = fault.pop(0) if fault else (None, None)
+        if when == "before":
+            return response() if callable(response) else response
+
+        if method == 'GET' and path == "/api/projects/1/files":
+            body = [{"id": file_id, "name": item["name"]} for file_id, item in self.files.items()]
+            result = (200, {"Content-Type": "application/json"}, json.dumps(body).encode())
+        elif method == 'POST' and path == "/api/projects/1/files":
+            fields = parse_multipart(request)
+            filename, content = fields["file"]
+            name = "/".join(p for p in (fields["path"][1].decode(), filename) if p)
+            file_id = self.add(name, content)
+            result = (200, {"Content-Type": "application/json"}, json.dumps({"file": {"id": file_id}}).encode())
+        elif method == 'POST' and re.fullmatch(r"/api/projects/1/files/\d+", path):
+            file_id = int(path.rsplit("/", 1)[1])
+            if file_id not in self.files:
+                return 404, {}, b"not found"
+            self.files[file_id]["content"] = parse_multipart(request)["file"][1]
+            result = (200, {"Content-Type": "application/json"}, json.dumps({"id": file_id}).encode())
+        else:
+            return 404, {}, b"not found"
+
+        if when == "after":
+            return response() if callable(response) else response
+        return result
+
+    def fail(self, method, path, when, response):
+        self.faults.setdefault((method, f"/api/projects/1{path}"), []).append((when, response))
+
+
+def parse_multipart(request):
+    """multipart/form-data の本文を {フィールド名: (ファイル名, 内容)} に変換"""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {request['headers']['Content-Type']}\r\n\r\n".encode() + request["body"])
+    return {part.get_param('name', header='content-disposition'): (part.get_filename(), part.get_payload(decode=True))
+            for part in message.iter_parts()}
+
+
+def requests_to(server, method, path):
+    return [r for r in server.requests if r["method"] == method and r["path"] == f"/api/projects/1{path}"]
+
+
+def write_local(input_dir, files):
+    for name, content in files.items():
+        path = os.path.join(input_dir, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """リトライの待機をなくし、タイムアウトを短くする"""
+    monkeypatch.setattr(uploader, 'UPLOAD_BACKOFF_SECONDS', 0)
+    monkeypatch.setattr(uploader, 'UPLOAD_MAX_RETRIES', 3)
+    monkeypatch.setattr(uploader, 'REQUEST_TIMEOUT', (5, 5))
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    input_dir = tmp_path / "json_output"
+    input_dir.mkdir()
+    return str(input_dir), str(tmp_path / "paratranz_upload_state.json")
+
+
+def upload(server, workspace, **kwargs):
+    input_dir, state_path = workspace
+    return uploader.upload_changed_files("token", 1, input_dir=input_dir, state_path=state_path,
+                                         jobs=1, api_url=server.url, **kwargs)
+
+
+def read_state(workspace):
+    with open(workspace[1], encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_uploads_only_files_changed_since_cached_listing(stub_server, workspace):
+    input_dir, state_path = workspace
+    api = MockParaTranz({"A.json": b"a", "sub/B.json": b"b"})
+    server = stub_server(api)
+    write_local(input_dir, {"A.json": b"a", "sub/B.json": b"b2", "sub/C.json": b"c"})
+    local_files = uploader.collect_local_files(input_dir)
+    uploader.save_upload_state(state_path, {
+        "remote_files": {"A.json": 100, "sub/B.json": 101},
+        "uploaded": {"A.json": local_files["A.json"], "sub/B.json": "old"},
+    })
+
+    assert upload(server, workspace) == (2, [])
+
+    # 記録済みの一覧を使い、一覧は取得しない
+    assert requests_to(server, 'GET', "/files") == []
+    assert len(requests_to(server, 'POST', "/files/100")) == 0
+    assert len(requests_to(server, 'POST', "/files/101")) == 1
+    assert len(requests_to(server, 'POST', "/files")) == 1
+    assert api.names() == ["A.json", "sub/B.json", "sub/C.json"]
+    assert api.content("sub/B.json") == b"b2"
+    assert api.content("sub/C.json") == b"c"
+    assert read_state(workspace) == {
+        "remote_files": {"A.json": 100, "sub/B.json": 101, "sub/C.json": 102},
+        "uploaded": uploader.collect_local_files(input_dir),
+    }
+
+    # 変更がなければ何も送らない
+    server.requests.clear()
+    assert upload(server, workspace) == (0, [])
+    assert server.requests == []
+
+
+def test_resumes_from_state_file_after_failure(stub_server, workspace):
+    input_dir, _ = workspace
+    api = MockParaTranz()
+    server = stub_server(api)
+    write_local(input_dir, {"A.json": b"a", "B.json": b"b", "C.json": b"c"})
+    api.fail('POST', "/files", "before", (403, {}, b"forbidden"))  # 1件目の作成のみ失敗する
+
+    uploaded_count, failed = upload(server, workspace)
+
+    assert uploaded_count == 2
+    assert len(failed) == 1
+    state = read_state(workspace)
+    assert sorted(state["uploaded"]) == sorted(n for n in ["A.json", "B.json", "C.json"] if n not in failed)
+
+    # 再実行すると、失敗したファイルのみアップロードする（一覧は記録から再利用）
+    server.requests.clear()
+    assert upload(server, workspace) == (1, [])
+    assert [r["method"] for r in server.requests] == ['POST']
+    assert api.names() == ["A.json", "B.json", "C.json"]
+    assert sorted(read_state(workspace)["uploaded"]) == ["A.json", "B.json", "C.json"]
+
+
+def test_refresh_remote_drops_records_of_deleted_files(stub_server, workspace):
+    input_dir, state_path = workspace
+    api = MockParaTranz({"A.json": b"a"})
+    server = stub_server(api)
+    write_local(input_dir, {"A.json": b"a", "B.json": b"b"})
+    uploader.save_upload_state(state_path, {
+        "remote_files": {"A.json": 100, "B.json": 999},
+        "uploaded": uploader.collect_local_files(input_dir),
+    })
+
+    assert upload(server, workspace, refresh_remote=True) == (1, [])
+
+    assert len(requests_to(server, 'GET', "/files")) == 1
+    assert api.names() == ["A.json", "B.json"]
+
+
+def test_rate_limit_retries_after_retry_after(stub_server, workspace):
+    input_dir, state_path = workspace
+    api = MockParaTranz({"A.json": b"a"})
+    server = stub_server(api)
+    write_local(input_dir, {"A.json": b"a2", "B.json": b"b"})
+    uploader.save_upload_state(state_path, {"remote_files": {"A.json": 100}, "uploaded": {}})
+    for path in ("/files/100", "/files"):
+        api.fail('POST', path, "before", (429, {"Retry-After": "0"}, b"too many requests"))
+        api.fail('POST', path, "before", (429, {"Retry-After": "0"}, b"too many requests"))
+
+    assert upload(server, workspace) == (2, [])
+
+    assert len(requests_to(server, 'POST', "/files/100")) == 3
+    # 429 は処理されていないので、作成もそのまま再送する（一覧の確認は不要）
+    assert len(requests_to(server, 'POST', "/files")) == 3
+    assert api.names() == ["A.json", "B.json"]
+    assert api.content("A.json") == b"a2"
+
+
+def test_rate_limit_pauses_all_requests(stub_server):
+    server = stub_server(MockParaTranz())
+    limiter = uploader.RateLimiter()
+    server.handler.fail('GET', "/files", "before", (429, {"Retry-After": "1"}, b""))
+
+    start = time.monotonic()
+    uploader.fetch_remote_files("token", 1, limiter, server.url)
+
+    assert time.monotonic() - start >= 1
+    assert len(server.requests) == 2
+
+
+@pytest.mark.parametrize("response", [
+    (500, {}, b"internal error"),
+    (503, {}, b"unavailable"),
+])
+def test_create_checks_listing_before_resending(stub_server, workspace, response):
+    input_dir, state_path = workspace
+    api = MockParaTranz()
+    server = stub_server(api)
+    write_local(input_dir, {"sub/A.json": b"a"})
+    uploader.save_upload_state(state_path, {"remote_files": {}, "uploaded": {}})
+    api.fail('POST', "/files", "after", response)
+
+    assert upload(server, workspace) == (1, [])
+
+    # 作成済みだったので二重に作成せず、見つかったファイルを更新する
+    assert len(requests_to(server, 'POST', "/files")) == 1
+    assert len(requests_to(server, 'GET', "/files")) == 1
+    assert len(requests_to(server, 'POST', "/files/100")) == 1
+    assert api.names() == ["sub/A.json"]
+    assert read_state(workspace)["remote_files"] == {"sub/A.json": 100}
+
+
+def test_create_resends_when_not_created(stub_server, workspace):
+    input_dir, state_path = workspace
+    api = MockParaTranz()
+    server = stub_server(api)
+    write_local(input_dir, {"A.json": b"a"})
+    uploader.save_upload_state(state_path, {"remote_files": {}, "uploaded": {}})
+    api.fail('POST', "/files", "before", (502, {}, b"bad gateway"))
+
+    assert upload(server, workspace) == (1, [])
+
+    assert len(requests_to(server, 'GET', "/files")) == 1
+    assert len(requests_to(server, 'POST', "/files")) == 2
+    assert api.names() == ["A.json"]
+
+
+def test_create_read_timeout_does_not_duplicate(stub_server, workspace, monkeypatch):
+    input_dir, _ = workspace
+    monkeypatch.setattr(uploader, 'REQUEST_TIMEOUT', (5, 0.2))
+    api = MockParaTranz()
+    server = stub_server(api)
+    write_local(input_dir, {"A.json": b"a"})
+
+    def slow_response():
+        time.sleep(0.5)
+        return 200, {}, b"{}"
+    api.fail('POST', "/files", "after", slow_response)
+
+    assert upload(server, workspace) == (1, [])
+
+    assert len(requests_to(server, 'POST', "/files")) == 1
+    assert api.names() == ["A.json"]
+
+
+def test_create_gives_up_after_max_retries(stub_server, workspace):
+    input_dir, _ = workspace
+    api = MockParaTranz()
+    server = stub_server(api)
+    write_local(input_dir, {"A.json": b"a"})
+    for _ in range(uploader.UPLOAD_MAX_RETRIES):
+        api.fail('POST', "/files", "before", (500, {}, b"internal error"))
+
+    assert upload(server, workspace) == (0, ["A.json"])
+
+    assert len(requests_to(server, 'POST', "/files")) == uploader.UPLOAD_MAX_RETRIES
+    assert api.names() == []
+
+
+def test_connect_error_is_distinguished_from_read_timeout(stub_server, closed_port_url):
+    with pytest.raises(requests.exceptions.ConnectionError) as refused:
+        requests.get(closed_port_url, timeout=(5, 5))
+    assert uploader.is_connect_error(refused.value)
+
+    server = stub_server(lambda request: time.sleep(0.5) or (200, {}, b""))
+    with pytest.raises(requests.exceptions.ReadTimeout) as timeout:
+        requests.get(server.url, timeout=(5, 0.2))
+    assert not uploader.is_connect_error(timeout.value)
+
+
+def test_create_retries_connection_refused(closed_port_url, tmp_path):
+    (tmp_path / "A.json").write_bytes(b"a")
+
+    # サーバーに届いていないので一覧の確認をせずに再送し、上限に達したら失敗する
+    with pytest.raises(Exception, match="リクエストに失敗しました") as error:
+        uploader.create_file("token", 1, str(tmp_path), "A.json", uploader.RateLimiter(), closed_port_url)
+    assert not isinstance(error.value.__context__, uploader.UncertainRequestError)
@@ -0,0 +1,120 @@
+import sqlite3
+
+import pytest
+
+import report_store
+from report_store import ReportStore
+
+
+def make_row(location, key, translation="訳", comment_kr="오기1: x"):
+    """collect_csv_report_rows と同じ8列の行"""
+    return [location, key, "오기", "원문", translation, "수정", "", comment_kr]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "report_store.sqlite3")
+
+
+def update(db_path, rows, today, report="general"):
+    with ReportStore(db_path) as store:
+        return store.update_report(report, rows, today)
+
+
+def test_line_shift_keeps_timestamp_and_row_identity(db_path):
+    update(db_path, [make_row("a.json:3", "k1"), make_row("a.json:8", "k2")], "2025-01-01")
+
+    # ファイルの先頭に行が追加され、行番号だけが変わった
+    report_rows, counts = update(db_path, [make_row("a.json:5", "k1"), make_row("a.json:10", "k2")], "2025-02-01")
+
+    assert counts == {"added": 0, "changed": 0, "removed": 0, "unchanged": 2}
+    assert [row[:3] for row in report_rows] == [["a.json:5", "k1", "2025-01-01"], ["a.json:10", "k2", "2025-01-01"]]
+    with ReportStore(db_path) as store:
+        assert store.export_rows("general") == report_rows
+        assert [row[0] for row in store.query_history()] == ["a.json:3", "a.json:8"]
+        assert store.connection.execute("SELECT path, line FROM report_rows ORDER BY position").fetchall() == [
+            ("a.json", "5"), ("a.json", "10")]
+
+
+def test_changed_and_removed_rows_record_history_with_line(db_path):
+    update(db_path, [make_row("a.json:3", "k1"), make_row("a.json:8", "k2")], "2025-01-01")
+
+    report_rows, counts = update(db_path, [make_row("a.json:4", "k1", translation="新しい訳")], "2025-02-01")
+
+    assert counts == {"added": 0, "changed": 1, "removed": 1, "unchanged": 0}
+    assert report_rows[0][:3] == ["a.json:4", "k1", "2025-02-01"]
+    with ReportStore(db_path) as store:
+        history = store.query_history(since="2025-02-01")
+    assert [(row[0], row[1], row[-1]) for row in history] == [("a.json:4", "k1", "changed"), ("a.json:8", "k2", "removed")]
+
+
+def test_import_rows_splits_location(db_path):
+    with ReportStore(db_path) as store:
+        store.import_rows("story", [["s.json:1,4", "k", "2024-12-31", *make_row("", "")[2:]]])
+        assert store.export_rows("story")[0][:3] == ["s.json:1,4", "k", "2024-12-31"]
+        assert store.connection.execute("SELECT path, line FROM report_rows").fetchall() == [("s.json", "1,4")]
+
+
+def test_location_without_line_round_trips():
+    assert report_store.split_location("a.json:-") == ("a.json", "-")
+    assert report_store.split_location("dir/a.json:1,2") == ("dir/a.json", "1,2")
+    assert report_store.split_location("a.json") == ("a.json", "")
+
+
+V1_SCHEMA = """
+CREATE TABLE report_rows (
+    path TEXT NOT NULL, key TEXT NOT NULL, report TEXT NOT NULL, position INTEGER NOT NULL,
+    updated TEXT NOT NULL, content_hash TEXT NOT NULL, active INTEGER NOT NULL, category TEXT NOT NULL,
+    source TEXT NOT NULL, translation TEXT NOT NULL, revised TEXT NOT NULL, comment_jp TEXT NOT NULL,
+    comment_kr TEXT NOT NULL, PRIMARY KEY (path, key)
+);
+CREATE TABLE report_history (
+    id INTEGER PRIMARY KEY, path TEXT NOT NULL, key TEXT NOT NULL, report TEXT NOT NULL, recorded TEXT NOT NULL,
+    event TEXT NOT NULL, content_hash TEXT NOT NULL, category TEXT NOT NULL, source TEXT NOT NULL,
+    translation TEXT NOT NULL, revised TEXT NOT NULL, comment_jp TEXT NOT NULL, comment_kr TEXT NOT NULL
+);
+PRAGMA user_version = 1;
+"""
+
+
+def test_migrates_v1_store_and_merges_line_duplicates(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.executescript(V1_SCHEMA)
+    rows = [
+        # 行番号が変わったため、バージョン1では削除と追加として記録されていた
+        ("a.json:3", "k1", 0, "2025-01-01", 0),
+        ("a.json:5", "k1", 0, "2025-02-01", 1),
+        ("b.json:2", "k2", 1, "2025-01-01", 0),
+    ]
+    for location, key, position, updated, active in rows:
+        row = make_row(location, key)
+        content_hash = report_store.compute_content_hash(row)
+        connection.execute("INSERT INTO report_rows VALUES (?, ?, 'general', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (location, key, position, updated, content_hash, active, *row[2:]))
+        connection.execute("INSERT INTO report_history (path, key, report, recorded, event, content_hash, category, "
+                           "source, translation, revised, comment_jp, comment_kr) "
+                           "VALUES (?, ?, 'general', ?, 'added', ?, ?, ?, ?, ?, ?, ?)",
+                           (location, key, updated, content_hash, *row[2:]))
+    connection.commit()
+    connection.close()
+
+    with ReportStore(db_path) as store:
+        assert store.connection.execute("PRAGMA user_version").fetchone()[0] == report_store.SCHEMA_VERSION
+        assert store.connection.execute(
+            "SELECT path, key, line, updated, active FROM report_rows ORDER BY path").fetchall() == [
+            ("a.json", "k1", "5", "2025-02-01", 1), ("b.json", "k2", "2", "2025-01-01", 0)]
+        assert [row[0] for row in store.query_history()] == ["a.json:3", "b.json:2", "a.json:5"]
+
+    # 変換後は行番号が変わっても同じ行として扱う
+    report_rows, counts = update(db_path, [make_row("a.json:9", "k1")], "2025-03-01")
+    assert counts == {"added": 0, "changed": 0, "removed": 0, "unchanged": 1}
+    assert report_rows[0][:3] == ["a.json:9", "k1", "2025-02-01"]
+
+
+def test_rejects_newer_store(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.execute(f"PRAGMA user_version = {report_store.SCHEMA_VERSION + 1}")
+    connection.close()
+
+    with pytest.raises(ValueError):
+        ReportStore(db_path)
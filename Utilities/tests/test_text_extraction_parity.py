@@ -0,0 +1,302 @@
+"""
+共通抽出エンジン（text_extraction）と、置き換える前の再帰的な実装（legacy_extraction）の出力の比較
+
+- JP_LangJsonGenerator : DupSuffixKeyPolicy（-dupN）
+- JP_GameTextMerger    : ProofreadKeyPolicy（#N の連番、<JSON_CRLF> マーカー、offset_root_ids による連番の振り直し）
+- JP_TRImporter        : iter_leaves による書式情報の収集と翻訳の適用
+UniqueRootIdKeyPolicy 単体は、従来の実装に対応するものがないため固定した期待値と比較する。
+"""
+
+import copy
+import importlib
+import os
+from collections import defaultdict
+
+import pytest
+import regex
+
+import legacy_extraction as legacy
+from text_extraction import UniqueRootIdKeyPolicy, extract_target_values, iter_leaves
+import JP_TRImporter as importer
+
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+MODEL_NAMES = {"m1": "ファウスト", "m2": "ドンキホーテ"}
+
+
+@pytest.fixture(scope="module")
+def generator():
+    module = importlib.import_module("JP_LangJsonGenerator")
+    legacy.GENERATOR_TARGET_KEYS = module.TARGET_KEYS
+    return module
+
+
+@pytest.fixture(scope="module")
+def merger():
+    # モデル名の辞書をリポジトリ直下からの相対パスで読み込むため、読み込み時のみ移動する
+    if not os.path.exists(os.path.join(REPO_ROOT, "Localize", "jp")):
+        pytest.skip("Localize/jp がないため JP_GameTextMerger を読み込めない")
+    cwd = os.getcwd()
+    os.chdir(REPO_ROOT)
+    try:
+        module = importlib.import_module("JP_GameTextMerger")
+    finally:
+        os.chdir(cwd)
+    legacy.MERGER_TARGET_KEYS = module.TARGET_KEYS
+    legacy.MODEL_NAMES = module.MODEL_NAMES
+    return module
+
+
+@pytest.fixture
+def model_names(merger, monkeypatch):
+    monkeypatch.setattr(merger, "MODEL_NAMES", MODEL_NAMES)
+    monkeypatch.setattr(legacy, "MODEL_NAMES", MODEL_NAMES)
+
+
+# ---- 比較に使うツリー ----
+
+DUP_KEY_TREE = {
+    "dataList": [
+        {"id": 1, "name": "A", "desc": "説明"},
+        {"id": 1, "name": "A", "desc": "別の説明"},
+        {"id": 1, "name": "B", "desc": "説明"},
+        {"id": 1, "name": "C", "desc": "三つ目"},
+        {"id": "-1", "name": "除外", "desc": "除外"},
+        {"id": 2, "list": [{"name": "x"}, {"name": "x"}, {"name": "y"}], "sub": {"name": "n", "id": 99}},
+        {"id": 2, "list": [{"name": "z"}], "sub": {"name": "n"}},
+        {"name": "IDなし"},
+        {"name": "IDなし"},
+        {"name": "IDなし2"},
+    ]
+}
+
+NESTED_LIST_TREE = {
+    "id": 10,
+    "name": "最上位",
+    "lines": ["一行目", "二行目", 3, None, True],
+    "grid": [["a", "b"], [{"desc": "c"}, ["d", {"title": "e"}]]],
+    "deep": {"level1": {"level2": [{"content": "深い", "notTarget": "対象外"}, {"id": 5, "content": "入れ子のID"}]}},
+    "dataList": [
+        [{"name": "リストの中のリスト"}],
+        {"id": 11, "options": [{"message": "選択肢1"}, {"message": "選択肢2"}], "empty": [], "emptyDict": {}},
+    ],
+    "nested": {"dataList": [{"id": 12, "name": "最上位以外の dataList"}]},
+}
+
+STORY_TREE = {
+    "dataList": [
+        {"id": 1, "model": "m1", "teller": "ファウスト", "title": "", "place": "", "content": "こんにちは。"},
+        {"id": 2, "model": "unknown", "teller": "", "title": "章", "place": "図書館", "content": "……。"},
+        {"id": 2, "model": "m2", "teller": "ドンキホーテ", "title": "", "place": "", "content": "正義！"},
+        {"id": -1, "teller": "", "content": "没になった台詞"},
+        {"id": "-1", "teller": "", "content": "没になった台詞（文字列）"},
+        {"id": 3, "teller": "", "content": "選択肢", "select": [{"message": "はい"}, {"message": "いいえ"}]},
+        {"id": 3, "teller": "", "content": "同じIDの続き"},
+        {"content": "IDなし"},
+    ]
+}
+
+DESC_CRLF_TREE = {
+    "dataList": [
+        {"id": 100, "title": "見出し", "desc": "本文"},
+        {"id": 100, "title": "見出し", "desc": "同じIDの本文"},
+        {"id": 101, "title": "", "desc": "タイトルが空"},
+        {"id": 102, "desc": "タイトルなし"},
+        {"id": 103, "title": "リスト付き", "desc": "本文", "descs": ["追加1", "追加2"]},
+        {"id": 104, "title": "desc が文字列以外", "desc": ["リストの desc"]},
+        {"title": "IDなし", "desc": "IDなしの本文"},
+        {"id": 105, "title": "入れ子", "desc": "外側", "child": {"id": 1, "title": "内側", "desc": "内側の本文"}},
+        {"id": -1, "title": "没", "desc": "没の本文", "list": ["没のリスト"]},
+    ]
+}
+
+PARITY_TREES = {
+    "dup_key": DUP_KEY_TREE,
+    "nested_list": NESTED_LIST_TREE,
+    "story": STORY_TREE,
+    "desc_crlf": DESC_CRLF_TREE,
+}
+
+
+def load_sample_localize_files(count=40):
+    """リポジトリの Localize/jp から決まった順序で選んだファイル（ない場合は空）"""
+    jp_dir = os.path.join(REPO_ROOT, "Localize", "jp")
+    paths = []
+    for root, _, files in os.walk(jp_dir):
+        paths.extend(os.path.join(root, f) for f in files if f.endswith(".json"))
+    paths.sort()
+    step = max(1, len(paths) // count)
+    return paths[::step][:count]
+
+
+SAMPLE_FILES = load_sample_localize_files()
+
+
+def load_json(path):
+    import json_codec
+    return json_codec.load_file(path)
+
+
+# ---- JP_LangJsonGenerator（DupSuffixKeyPolicy）----
+
+@pytest.mark.parametrize("name", sorted(PARITY_TREES))
+def test_generator_matches_legacy(generator, name):
+    tree = PARITY_TREES[name]
+    expected = legacy.generator_extract_target_values(copy.deepcopy(tree))
+    actual = generator.extract_target_values(copy.deepcopy(tree))
+    assert list(actual.items()) == list(expected.items())
+
+
+def test_generator_dup_suffixes(generator):
+    values = generator.extract_target_values(DUP_KEY_TREE)
+    assert values["1-name"] == "A"
+    assert values["1-name-dup2"] == "B"
+    assert values["1-name-dup3"] == "C"
+    assert values["1-desc-dup1"] == "別の説明"
+    assert "1-desc-dup2" not in values  # 値が同じ重複は回数のみ数える
+    assert not any(key.startswith("-1-") for key in values)
+
+
+@pytest.mark.parametrize("path", SAMPLE_FILES, ids=os.path.basename)
+def test_generator_matches_legacy_on_localize(generator, path):
+    data = load_json(path)
+    assert list(generator.extract_target_values(data).items()) == list(legacy.generator_extract_target_values(data).items())
+
+
+# ---- JP_GameTextMerger（ProofreadKeyPolicy・offset_root_ids）----
+
+@pytest.mark.parametrize("name", sorted(PARITY_TREES))
+def test_merger_matches_legacy(merger, model_names, name):
+    tree = PARITY_TREES[name]
+    original = copy.deepcopy(tree)
+    expected = legacy.merger_extract_target_values(copy.deepcopy(tree))
+    actual = merger.extract_target_values(tree)
+    assert list(actual.items()) == list(expected.items())
+    assert tree == original  # 入力データは変更しない
+
+
+def test_merger_desc_markers_and_offset_ids(merger, model_names):
+    values = merger.extract_target_values(copy.deepcopy(DESC_CRLF_TREE))
+    # 従来の2回目の走査と同じく、連番は同じIDの出現数の後から振られる
+    assert values["100#3-desc"] == "本文<JSON_CRLF><JSON_CRLF>"
+    assert values["100#4-desc"] == "同じIDの本文<JSON_CRLF><JSON_CRLF>"
+    assert values["102#2-desc"] == "タイトルなし"
+    # リストを含むIDは最後のテキストの後にもマーカーを付加
+    assert values["103#2-descs[1]"] == "追加2<JSON_CRLF>"
+    assert values["-1#2-list[0]"] == "没のリスト<JSON_CRLF>"
+    assert values["-1#2-title"] == "// (没)"
+
+
+@pytest.mark.parametrize("path", SAMPLE_FILES, ids=os.path.basename)
+def test_merger_matches_legacy_on_localize(merger, path):
+    data = load_json(path)
+    assert list(merger.extract_target_values(copy.deepcopy(data)).items()) == \
+        list(legacy.merger_extract_target_values(copy.deepcopy(data)).items())
+
+
+# ---- UniqueRootIdKeyPolicy（固定した期待値）----
+
+def test_unique_root_id_policy_expected_output():
+    tree = {
+        "dataList": [
+            {"id": 7, "name": "一つ目", "items": [{"desc": "要素"}, "文字列"]},
+            {"id": 7, "name": "二つ目"},
+            {"id": "-1", "name": "没"},
+        ]
+    }
+    policy = UniqueRootIdKeyPolicy({"name", "desc"}, lambda key, value: f"<{key}>{value}")
+    values = extract_target_values(tree, policy)
+    assert list(values.items()) == [
+        ("7#1-name", "<name>一つ目"),
+        ("7#1-items[0].desc", "<desc>要素"),
+        ("7#1-items[1]", "文字列"),
+        ("7#2-name", "<name>二つ目"),
+        ("-1#1-name", "// <name>没"),
+    ]
+    assert policy.root_id_map == {"7": 2, "-1": 1}
+    assert policy.id_key_order == {"7#1": ["7#1-name", "7#1-items[0].desc", "7#1-items[1]"],
+                                   "7#2": ["7#2-name"], "-1#1": ["-1#1-name"]}
+    assert policy.id_has_array == {"7#1": True}
+
+
+# ---- JP_TRImporter（iter_leaves による書式情報の収集・翻訳の適用）----
+
+LEADING_PATTERN = regex.compile(r'^([\n　 ]+)')
+TRAILING_PATTERN = regex.compile(r'([\n　 ]+)$')
+
+# JP_TRImporter は dataList の辞書の要素にのみ翻訳を適用するため、入れ子のリストは要素の中に置く
+IMPORTER_TREES = {
+    **{name: tree for name, tree in PARITY_TREES.items() if name != "nested_list"},
+    "nested_list": {"dataList": [{**NESTED_LIST_TREE, "dataList": None}]},
+    "formats": {
+        "dataList": [
+            {"id": 1, "content": "　先頭の空白", "lines": ["末尾の改行\n", " 両方 "], "sub": {"id": 2, "desc": "IDが変わる "}},
+            {"id": 1, "content": "重複", "lines": ["重複2"]},
+            {"id": 3, "nested": [[" 入れ子 "]]},
+        ]
+    },
+}
+
+
+def collect_leaf_keys(item, entry_id):
+    """翻訳を用意するための、従来の実装と同じキー（{ID}-{パス}）"""
+    return [f"{entry_id}-{path}" for _, _, path, _, value in iter_leaves(item, entry_id) if isinstance(value, str)]
+
+
+@pytest.mark.parametrize("name", sorted(IMPORTER_TREES))
+def test_importer_formats_match_legacy(name):
+    for item in IMPORTER_TREES[name]["dataList"]:
+        if not isinstance(item, dict) or item.get("id") is None:
+            continue
+        expected, actual = {}, {}
+        legacy.importer_collect_text_formats(item, expected, item["id"], LEADING_PATTERN, TRAILING_PATTERN)
+        importer.collect_text_formats(item, actual, item["id"], LEADING_PATTERN, TRAILING_PATTERN)
+        assert actual == expected
+
+
+def test_importer_iter_leaves_tracks_nested_ids():
+    item = IMPORTER_TREES["formats"]["dataList"][0]
+    formats = {}
+    importer.collect_text_formats(item, formats, item["id"], LEADING_PATTERN, TRAILING_PATTERN)
+    assert formats == {
+        "1-content": {"leading": "　", "trailing": ""},
+        "1-lines[0]": {"leading": "", "trailing": "\n"},
+        "1-lines[1]": {"leading": " ", "trailing": " "},
+        "2-sub.desc": {"leading": "", "trailing": " "},
+    }
+
+
+def apply_all(apply, data, use_prefixes):
+    """JP_TRImporter.process_single_file と同じ手順で dataList の各要素に翻訳を適用する"""
+    translations = {}
+    for item in data.get("dataList", []):
+        if isinstance(item, dict) and item.get("id") is not None:
+            for i, key in enumerate(collect_leaf_keys(item, item["id"])):
+                translations[key] = f"訳{i}"
+                translations[f"{key}-dup1"] = f"訳{i}（重複）"
+    organized = importer.organize_duplicate_translations(translations)
+    formats = importer.collect_file_formats(data)
+    entry_ids = [item.get("id") for item in data["dataList"] if isinstance(item, dict) and item.get("id") is not None]
+    path_index = importer.build_translation_path_index(translations, organized, entry_ids)
+    dup_counters = defaultdict(int)
+    for i, item in enumerate(data["dataList"]):
+        if not isinstance(item, dict) or item.get("id") is None:
+            continue
+        prefixes = path_index.get(f"{item['id']}") if use_prefixes else None
+        data["dataList"][i] = apply(item, translations, formats, organized, item["id"],
+                                    dup_counters=dup_counters, path_prefixes=prefixes)
+    return data, dict(dup_counters)
+
+
+@pytest.mark.parametrize("use_prefixes", [False, True])
+@pytest.mark.parametrize("name", sorted(IMPORTER_TREES))
+def test_importer_apply_matches_legacy(name, use_prefixes):
+    tree = IMPORTER_TREES[name]
+    expected = apply_all(legacy.importer_apply_translation_to_obj, copy.deepcopy(tree), use_prefixes)
+    actual = apply_all(importer.apply_translation_to_obj, copy.deepcopy(tree), use_prefixes)
+    assert actual == expected
+
+
+def test_importer_apply_to_top_level_string():
+    assert importer.apply_translation_to_obj("原文", {"5-": "訳"}, {}, {}, 5) == \
+        legacy.importer_apply_translation_to_obj("原文", {"5-": "訳"}, {}, {}, 5)